@@ -2,18 +2,59 @@
 Authentication endpoints for FastAPI.
 
 This module provides routes to:
-1. Register a new user
-2. Login and receive a JWT access token
-3. Logout (stateless JWT, client-side discard)
+1. Register a new user, rejecting a taken username, email or phone number
+   with 409 before the password is hashed
+2. Check whether a username, email or phone number is still free
+3. Login and receive a short-lived JWT access token plus a refresh token
+   (rate limited per client IP and per email)
+4. Exchange a refresh token for new tokens without re-entering the password
+5. Logout (revokes the presented access token and, optionally, its refresh token family)
+
+`router` uses the sync database session; `async_router` exposes the same routes
+backed by `AsyncSession` and is mounted instead when `DB_ASYNC_MODE` is enabled.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas.user import UserRegisterRequest, UserRegisterResponse, UserLoginRequest, UserLoginResponse
-from app.services.user_service import register_user, authenticate_user
+from app.core.deps import get_token_claims
+from app.core.rate_limit import check_login_rate, record_failed_login
+from app.core.revocation import revocation_store
+from app.db.session import get_db, get_async_db, get_read_db, get_async_read_db
+from app.schemas.user import (
+    UserRegisterRequest, UserRegisterResponse, UserLoginRequest, UserLoginResponse,
+    UserAvailabilityResponse, TokenRefreshRequest, LogoutRequest
+)
+from app.services import async_token_service, async_user_service
+from app.services.token_service import rotate_refresh_token, revoke_refresh_family
+from app.services.user_service import register_user, authenticate_user, check_availability
 
 router = APIRouter(prefix="/auth", tags=["auth"])
+async_router = APIRouter(prefix="/auth", tags=["auth"])
+
+# ----- Helper function -----
+def availability_values(
+    username: str | None = Query(None, max_length=100),
+    email: str | None = Query(None, max_length=100),
+    phone_number: str | None = Query(None, max_length=15),
+) -> dict[str, str | None]:
+    """
+    Dependency collecting the values to check for availability.
+
+    Raises:
+        HTTPException: 422 if no value is given.
+
+    Returns:
+        dict[str, str | None]: Values keyed by field name (None: not asked).
+    """
+    values = {"username": username, "email": email, "phone_number": phone_number}
+    if all(value is None for value in values.values()):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Pass at least one of username, email and phone_number",
+        )
+    return values
 
 # ----- Endpoints -----
 @router.post("/register", response_model=UserRegisterResponse)
@@ -25,43 +66,247 @@ def register(user_data: UserRegisterRequest, db: Session = Depends(get_db)):
         user_data (UserRegisterRequest): Registration data including username, phone, email, password.
         db (Session): Database session (dependency injection).
 
+    Raises:
+        HTTPException: 409 naming the field if the username, email or phone number is already registered.
+
     Returns:
         UserRegisterResponse: ID of the newly created user (and optionally the password for testing purposes).
     """
     return register_user(db, user_data)
 
 
+@router.get("/availability", response_model=UserAvailabilityResponse, response_model_exclude_none=True)
+def availability(
+    values: dict = Depends(availability_values),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Check whether a username, email and/or phone number is free.
+
+    Values the availability filter knows to be free are answered without a
+    query; the others are checked together with one indexed query. The answer
+    is advisory: registration checks again.
+
+    Args:
+        values (dict): The asked values (see `availability_values`).
+        db (Session): Read-only database session (a replica when configured).
+
+    Raises:
+        HTTPException: 422 if no value is given.
+
+    Returns:
+        UserAvailabilityResponse: True for each asked field whose value is free.
+    """
+    return check_availability(db, values)
+
+
 @router.post("/login", response_model=UserLoginResponse)
-def login(login_data: UserLoginRequest, db: Session = Depends(get_db)):
+def login(
+    request: Request,
+    login_data: UserLoginRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """
     Authenticate a user and return a JWT access token.
 
+    Attempts are rate limited per client IP, and failed attempts per email,
+    before any database or bcrypt work.
+
     Args:
+        request (Request): Incoming request (client address for rate limiting).
         login_data (UserLoginRequest): Login credentials (email and password).
+        background_tasks (BackgroundTasks): Upgrades an outdated password hash after the response.
         db (Session): Database session (dependency injection).
 
     Raises:
-        HTTPException: 401 if credentials are invalid.
+        HTTPException: 401 if credentials are invalid, 429 if too many attempts were made.
 
     Returns:
         UserLoginResponse: Access token and user ID.
     """
-    user = authenticate_user(db, login_data)
+    check_login_rate(request, login_data.email)
+    user = authenticate_user(db, login_data, background_tasks)
     if not user:
+        record_failed_login(login_data.email)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     return user
 
 
+@router.post("/refresh", response_model=UserLoginResponse)
+def refresh(data: TokenRefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    The presented refresh token is single-use. Presenting it again revokes
+    every token of its login session (reuse detection).
+
+    Args:
+        data (TokenRefreshRequest): The current refresh token.
+        db (Session): Database session (dependency injection).
+
+    Raises:
+        HTTPException: 401 if the refresh token is invalid, expired, revoked or reused.
+
+    Returns:
+        UserLoginResponse: New access token, user ID and the next refresh token.
+    """
+    return rotate_refresh_token(db, data.refresh_token)
+
+
+def revoke_access_token(claims: dict):
+    """
+    Revoke an access token until its own expiry.
+
+    Tokens issued before `jti` claims existed are revoked through a per-user cut-off.
+
+    Args:
+        claims (dict): Verified claims of the token.
+    """
+    if "jti" in claims:
+        revocation_store.revoke_token(claims["jti"], int(claims["sub"]), float(claims["exp"]))
+    else:
+        revocation_store.revoke_user(int(claims["sub"]))
+
+
 @router.post("/logout")
-def logout():
+def logout(
+    data: LogoutRequest | None = Body(None),
+    claims: dict = Depends(get_token_claims),
+    db: Session = Depends(get_db)
+):
     """
-    Logout a user.
+    Logout a user by revoking the presented access token.
 
-    Note:
-        JWTs are stateless, so there is no server-side session to terminate.
-        Clients can "logout" by discarding their JWT token.
+    The token is rejected by every protected route from now on. When the body
+    carries the session's refresh token, its whole rotation family is revoked too.
+
+    Args:
+        data (LogoutRequest | None): Optional refresh token of this session.
+        claims (dict): Verified claims of the bearer token.
+        db (Session): Database session (dependency injection).
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired or already revoked.
+
+    Returns:
+        dict: Logout success message.
+    """
+    revoke_access_token(claims)
+    if data and data.refresh_token:
+        revoke_refresh_family(db, data.refresh_token)
+    return {"message": "Logged out successfully"}
+
+# ----- Async endpoints -----
+@async_router.post("/register", response_model=UserRegisterResponse)
+async def register_async(user_data: UserRegisterRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Register a new user (async database mode).
+
+    Args:
+        user_data (UserRegisterRequest): Registration data including username, phone, email, password.
+        db (AsyncSession): Async database session (dependency injection).
+
+    Raises:
+        HTTPException: 409 naming the field if the username, email or phone number is already registered.
+
+    Returns:
+        UserRegisterResponse: ID of the newly created user (and optionally the password for testing purposes).
+    """
+    return await async_user_service.register_user(db, user_data)
+
+
+@async_router.get("/availability", response_model=UserAvailabilityResponse, response_model_exclude_none=True)
+async def availability_async(
+    values: dict = Depends(availability_values),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Check whether a username, email and/or phone number is free (async database mode).
+
+    Args:
+        values (dict): The asked values (see `availability_values`).
+        db (AsyncSession): Read-only async database session (a replica when configured).
+
+    Raises:
+        HTTPException: 422 if no value is given.
+
+    Returns:
+        UserAvailabilityResponse: True for each asked field whose value is free.
+    """
+    return await async_user_service.check_availability(db, values)
+
+
+@async_router.post("/login", response_model=UserLoginResponse)
+async def login_async(
+    request: Request,
+    login_data: UserLoginRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Authenticate a user and return a JWT access token (async database mode).
+
+    Args:
+        request (Request): Incoming request (client address for rate limiting).
+        login_data (UserLoginRequest): Login credentials (email and password).
+        background_tasks (BackgroundTasks): Upgrades an outdated password hash after the response.
+        db (AsyncSession): Async database session (dependency injection).
+
+    Raises:
+        HTTPException: 401 if credentials are invalid, 429 if too many attempts were made.
+
+    Returns:
+        UserLoginResponse: Access token and user ID.
+    """
+    # The "redis" backend does network I/O, which must not block the event loop
+    await run_in_threadpool(check_login_rate, request, login_data.email)
+    user = await async_user_service.authenticate_user(db, login_data, background_tasks)
+    if not user:
+        await run_in_threadpool(record_failed_login, login_data.email)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    return user
+
+
+@async_router.post("/refresh", response_model=UserLoginResponse)
+async def refresh_async(data: TokenRefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token (async database mode).
+
+    Args:
+        data (TokenRefreshRequest): The current refresh token.
+        db (AsyncSession): Async database session (dependency injection).
+
+    Raises:
+        HTTPException: 401 if the refresh token is invalid, expired, revoked or reused.
+
+    Returns:
+        UserLoginResponse: New access token, user ID and the next refresh token.
+    """
+    return await async_token_service.rotate_refresh_token(db, data.refresh_token)
+
+
+@async_router.post("/logout")
+async def logout_async(
+    data: LogoutRequest | None = Body(None),
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Logout a user by revoking the presented access token (async database mode).
+
+    Args:
+        data (LogoutRequest | None): Optional refresh token of this session.
+        claims (dict): Verified claims of the bearer token.
+        db (AsyncSession): Async database session (dependency injection).
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired or already revoked.
 
     Returns:
         dict: Logout success message.
     """
-    return {"message": "Logged out successfully"}
\ No newline at end of file
+    await run_in_threadpool(revoke_access_token, claims)
+    if data and data.refresh_token:
+        await async_token_service.revoke_refresh_family(db, data.refresh_token)
+    return {"message": "Logged out successfully"}
@@ -0,0 +1,80 @@
+"""
+Internal operational endpoints.
+
+This module provides routes to:
+1. Inspect the password hashing pool (queue wait vs. hash time)
+2. Inspect the database connection pools (checkout latency, usage, timeouts)
+   and the health of the read replicas
+3. Inspect the verified-token cache (hits, misses, evictions)
+4. Inspect the availability filter (size, checks answered without the database)
+
+These routes are only mounted when `INTERNAL_STATS_ENABLED` is set and should
+not be exposed outside the private network.
+"""
+
+from fastapi import APIRouter
+from app.core.availability import availability_filter
+from app.core.hashing import hashing_pool
+from app.core.token_cache import token_cache
+from app.db.pool import pool_snapshot
+from app.core.config import settings
+from app.db.session import get_engine, get_async_engine, get_replicas, get_async_replicas
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+# ----- Endpoints -----
+@router.get("/stats/hashing")
+def hashing_stats():
+    """
+    Return hashing pool configuration and timing statistics.
+
+    Returns:
+        dict: Worker count, queue usage, rejections and average/max queue wait and hash time (ms).
+    """
+    return hashing_pool.snapshot()
+
+@router.get("/stats/pool")
+def db_pool_stats():
+    """
+    Return connection pool usage and checkout statistics.
+
+    Only the engines of the active mode (`DB_ASYNC_MODE`) are reported, and only
+    once they exist: reading the stats never creates an engine or its pool.
+
+    Returns:
+        dict: Snapshot for the engine of the active mode (`sync` or `async`) and
+        for each read replica (with its health) when configured.
+    """
+    stats = {}
+    if settings.DB_ASYNC_MODE:
+        if get_async_engine.loaded():
+            stats["async"] = pool_snapshot(get_async_engine().sync_engine)
+        replicas = get_async_replicas() if get_async_replicas.loaded() else None
+    else:
+        if get_engine.loaded():
+            stats["sync"] = pool_snapshot(get_engine())
+        replicas = get_replicas() if get_replicas.loaded() else None
+    if replicas:
+        stats["replicas"] = replicas.snapshot()
+    return stats
+
+@router.get("/stats/token-cache")
+def token_cache_stats():
+    """
+    Return verified-token cache size and counters.
+
+    Returns:
+        dict: Size, capacity, TTL and hit/miss/eviction/expiration/invalidation counters.
+    """
+    return token_cache.snapshot()
+
+@router.get("/stats/availability-filter")
+def availability_filter_stats():
+    """
+    Return availability filter size and counters.
+
+    Returns:
+        dict: Readiness, last load time, capacity, items, bits, hash count, and
+        the number of checks and of values found definitely free.
+    """
+    return availability_filter.snapshot()
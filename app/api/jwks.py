@@ -0,0 +1,35 @@
+"""
+JSON Web Key Set endpoint.
+
+This module provides a route to:
+1. Publish the public keys that verify access tokens, so other services can
+   check tokens locally (matching the token's `kid` header) instead of
+   calling this API.
+
+Mounted at the application root (`/.well-known/jwks.json`). With an HS*
+algorithm the shared secret is never published and the key set is empty.
+"""
+
+from fastapi import APIRouter, Response
+from app.core.config import settings
+from app.core.keys import get_key_ring
+
+router = APIRouter(tags=["keys"])
+
+# ----- Endpoints -----
+@router.get("/.well-known/jwks.json")
+def jwks():
+    """
+    Return the public token verification keys as a JWK Set.
+
+    The document is serialized once with the key ring, and clients may cache it for
+    `JWKS_MAX_AGE_SECONDS`.
+
+    Returns:
+        Response: JWK Set (`{"keys": [...]}`).
+    """
+    return Response(
+        get_key_ring().jwks_json,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"},
+    )
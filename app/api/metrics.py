@@ -0,0 +1,28 @@
+"""
+Prometheus metrics endpoint.
+
+This module provides a route to:
+1. Export request latency histograms, per-request SQL usage and the timing of
+   pool checkouts, SQL statements, password hashing and JWT operations.
+
+Mounted at the application root (`/metrics`) when `METRICS_ENABLED` is set.
+The route has no authentication and should not be exposed outside the
+private network.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["metrics"])
+
+# ----- Endpoints -----
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """
+    Return all application metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Exposition text.
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
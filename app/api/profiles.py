@@ -0,0 +1,179 @@
+"""
+Admin endpoints for captured request profiles.
+
+This module provides routes to:
+1. List the profiles in the ring buffer (admin only)
+2. Download a profile as speedscope JSON, pstats text or a `.prof` file (admin only)
+3. Clear the ring buffer (admin only)
+
+Mounted when `PROFILER_ENABLED` or `PROFILER_HEADER_ENABLED` is set.
+`router` authenticates with the sync database session; `async_router` is
+mounted instead when `DB_ASYNC_MODE` is enabled.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from app.core.deps import require_admin, require_admin_async
+from app.core.profiler import RequestProfile, request_profiler
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+async_router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+FORMATS = "^(speedscope|pstats|prof)$"
+
+# ----- Helper functions -----
+def list_profiles() -> list[dict]:
+    """
+    Summaries of the stored profiles.
+
+    Returns:
+        list[dict]: Profile metadata, newest first.
+    """
+    return [profile.summary() for profile in request_profiler.buffer.list()]
+
+def export_profile(profile_id: str, format: str | None) -> Response:
+    """
+    Serialize a stored profile.
+
+    Args:
+        profile_id (str): Profile ID.
+        format (str | None): "speedscope" (sampling engine), "pstats" or "prof" (cProfile engine).
+            Defaults to the engine's native format.
+
+    Raises:
+        HTTPException: 404 if the profile is unknown, 400 if the format does not match its engine.
+
+    Returns:
+        Response: The profile as a download.
+    """
+    profile: RequestProfile | None = request_profiler.buffer.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    format = format or profile.summary()["format"]
+    if (format == "speedscope") != (profile.engine == "sampling"):
+        raise HTTPException(status_code=400, detail=f"Format {format!r} is not available for {profile.engine} profiles")
+
+    if format == "speedscope":
+        return JSONResponse(
+            profile.to_speedscope(),
+            headers={"Content-Disposition": f'attachment; filename="{profile.id}.speedscope.json"'},
+        )
+    if format == "prof":
+        return Response(
+            profile.to_pstats_dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile.id}.prof"'},
+        )
+    return PlainTextResponse(profile.to_pstats_text())
+
+# ----- Endpoints -----
+@router.get("/")
+def read_profiles(claims: dict = Depends(require_admin)):
+    """
+    List captured profiles, newest first. Admin-only access.
+
+    Args:
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        list[dict]: Profile metadata (id, method, path, status, duration_ms, engine, captured_at, format).
+    """
+    return list_profiles()
+
+@router.get("/{profile_id}")
+def read_profile(
+    profile_id: str,
+    format: str | None = Query(None, pattern=FORMATS),
+    claims: dict = Depends(require_admin)
+):
+    """
+    Download one profile. Admin-only access.
+
+    Args:
+        profile_id (str): Profile ID.
+        format (str | None): "speedscope", "pstats" or "prof". Defaults to the profile's native format.
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin, 404 if the profile is unknown.
+
+    Returns:
+        Response: speedscope JSON, pstats text or a `.prof` file.
+    """
+    return export_profile(profile_id, format)
+
+@router.delete("/")
+def clear_profiles(claims: dict = Depends(require_admin)):
+    """
+    Drop all captured profiles. Admin-only access.
+
+    Args:
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        dict: Confirmation message.
+    """
+    request_profiler.buffer.clear()
+    return {"message": "Profiles cleared"}
+
+# ----- Async endpoints -----
+@async_router.get("/")
+async def read_profiles_async(claims: dict = Depends(require_admin_async)):
+    """
+    List captured profiles, newest first. Admin-only access (async database mode).
+
+    Args:
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        list[dict]: Profile metadata (id, method, path, status, duration_ms, engine, captured_at, format).
+    """
+    return list_profiles()
+
+@async_router.get("/{profile_id}")
+async def read_profile_async(
+    profile_id: str,
+    format: str | None = Query(None, pattern=FORMATS),
+    claims: dict = Depends(require_admin_async)
+):
+    """
+    Download one profile. Admin-only access (async database mode).
+
+    Args:
+        profile_id (str): Profile ID.
+        format (str | None): "speedscope", "pstats" or "prof". Defaults to the profile's native format.
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin, 404 if the profile is unknown.
+
+    Returns:
+        Response: speedscope JSON, pstats text or a `.prof` file.
+    """
+    return export_profile(profile_id, format)
+
+@async_router.delete("/")
+async def clear_profiles_async(claims: dict = Depends(require_admin_async)):
+    """
+    Drop all captured profiles. Admin-only access (async database mode).
+
+    Args:
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        dict: Confirmation message.
+    """
+    request_profiler.buffer.clear()
+    return {"message": "Profiles cleared"}
@@ -0,0 +1,241 @@
+"""
+User selection (watchlist) endpoints for FastAPI.
+
+This module provides routes to:
+1. List the stocks, cryptocurrencies and currencies a user follows
+2. Add several targets to a user's watchlist in one request
+3. Remove several targets from a user's watchlist in one request
+4. Count the followers of stocks, cryptocurrencies and currencies
+
+A user may read and change their own watchlist; other users' watchlists need
+the admin role. Reads use `get_read_db`, served by a read replica when
+replicas are configured, and return the rows as an `ORJSONResponse`.
+
+`router` uses the sync database session; `async_router` exposes the same routes
+backed by `AsyncSession` and is mounted instead when `DB_ASYNC_MODE` is enabled.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.deps import get_token_claims, require_owner_or_admin, require_owner_or_admin_async
+from app.db.session import get_db, get_async_db, get_read_db, get_async_read_db
+from app.schemas.selection import (
+    MAX_SELECTIONS_PER_REQUEST, SelectionBulkRequest, SelectionBulkResponse,
+    SelectionFollowersResponse, UserSelectionResponse
+)
+from app.services import async_selection_service
+from app.services.selection_service import add_selections, count_followers, list_selections, remove_selections
+
+router = APIRouter(tags=["selections"])
+async_router = APIRouter(tags=["selections"])
+
+# ----- Helper function -----
+def follower_targets(
+    stock_id: list[int] = Query([], description="Stocks to count, repeatable"),
+    crypto_id: list[int] = Query([], description="Cryptocurrencies to count, repeatable"),
+    currency_code: list[str] = Query([], description="Currencies to count, repeatable"),
+) -> dict[str, list]:
+    """
+    Collect the targets of a follower count from the query string.
+
+    Args:
+        stock_id (list[int]): Stocks to count.
+        crypto_id (list[int]): Cryptocurrencies to count.
+        currency_code (list[str]): Currencies to count.
+
+    Raises:
+        HTTPException: 422 if more than `MAX_SELECTIONS_PER_REQUEST` targets are requested.
+
+    Returns:
+        dict[str, list]: Targets per target column.
+    """
+    targets = {"stock_id": stock_id, "crypto_id": crypto_id, "currency_code": currency_code}
+    if sum(len(values) for values in targets.values()) > MAX_SELECTIONS_PER_REQUEST:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_SELECTIONS_PER_REQUEST} targets per request")
+    return targets
+
+# ----- Endpoints -----
+@router.get("/users/{id}/selections", response_model=list[UserSelectionResponse])
+def read_selections(
+    id: int,
+    db: Session = Depends(get_read_db),
+    claims: dict = Depends(require_owner_or_admin)
+):
+    """
+    List a user's watchlist, in the order the targets were added.
+
+    Args:
+        id (int): User ID.
+        db (Session): Read-only database session (a replica when configured).
+        claims (dict): Verified claims of the user or an admin.
+
+    Raises:
+        HTTPException: 403 if the token belongs to another user and lacks the admin role.
+
+    Returns:
+        ORJSONResponse: Active selections (`list[UserSelectionResponse]`).
+    """
+    return ORJSONResponse(list_selections(db, id))
+
+@router.post("/users/{id}/selections", response_model=SelectionBulkResponse)
+def create_selections(
+    id: int,
+    data: SelectionBulkRequest,
+    db: Session = Depends(get_db),
+    claims: dict = Depends(require_owner_or_admin)
+):
+    """
+    Add targets to a user's watchlist. Targets already followed are left alone.
+
+    Args:
+        id (int): User ID.
+        data (SelectionBulkRequest): Targets to add.
+        db (Session): Database session.
+        claims (dict): Verified claims of the user or an admin.
+
+    Raises:
+        HTTPException: 403 if the token belongs to another user and lacks the admin role,
+            404 if the user is deleted, 422 if a target does not exist.
+
+    Returns:
+        SelectionBulkResponse: Number of targets added and already followed.
+    """
+    return add_selections(db, id, data.selections)
+
+@router.post("/users/{id}/selections/remove", response_model=SelectionBulkResponse)
+def delete_selections(
+    id: int,
+    data: SelectionBulkRequest,
+    db: Session = Depends(get_db),
+    claims: dict = Depends(require_owner_or_admin)
+):
+    """
+    Remove targets from a user's watchlist.
+
+    Args:
+        id (int): User ID.
+        data (SelectionBulkRequest): Targets to remove.
+        db (Session): Database session.
+        claims (dict): Verified claims of the user or an admin.
+
+    Raises:
+        HTTPException: 403 if the token belongs to another user and lacks the admin role,
+            404 if the user is deleted.
+
+    Returns:
+        SelectionBulkResponse: Number of targets removed and not followed in the first place.
+    """
+    return remove_selections(db, id, data.selections)
+
+@router.get("/selections/followers", response_model=list[SelectionFollowersResponse])
+def read_followers(
+    targets: dict[str, list] = Depends(follower_targets),
+    db: Session = Depends(get_read_db),
+    claims: dict = Depends(get_token_claims)
+):
+    """
+    Count the users following each requested target, e.g. `?stock_id=1&stock_id=2&currency_code=EUR`.
+
+    Args:
+        targets (dict[str, list]): Targets per target column.
+        db (Session): Read-only database session (a replica when configured).
+        claims (dict): Verified token claims.
+
+    Returns:
+        ORJSONResponse: One count per target (`list[SelectionFollowersResponse]`), stocks first.
+    """
+    return ORJSONResponse(count_followers(db, targets))
+
+# ----- Async endpoints -----
+@async_router.get("/users/{id}/selections", response_model=list[UserSelectionResponse])
+async def read_selections_async(
+    id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    claims: dict = Depends(require_owner_or_admin_async)
+):
+    """
+    List a user's watchlist (async database mode).
+
+    Args:
+        id (int): User ID.
+        db (AsyncSession): Read-only async database session (a replica when configured).
+        claims (dict): Verified claims of the user or an admin.
+
+    Raises:
+        HTTPException: 403 if the token belongs to another user and lacks the admin role.
+
+    Returns:
+        ORJSONResponse: Active selections (`list[UserSelectionResponse]`).
+    """
+    return ORJSONResponse(await async_selection_service.list_selections(db, id))
+
+@async_router.post("/users/{id}/selections", response_model=SelectionBulkResponse)
+async def create_selections_async(
+    id: int,
+    data: SelectionBulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    claims: dict = Depends(require_owner_or_admin_async)
+):
+    """
+    Add targets to a user's watchlist (async database mode).
+
+    Args:
+        id (int): User ID.
+        data (SelectionBulkRequest): Targets to add.
+        db (AsyncSession): Async database session.
+        claims (dict): Verified claims of the user or an admin.
+
+    Raises:
+        HTTPException: 403 if the token belongs to another user and lacks the admin role,
+            404 if the user is deleted, 422 if a target does not exist.
+
+    Returns:
+        SelectionBulkResponse: Number of targets added and already followed.
+    """
+    return await async_selection_service.add_selections(db, id, data.selections)
+
+@async_router.post("/users/{id}/selections/remove", response_model=SelectionBulkResponse)
+async def delete_selections_async(
+    id: int,
+    data: SelectionBulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    claims: dict = Depends(require_owner_or_admin_async)
+):
+    """
+    Remove targets from a user's watchlist (async database mode).
+
+    Args:
+        id (int): User ID.
+        data (SelectionBulkRequest): Targets to remove.
+        db (AsyncSession): Async database session.
+        claims (dict): Verified claims of the user or an admin.
+
+    Raises:
+        HTTPException: 403 if the token belongs to another user and lacks the admin role,
+            404 if the user is deleted.
+
+    Returns:
+        SelectionBulkResponse: Number of targets removed and not followed in the first place.
+    """
+    return await async_selection_service.remove_selections(db, id, data.selections)
+
+@async_router.get("/selections/followers", response_model=list[SelectionFollowersResponse])
+async def read_followers_async(
+    targets: dict[str, list] = Depends(follower_targets),
+    db: AsyncSession = Depends(get_async_read_db),
+    claims: dict = Depends(get_token_claims)
+):
+    """
+    Count the users following each requested target (async database mode).
+
+    Args:
+        targets (dict[str, list]): Targets per target column.
+        db (AsyncSession): Read-only async database session (a replica when configured).
+        claims (dict): Verified token claims.
+
+    Returns:
+        ORJSONResponse: One count per target (`list[SelectionFollowersResponse]`), stocks first.
+    """
+    return ORJSONResponse(await async_selection_service.count_followers(db, targets))
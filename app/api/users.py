@@ -2,143 +2,549 @@
 User management endpoints for FastAPI.
 
 This module provides routes to:
-1. List all users (admin only)
-2. Retrieve a single user profile
-3. Update a user profile
-4. Delete a user profile
+1. List users, one keyset page at a time (admin only)
+2. Stream all users as NDJSON (admin only)
+3. Search users by username, email or phone number (admin only)
+4. Retrieve a single user profile
+5. Update a user profile
+6. Delete a user profile
+7. Bulk-import users from CSV or NDJSON (admin only, sync mode)
+8. Replace a user's roles (admin only)
 
 All routes require a valid JWT access token, and certain actions are restricted to admin users.
+The admin check reads the token's role claims (see `require_role`), so only the
+target user is loaded, through the session's identity map.
+Read-only routes use `get_read_db`, which is served by a read replica when
+replicas are configured. They select only the profile columns and return the
+rows as an `ORJSONResponse`: the response model documents them, but rows read
+from the database are not validated again on the way out.
+
+Profiles and pages carry an ETag (see `app.core.etags`). A GET with a current
+`If-None-Match` is answered with 304 after a version-only query, and PUT and
+DELETE honor `If-Match`, failing with 412 when the user changed in between.
+
+`router` uses the sync database session; `async_router` exposes the same routes
+backed by `AsyncSession` and is mounted instead when `DB_ASYNC_MODE` is enabled.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import tempfile
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.core.deps import get_current_user
-from app.models.user import User
-from app.schemas.user import UserProfileResponse, UserUpdateRequest
-from app.services.user_service import get_user_profile, update_user_profile, delete_user_profile
+from app.db.session import get_db, get_async_db, get_read_db, get_async_read_db
+from app.core.deps import require_admin, require_admin_async
+from app.core.etags import cache_headers, match, none_match, not_modified, precondition_failed, profile_etag
+from app.models.user import DELETED_STATUS, User
+from app.schemas.user import (
+    UserProfileResponse, UserUpdateRequest, UserImportResponse, UserRolesRequest, UserRolesResponse
+)
+from app.services import async_search_service, async_user_service
+from app.services.import_service import import_users
+from app.services.search_index import SEARCH_FIELDS
+from app.services.search_service import search_users
+from app.services.user_service import (
+    get_user_profile, get_user_profile_row, get_user_version, update_user_profile, delete_user_profile,
+    list_user_profiles, get_page_etag, stream_user_profiles, set_user_roles
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
+async_router = APIRouter(prefix="/users", tags=["users"])
+
+SEARCH_FIELD_PATTERN = f"^({'|'.join(SEARCH_FIELDS)})$"
 
 # ----- Helper function -----
-def verify_admin(db: Session, user_id: int):
+def verify_target(user: User, if_match: str | None):
     """
-    Verify that the user is an admin.
+    Verify that the user about to be written is not deleted and matches the client's `If-Match`.
 
     Args:
-        db (Session): Database session.
-        user_id (int): ID of the user to check.
+        user (User): Target user, loaded for the write.
+        if_match (str | None): The `If-Match` request header.
 
     Raises:
-        HTTPException: 403 if the user is not an admin (status != 3).
+        HTTPException: 403 if the target user is deleted,
+            412 if `If-Match` does not name its current version.
+    """
+    if user.status == DELETED_STATUS:
+        raise HTTPException(status_code=403, detail="Target user not active")
+    if not match(if_match, profile_etag(user.version)):
+        raise precondition_failed()
+
+def page_response(users: list[dict], next_cursor: int | str | None, etag: str | None = None) -> ORJSONResponse:
+    """
+    Serialize a page of profile rows, with the next-page cursor and caching headers.
+
+    Args:
+        users (list[dict]): Profile rows.
+        next_cursor (int | str | None): Cursor of the next page, None on the last page.
+        etag (str | None): ETag of the page, None for pages that are not cached (search results).
 
     Returns:
-        User: The admin user instance.
+        ORJSONResponse: The rows as a JSON array.
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user or user.status != 3:
-        raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
-    return user
+    headers = cache_headers(etag) if etag else {}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+    return ORJSONResponse(users, headers=headers)
+
+def profile_response(profile: dict) -> ORJSONResponse:
+    """
+    Serialize a user's profile row, with its ETag.
+
+    Args:
+        profile (dict): Profile columns plus `status` and `version`, as returned by `get_user_profile_row`.
+
+    Raises:
+        HTTPException: 403 if the user is deleted.
+
+    Returns:
+        ORJSONResponse: The profile without its status and version.
+    """
+    if profile.pop("status") == DELETED_STATUS:
+        raise HTTPException(status_code=403, detail="Target user not active")
+    etag = profile_etag(profile.pop("version"))
+    return ORJSONResponse(profile, headers=cache_headers(etag))
 
 # ----- Endpoints -----
 @router.get("/", response_model=list[UserProfileResponse])
 def read_all_users(
+    cursor: int | None = Query(None, description="ID of the last user on the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_read_db),
+    claims: dict = Depends(require_admin)
+):
+    """
+    Retrieve one page of users with status != 0, ordered by ID. Admin-only access.
+
+    Pages use keyset pagination on `id`: pass the `X-Next-Cursor` response
+    header as `cursor` to fetch the next page. The header is absent on the last page.
+    When `If-None-Match` names the page's ETag, only an aggregate of the page's
+    IDs and versions is read and the response is a 304.
+
+    Args:
+        cursor (int | None): ID of the last user on the previous page.
+        limit (int): Maximum number of users to return (1-1000).
+        if_none_match (str | None): ETag of the client's copy of the page.
+        db (Session): Read-only database session (a replica when configured).
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        ORJSONResponse: Page of active users (`list[UserProfileResponse]`), or an empty 304.
+    """
+    if if_none_match:
+        etag = get_page_etag(db, cursor, limit)
+        if none_match(if_none_match, etag):
+            return not_modified(etag)
+    return page_response(*list_user_profiles(db, cursor, limit))
+
+@router.get("/stream")
+def stream_all_users(claims: dict = Depends(require_admin)):
+    """
+    Stream every user with status != 0 as newline-delimited JSON. Admin-only access.
+
+    Rows are read from the database in batches and written as they arrive,
+    so memory stays flat regardless of table size.
+
+    Args:
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        StreamingResponse: One `UserProfileResponse` JSON object per line.
+    """
+    return StreamingResponse(stream_user_profiles(), media_type="application/x-ndjson")
+
+@router.get("/search", response_model=list[UserProfileResponse])
+def search_all_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix or substring to look for"),
+    field: str = Query("username", pattern=SEARCH_FIELD_PATTERN),
+    mode: str = Query("prefix", pattern="^(prefix|contains)$"),
+    cursor: str | None = Query(None, max_length=100, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    claims: dict = Depends(require_admin)
+):
+    """
+    Search users with status != 0 by username, email or phone number. Admin-only access.
+
+    `prefix` seeks the column's unique index and orders the results by the
+    searched column; `contains` (at least three characters, case-insensitive)
+    uses the trigram index and orders them by ID. Either way only one page
+    is read: pass the `X-Next-Cursor` response header as `cursor` to fetch
+    the next one.
+
+    Args:
+        q (str): Search term.
+        field (str): "username", "email" or "phone_number".
+        mode (str): "prefix" or "contains".
+        cursor (str | None): Cursor of the previous page.
+        limit (int): Maximum number of users to return (1-1000).
+        db (Session): Read-only database session (a replica when configured).
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin,
+            422 if a substring term is too short or the cursor is invalid.
+
+    Returns:
+        ORJSONResponse: Matching users (`list[UserProfileResponse]`).
+    """
+    return page_response(*search_users(db, field, q, mode, cursor, limit))
+
+@router.post("/import", response_model=UserImportResponse)
+async def bulk_import_users(
+    request: Request,
+    format: str | None = Query(None, pattern="^(csv|ndjson)$"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    claims: dict = Depends(require_admin)
 ):
     """
-    Retrieve all users with status != 0. Admin-only access.
+    Bulk-import users from the raw request body. Admin-only access.
+
+    The body is either CSV with a `username,phone_number,email,password` header
+    or NDJSON with one object per line. Passwords are hashed in parallel and
+    rows are inserted in batches of `IMPORT_BATCH_SIZE`; invalid rows and rows
+    whose username, email or phone number is taken are reported, not fatal.
 
     Args:
+        request (Request): Incoming request whose body holds the rows.
+        format (str | None): "csv" or "ndjson". Inferred from Content-Type when omitted.
         db (Session): Database session.
-        current_user (User): Current authenticated user.
+        claims (dict): Verified claims of the admin's token.
 
     Raises:
         HTTPException: 403 if current user is not admin.
 
     Returns:
-        List[UserProfileResponse]: List of active users.
+        UserImportResponse: Inserted count plus per-row conflicts and errors.
     """
-    verify_admin(db, current_user.id)
-    users = db.query(User).filter(User.status != 0).all()
-    return users
+    if format is None:
+        format = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+
+    # Spool the upload (to disk past 16 MB) so the import can run in a worker thread
+    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        return await run_in_threadpool(import_users, db, upload, format)
 
 @router.get("/{id}", response_model=UserProfileResponse)
 def read_user(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_read_db),
+    claims: dict = Depends(require_admin)
 ):
     """
     Retrieve a single user profile by ID. Admin-only access.
 
+    When `If-None-Match` names the profile's ETag, only the user's version is
+    read and the response is a 304.
+
     Args:
         id (int): User ID.
-        db (Session): Database session.
-        current_user (User): Current authenticated user.
+        if_none_match (str | None): ETag of the client's copy of the profile.
+        db (Session): Read-only database session (a replica when configured).
+        claims (dict): Verified claims of the admin's token.
 
     Raises:
-        HTTPException: 403 if current user is not admin or target user is not active.
+        HTTPException: 403 if current user is not admin or target user is deleted.
 
     Returns:
-        UserProfileResponse: Target user profile.
+        ORJSONResponse: Target user profile (`UserProfileResponse`), or an empty 304.
     """
-    verify_admin(db, current_user.id)
-    user = get_user_profile(db, id)
-    if user.status != 3:
-        raise HTTPException(status_code=403, detail="Target user not active")
-    return user
+    if if_none_match:
+        user_status, version = get_user_version(db, id)
+        if user_status != DELETED_STATUS and none_match(if_none_match, profile_etag(version)):
+            return not_modified(profile_etag(version))
+    return profile_response(get_user_profile_row(db, id))
 
 @router.put("/{id}", response_model=UserProfileResponse)
 def update_user(
     id: int,
     data: UserUpdateRequest,
+    response: Response,
+    if_match: str | None = Header(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    claims: dict = Depends(require_admin)
 ):
     """
     Update a user profile. Admin-only access.
 
+    With `If-Match`, the update only applies if the profile is still the
+    version the client read; without it, the last writer wins.
+
     Args:
         id (int): User ID.
         data (UserUpdateRequest): User update data.
+        response (Response): Outgoing response, which receives the new ETag.
+        if_match (str | None): ETag of the profile the update is based on.
         db (Session): Database session.
-        current_user (User): Current authenticated user.
+        claims (dict): Verified claims of the admin's token.
 
     Raises:
-        HTTPException: 403 if current user is not admin or target user is not active.
+        HTTPException: 403 if current user is not admin or target user is deleted,
+            412 if the profile changed since the client read it.
 
     Returns:
         UserProfileResponse: Updated user profile.
     """
-    verify_admin(db, current_user.id)
     user = get_user_profile(db, id)
-    if user.status != 3:
-        raise HTTPException(status_code=403, detail="Target user not active")
-    return update_user_profile(db, id, data)
+    verify_target(user, if_match)
+    user = update_user_profile(db, user, data)
+    response.headers.update(cache_headers(profile_etag(user.version)))
+    return user
 
 @router.delete("/{id}")
 def delete_user(
     id: int,
+    if_match: str | None = Header(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    claims: dict = Depends(require_admin)
 ):
     """
     Delete a user profile. Admin-only access.
 
     Args:
         id (int): User ID.
+        if_match (str | None): ETag of the profile the deletion is based on.
         db (Session): Database session.
-        current_user (User): Current authenticated user.
+        claims (dict): Verified claims of the admin's token.
 
     Raises:
-        HTTPException: 403 if current user is not admin or target user is not active.
+        HTTPException: 403 if current user is not admin or target user is deleted,
+            412 if the profile changed since the client read it.
 
     Returns:
         dict: Success message upon deletion.
     """
-    verify_admin(db, current_user.id)
     user = get_user_profile(db, id)
-    if user.status != 3:
-        raise HTTPException(status_code=403, detail="Target user not active")
-    return delete_user_profile(db, id)
\ No newline at end of file
+    verify_target(user, if_match)
+    return delete_user_profile(db, user)
+
+@router.put("/{id}/roles", response_model=UserRolesResponse)
+def update_user_roles(
+    id: int,
+    data: UserRolesRequest,
+    db: Session = Depends(get_db),
+    claims: dict = Depends(require_admin)
+):
+    """
+    Replace a user's roles. Admin-only access.
+
+    Tokens the user received before the change stop authorizing role-protected
+    routes (401) until they are refreshed, in this worker at once and in the
+    others within `PERMISSIONS_CACHE_TTL_SECONDS`.
+
+    Args:
+        id (int): User ID.
+        data (UserRolesRequest): The complete set of roles.
+        db (Session): Database session.
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin, 404 if the user does not exist.
+
+    Returns:
+        UserRolesResponse: The stored roles and the new permissions version.
+    """
+    return set_user_roles(db, get_user_profile(db, id), data.roles)
+
+# ----- Async endpoints -----
+@async_router.get("/", response_model=list[UserProfileResponse])
+async def read_all_users_async(
+    cursor: int | None = Query(None, description="ID of the last user on the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    claims: dict = Depends(require_admin_async)
+):
+    """
+    Retrieve one page of users with status != 0, ordered by ID. Admin-only access (async database mode).
+
+    Args:
+        cursor (int | None): ID of the last user on the previous page.
+        limit (int): Maximum number of users to return (1-1000).
+        if_none_match (str | None): ETag of the client's copy of the page.
+        db (AsyncSession): Read-only async database session (a replica when configured).
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        ORJSONResponse: Page of active users (`list[UserProfileResponse]`), or an empty 304.
+    """
+    if if_none_match:
+        etag = await async_user_service.get_page_etag(db, cursor, limit)
+        if none_match(if_none_match, etag):
+            return not_modified(etag)
+    return page_response(*await async_user_service.list_user_profiles(db, cursor, limit))
+
+@async_router.get("/stream")
+async def stream_all_users_async(claims: dict = Depends(require_admin_async)):
+    """
+    Stream every user with status != 0 as newline-delimited JSON. Admin-only access (async database mode).
+
+    Args:
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin.
+
+    Returns:
+        StreamingResponse: One `UserProfileResponse` JSON object per line.
+    """
+    return StreamingResponse(async_user_service.stream_user_profiles(), media_type="application/x-ndjson")
+
+@async_router.get("/search", response_model=list[UserProfileResponse])
+async def search_all_users_async(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix or substring to look for"),
+    field: str = Query("username", pattern=SEARCH_FIELD_PATTERN),
+    mode: str = Query("prefix", pattern="^(prefix|contains)$"),
+    cursor: str | None = Query(None, max_length=100, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_read_db),
+    claims: dict = Depends(require_admin_async)
+):
+    """
+    Search users with status != 0 by username, email or phone number. Admin-only access (async database mode).
+
+    Args:
+        q (str): Search term.
+        field (str): "username", "email" or "phone_number".
+        mode (str): "prefix" or "contains".
+        cursor (str | None): Cursor of the previous page.
+        limit (int): Maximum number of users to return (1-1000).
+        db (AsyncSession): Read-only async database session (a replica when configured).
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin,
+            422 if a substring term is too short or the cursor is invalid.
+
+    Returns:
+        ORJSONResponse: Matching users (`list[UserProfileResponse]`).
+    """
+    return page_response(*await async_search_service.search_users(db, field, q, mode, cursor, limit))
+
+@async_router.get("/{id}", response_model=UserProfileResponse)
+async def read_user_async(
+    id: int,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    claims: dict = Depends(require_admin_async)
+):
+    """
+    Retrieve a single user profile by ID. Admin-only access (async database mode).
+
+    Args:
+        id (int): User ID.
+        if_none_match (str | None): ETag of the client's copy of the profile.
+        db (AsyncSession): Read-only async database session (a replica when configured).
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin or target user is deleted.
+
+    Returns:
+        ORJSONResponse: Target user profile (`UserProfileResponse`), or an empty 304.
+    """
+    if if_none_match:
+        user_status, version = await async_user_service.get_user_version(db, id)
+        if user_status != DELETED_STATUS and none_match(if_none_match, profile_etag(version)):
+            return not_modified(profile_etag(version))
+    return profile_response(await async_user_service.get_user_profile_row(db, id))
+
+@async_router.put("/{id}", response_model=UserProfileResponse)
+async def update_user_async(
+    id: int,
+    data: UserUpdateRequest,
+    response: Response,
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    claims: dict = Depends(require_admin_async)
+):
+    """
+    Update a user profile. Admin-only access (async database mode).
+
+    Args:
+        id (int): User ID.
+        data (UserUpdateRequest): User update data.
+        response (Response): Outgoing response, which receives the new ETag.
+        if_match (str | None): ETag of the profile the update is based on.
+        db (AsyncSession): Async database session.
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin or target user is deleted,
+            412 if the profile changed since the client read it.
+
+    Returns:
+        UserProfileResponse: Updated user profile.
+    """
+    user = await async_user_service.get_user_profile(db, id)
+    verify_target(user, if_match)
+    user = await async_user_service.update_user_profile(db, user, data)
+    response.headers.update(cache_headers(profile_etag(user.version)))
+    return user
+
+@async_router.delete("/{id}")
+async def delete_user_async(
+    id: int,
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    claims: dict = Depends(require_admin_async)
+):
+    """
+    Delete a user profile. Admin-only access (async database mode).
+
+    Args:
+        id (int): User ID.
+        if_match (str | None): ETag of the profile the deletion is based on.
+        db (AsyncSession): Async database session.
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin or target user is deleted,
+            412 if the profile changed since the client read it.
+
+    Returns:
+        dict: Success message upon deletion.
+    """
+    user = await async_user_service.get_user_profile(db, id)
+    verify_target(user, if_match)
+    return await async_user_service.delete_user_profile(db, user)
+
+@async_router.put("/{id}/roles", response_model=UserRolesResponse)
+async def update_user_roles_async(
+    id: int,
+    data: UserRolesRequest,
+    db: AsyncSession = Depends(get_async_db),
+    claims: dict = Depends(require_admin_async)
+):
+    """
+    Replace a user's roles. Admin-only access (async database mode).
+
+    Args:
+        id (int): User ID.
+        data (UserRolesRequest): The complete set of roles.
+        db (AsyncSession): Async database session.
+        claims (dict): Verified claims of the admin's token.
+
+    Raises:
+        HTTPException: 403 if current user is not admin, 404 if the user does not exist.
+
+    Returns:
+        UserRolesResponse: The stored roles and the new permissions version.
+    """
+    user = await async_user_service.get_user_profile(db, id)
+    return await async_user_service.set_user_roles(db, user, data.roles)
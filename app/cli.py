@@ -0,0 +1,145 @@
+"""
+Command-line entry point for administrative tasks.
+
+Usage:
+    python -m app.cli init-db
+    python -m app.cli import-users users.csv
+    python -m app.cli import-users users.ndjson --format ndjson --batch-size 5000
+    python -m app.cli set-roles 1 admin
+    python -m app.cli rebuild-search-index
+    python -m app.cli purge-deleted-users --retention-days 30
+    python -m app.cli prune-refresh-tokens
+"""
+
+import argparse
+import sys
+
+from app.core.roles import Role
+from app.db.session import SessionLocal, get_engine
+from app.services.import_service import import_users
+
+
+def _import_users(args: argparse.Namespace) -> int:
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    db = SessionLocal()
+    try:
+        if args.path == "-":
+            report = import_users(db, sys.stdin.buffer, fmt, args.batch_size)
+        else:
+            with open(args.path, "rb") as stream:
+                report = import_users(db, stream, fmt, args.batch_size)
+    finally:
+        db.close()
+
+    for conflict in report.conflicts:
+        print(f"row {conflict.row}: {conflict.field} {conflict.value!r} already in use", file=sys.stderr)
+    for error in report.errors:
+        print(f"row {error.row}: {error.detail}", file=sys.stderr)
+    print(f"inserted={report.inserted} conflicts={len(report.conflicts)} errors={len(report.errors)}")
+    return 0
+
+
+def _init_db(args: argparse.Namespace) -> int:
+    from app.db.bootstrap import create_schema
+
+    engine = get_engine()
+    created = create_schema(engine)
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"created: {', '.join(created) if created else 'nothing, all tables exist'}")
+    return 0
+
+
+def _set_roles(args: argparse.Namespace) -> int:
+    from app.services.user_service import get_user_profile, set_user_roles
+
+    db = SessionLocal()
+    try:
+        result = set_user_roles(db, get_user_profile(db, args.user_id), [Role(role) for role in args.roles])
+    finally:
+        db.close()
+    print(f"user {result.id}: roles={' '.join(result.roles) or '-'} permissions_version={result.permissions_version}")
+    return 0
+
+
+def _rebuild_search_index(args: argparse.Namespace) -> int:
+    from app.services.search_index import INDEX_BATCH_SIZE, rebuild_search_index
+
+    db = SessionLocal()
+    try:
+        done = 0
+        for done in rebuild_search_index(db, args.batch_size or INDEX_BATCH_SIZE):
+            print(f"indexed={done}", end="\r", file=sys.stderr)
+    finally:
+        db.close()
+    print(f"indexed={done}")
+    return 0
+
+
+def _purge_deleted_users(args: argparse.Namespace) -> int:
+    from app.services.purge_service import purge_deleted_users
+
+    db = SessionLocal()
+    try:
+        purged = purge_deleted_users(
+            db, args.retention_days, args.batch_size,
+            progress=lambda done: print(f"purged={done}", end="\r", file=sys.stderr),
+        )
+    finally:
+        db.close()
+    print(f"purged={purged}")
+    return 0
+
+
+def _prune_refresh_tokens(args: argparse.Namespace) -> int:
+    from app.services.purge_service import prune_refresh_tokens
+
+    db = SessionLocal()
+    try:
+        pruned = prune_refresh_tokens(
+            db, args.batch_size, progress=lambda done: print(f"pruned={done}", end="\r", file=sys.stderr)
+        )
+    finally:
+        db.close()
+    print(f"pruned={pruned}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = commands.add_parser("init-db", help="Create missing tables (and reference table stand-ins)")
+    init_parser.set_defaults(handler=_init_db)
+
+    import_parser = commands.add_parser("import-users", help="Bulk-import users from CSV or NDJSON")
+    import_parser.add_argument("path", help="File to import, or - for stdin")
+    import_parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    import_parser.add_argument("--batch-size", type=int, help="Rows per INSERT batch (default: IMPORT_BATCH_SIZE)")
+    import_parser.set_defaults(handler=_import_users)
+
+    roles_parser = commands.add_parser("set-roles", help="Replace a user's roles (e.g. grant the first admin)")
+    roles_parser.add_argument("user_id", type=int)
+    roles_parser.add_argument("roles", nargs="*", choices=[role.value for role in Role], help="Omit to remove all roles")
+    roles_parser.set_defaults(handler=_set_roles)
+
+    search_parser = commands.add_parser(
+        "rebuild-search-index", help="Rebuild the substring search index of all users (e.g. after a migration)"
+    )
+    search_parser.add_argument("--batch-size", type=int, help="Users per committed batch (default: 500)")
+    search_parser.set_defaults(handler=_rebuild_search_index)
+
+    purge_parser = commands.add_parser("purge-deleted-users", help="Remove users deleted longer ago than the retention window")
+    purge_parser.add_argument("--retention-days", type=float, help="Default: USER_RETENTION_DAYS (0 purges every deleted user)")
+    purge_parser.add_argument("--batch-size", type=int, help="Users per transaction (default: PURGE_BATCH_SIZE)")
+    purge_parser.set_defaults(handler=_purge_deleted_users)
+
+    prune_parser = commands.add_parser("prune-refresh-tokens", help="Delete expired refresh tokens")
+    prune_parser.add_argument("--batch-size", type=int, help="Rows per transaction (default: PURGE_BATCH_SIZE)")
+    prune_parser.set_defaults(handler=_prune_refresh_tokens)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
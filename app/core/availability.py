@@ -0,0 +1,181 @@
+"""
+In-process Bloom filter of the usernames, emails and phone numbers in use.
+
+Registration and `GET /api/auth/availability` need to know whether a value is
+taken. This module provides:
+1. `BloomFilter`, a fixed-size bit array with `k` hash functions derived from
+   one BLAKE2b digest (double hashing). It has no false negatives: a value
+   that was added is always reported as possibly present.
+2. `AvailabilityFilter`, which holds the current filter, answers "definitely
+   free" for values it has never seen, and is rebuilt from the `users` table
+   at startup and every `AVAILABILITY_FILTER_REFRESH_SECONDS`. Values written
+   by this process are added immediately. While a rebuild is running, they go
+   to both the old and the new filter, so none is lost by the swap.
+
+Values are compared lowercased and without trailing spaces, like a
+case-insensitive SQL Server collation, so the filter never calls a value free
+that the unique indexes would reject. Values written by other workers are only
+picked up by the next rebuild. Until then, the unique indexes still reject
+duplicates, so a stale filter costs a late 409, never a duplicate user.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections.abc import Iterable
+
+from app.core.config import settings
+
+# ----- Bloom filter -----
+class BloomFilter:
+    """
+    Bloom filter sized for a number of items and a false positive rate.
+
+    Args:
+        capacity (int): Expected number of items.
+        error_rate (float): Target false positive rate at `capacity` items.
+
+    Raises:
+        ValueError: If the false positive rate is not between 0 and 1.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        if not 0 < error_rate < 1:
+            raise ValueError("AVAILABILITY_FILTER_ERROR_RATE must be between 0 and 1")
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        """
+        Args:
+            key (str): Item to add.
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+# ----- Availability filter -----
+def _key(field: str, value: str) -> str:
+    return f"{field}:{value.rstrip(' ').lower()}"
+
+class AvailabilityFilter:
+    """
+    Thread-safe holder of the Bloom filter of values in use.
+
+    Args:
+        capacity (int): Expected number of users (each adds three values).
+        error_rate (float): Target false positive rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter: BloomFilter | None = None
+        self._loading: BloomFilter | None = None
+        self._lock = threading.Lock()
+        self.loaded_at: float | None = None
+        self.checks = 0
+        self.free = 0
+
+    @property
+    def ready(self) -> bool:
+        """bool: True once the first load has completed."""
+        return self._filter is not None
+
+    def might_be_taken(self, field: str, value: str) -> bool:
+        """
+        Args:
+            field (str): "username", "email" or "phone_number".
+            value (str): Requested value.
+
+        Returns:
+            bool: False if the value is definitely free, True if the database
+            must be asked (also before the first load).
+        """
+        current = self._filter
+        if current is None:
+            return True
+        taken = _key(field, value) in current
+        self.checks += 1
+        if not taken:
+            self.free += 1
+        return taken
+
+    def add(self, values: dict[str, str | None]) -> None:
+        """
+        Record the values of a user written by this process.
+
+        Args:
+            values (dict[str, str | None]): Column values keyed by field name.
+        """
+        with self._lock:
+            for target in (self._filter, self._loading):
+                if target is not None:
+                    for field, value in values.items():
+                        if value:
+                            target.add(_key(field, value))
+
+    def begin_load(self) -> None:
+        """Start building a new filter; `add` writes to it too from now on."""
+        with self._lock:
+            self._loading = BloomFilter(self.capacity * 3, self.error_rate)
+
+    def load(self, rows: Iterable) -> None:
+        """
+        Add a batch of existing users to the filter being built.
+
+        Args:
+            rows (Iterable): Rows with the username, email and phone_number columns.
+        """
+        with self._lock:
+            target = self._loading
+            for row in rows:
+                for field in ("username", "email", "phone_number"):
+                    value = getattr(row, field)
+                    if value:
+                        target.add(_key(field, value))
+
+    def finish_load(self) -> None:
+        """Replace the current filter with the one just built."""
+        with self._lock:
+            self._filter, self._loading = self._loading, None
+            self.loaded_at = time.time()
+
+    def abort_load(self) -> None:
+        """Drop a partially built filter, keeping the current one."""
+        with self._lock:
+            self._loading = None
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: Readiness, size, item count and check counters.
+        """
+        current = self._filter
+        return {
+            "enabled": settings.AVAILABILITY_FILTER_ENABLED,
+            "ready": current is not None,
+            "loaded_at": self.loaded_at,
+            "capacity": self.capacity * 3,
+            "items": current.count if current else 0,
+            "bits": current.size if current else 0,
+            "hashes": current.hashes if current else 0,
+            "checks": self.checks,
+            "definitely_free": self.free,
+        }
+
+availability_filter = AvailabilityFilter(settings.AVAILABILITY_FILTER_CAPACITY, settings.AVAILABILITY_FILTER_ERROR_RATE)
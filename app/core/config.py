@@ -5,24 +5,158 @@ class Settings(BaseSettings):
     Application configuration loaded from environment variables or a .env file.
     
     Attributes:
-        SQL_SERVER_USER (str): Username to connect to the SQL Server database.
-        SQL_SERVER_PASSWORD (str): Password for the SQL Server database user.
-        SQL_SERVER_HOST (str): Hostname or IP of the SQL Server instance.
-        SQL_SERVER_PORT (int): Port number of the SQL Server instance.
-        SQL_SERVER_DB (str): Name of the database to connect to.
+        SQL_SERVER_USER (str | None): Username to connect to the SQL Server database.
+        SQL_SERVER_PASSWORD (str | None): Password for the SQL Server database user.
+        SQL_SERVER_HOST (str | None): Hostname or IP of the SQL Server instance.
+        SQL_SERVER_PORT (int | None): Port number of the SQL Server instance.
+        SQL_SERVER_DB (str | None): Name of the database to connect to.
         SQL_SERVER_DRIVER (str): ODBC driver used for connecting to SQL Server.
+            The SQL_SERVER_* settings are only required without DATABASE_URL / ASYNC_DATABASE_URL.
         SECRET_KEY (str): Secret key used for JWT token encoding/decoding and other security-related operations.
-        ALGORITHM (str): Algorithm used for JWT token encoding/decoding.
+        ALGORITHM (str): JWT algorithm: HS256/384/512 with SECRET_KEY, or RS256/384/512 and ES256/384/512 with JWT_KEYS_DIR.
+        DB_POOL_SIZE (int): Connections kept open in the pool.
+        DB_MAX_OVERFLOW (int): Extra connections allowed above DB_POOL_SIZE under load.
+        DB_POOL_RECYCLE (int): Seconds after which a connection is replaced (-1 disables).
+        DB_POOL_TIMEOUT (float): Seconds to wait for a free connection before failing.
+        DB_POOL_WARMUP (int): Connections each engine opens at startup (capped at DB_POOL_SIZE; 0 opens them on demand).
+        DB_PRE_PING (str): Liveness check on checkout: "always", "idle" (only after DB_PRE_PING_IDLE_SECONDS) or "never".
+        DB_PRE_PING_IDLE_SECONDS (float): Idle time after which the "idle" strategy pings a connection.
+        DB_FAST_EXECUTEMANY (bool): Enable pyodbc fast_executemany for bulk statements.
+        HASH_EXECUTOR (str): Executor used for password hashing, "thread" or "process".
+        HASH_WORKERS (int | None): Number of hashing workers. Defaults to the CPU count.
+        HASH_MAX_QUEUE (int): Hashing jobs allowed to wait for a worker before requests get a 503.
+        DB_ASYNC_MODE (bool): Serve the API with the async engine, sessions and routers.
+        ASYNC_DATABASE_URL (str | None): Async database URL. Defaults to the async driver for DATABASE_URL, then SQL Server through aioodbc.
+        DB_CREATE_SCHEMA (bool): Create missing tables at startup (local development and tests).
+        TOKEN_CACHE_ENABLED (bool): Cache verified tokens' claims in process.
+        TOKEN_CACHE_MAX_SIZE (int): Maximum number of cached tokens (least recently used are evicted).
+        TOKEN_CACHE_TTL_SECONDS (float): Maximum lifetime of a cache entry; bounds staleness across workers.
+        IMPORT_BATCH_SIZE (int): Rows inserted per statement batch by the bulk user import.
+        IMPORT_HASH_WORKERS (int | None): Threads hashing passwords during a bulk import. Defaults to the CPU count.
+        REVOCATION_BACKEND (str): Token revocation store: "memory", "sql" or "redis".
+        REVOCATION_SYNC_SECONDS (float): How often revocations are purged and, for "sql", re-synced from the database.
+        REDIS_URL (str | None): Redis URL for the "redis" revocation backend.
+        ACCESS_TOKEN_EXPIRE_MINUTES (int): Lifetime of access tokens. Keep it short, clients renew through /api/auth/refresh.
+        REFRESH_TOKEN_EXPIRE_DAYS (int): Lifetime of a refresh token (each rotation issues a new one).
+        METRICS_ENABLED (bool): Record request metrics and serve them in the Prometheus format at /metrics.
+            Off by default: like /api/internal, /metrics has no authentication and must stay on the private network.
+        SERVER_TIMING_ENABLED (bool): Add a Server-Timing header (pool, SQL, hashing and JWT time) to every response.
+        PROFILER_ENABLED (bool): Profile every request and keep the ones slower than PROFILER_THRESHOLD_MS.
+        PROFILER_HEADER_ENABLED (bool): Profile requests sent by admins with an "X-Profile: 1" header.
+        PROFILER_ENGINE (str): Profiler engine, "sampling" (stack sampling, concurrent captures) or "cprofile" (one request at a time).
+        PROFILER_THRESHOLD_MS (float): Minimum duration of a request kept by PROFILER_ENABLED.
+        PROFILER_SAMPLE_INTERVAL_MS (float): Interval between stack samples of the "sampling" engine.
+        PROFILER_MAX_PROFILES (int): Profiles kept in memory; the oldest are dropped first.
+        RATE_LIMIT_ENABLED (bool): Limit login attempts per client IP and failed login attempts per email.
+        RATE_LIMIT_BACKEND (str): Rate limit counters: "memory" (per process) or "redis" (shared, uses REDIS_URL).
+        RATE_LIMIT_MAX_KEYS (int): Keys tracked by the "memory" rate limit backend; the least recently used are dropped.
+        RATE_LIMIT_TRUST_FORWARDED (bool): Take the client IP from X-Forwarded-For (only behind a trusted proxy).
+        LOGIN_IP_LIMIT (int): Login attempts allowed per client IP per LOGIN_IP_WINDOW_SECONDS.
+        LOGIN_IP_WINDOW_SECONDS (float): Sliding window of the per-IP login limit.
+        LOGIN_EMAIL_LIMIT (int): Failed login attempts allowed per email per LOGIN_EMAIL_WINDOW_SECONDS.
+        LOGIN_EMAIL_WINDOW_SECONDS (float): Sliding window of the per-email login limit.
+        PASSWORD_SCHEMES (list[str]): Accepted password hash schemes (JSON list). The first hashes new passwords; hashes in the others are upgraded on login.
+        BCRYPT_ROUNDS (int): bcrypt cost factor. Hashes with a different cost are re-hashed on login.
+        ARGON2_TIME_COST (int): argon2 iterations (requires the `argon2` extra).
+        ARGON2_MEMORY_COST (int): argon2 memory in KiB.
+        ARGON2_PARALLELISM (int): argon2 lanes.
+        JWT_KEYS_DIR (str | None): Directory of `<kid>.pem` keys for RS*/ES* algorithms (private keys sign, public ones only verify).
+        JWT_ACTIVE_KID (str | None): Key ID that signs new tokens and is written to their `kid` header.
+        JWKS_MAX_AGE_SECONDS (int): How long clients may cache the JWKS document.
+        DATABASE_URL (str | None): Sync database URL (sqlite, postgresql or mssql+pyodbc). Defaults to the sync driver for ASYNC_DATABASE_URL, then SQL Server through pyodbc.
+        DATABASE_REPLICA_URLS (list[str]): Sync read replica URLs (JSON list) for read-only endpoints.
+        ASYNC_DATABASE_REPLICA_URLS (list[str]): Async read replica URLs (JSON list).
+        DB_REPLICA_CHECK_SECONDS (float): Interval of the replica health checks.
+        DB_READ_YOUR_WRITES_SECONDS (float): After a user writes, their reads use the primary for this long (0 disables).
+        SQLITE_PRAGMAS (dict[str, str]): PRAGMA statements run on every new SQLite connection (JSON object).
+        PERMISSIONS_CACHE_MAX_SIZE (int): Maximum number of cached permissions versions (see `app.core.roles`).
+        PERMISSIONS_CACHE_TTL_SECONDS (float): Lifetime of a cached permissions version; other workers honor role changes after at most this long (0: no cache).
+        AVAILABILITY_FILTER_ENABLED (bool): Keep a Bloom filter of the usernames, emails and phone numbers in use, so registration and availability checks skip the database for values that are definitely free (see `app.core.availability`).
+        AVAILABILITY_FILTER_CAPACITY (int): Number of users the availability filter is sized for; beyond it, false positives (database lookups) grow.
+        AVAILABILITY_FILTER_ERROR_RATE (float): False positive rate of the availability filter at capacity.
+        AVAILABILITY_FILTER_REFRESH_SECONDS (float): Interval between rebuilds of the availability filter from the users table, which pick up other workers' writes and forget deleted values (0: load once at startup).
+        USER_RETENTION_DAYS (float): Days a deleted user is kept (hidden, with status 0) before the purge removes it for good.
+        PURGE_ENABLED (bool): Run the purge of deleted users and expired refresh tokens as a background task of this worker (enable it on one worker, or run `python -m app.cli purge-deleted-users` and `prune-refresh-tokens` on a schedule instead).
+        PURGE_INTERVAL_SECONDS (float): Interval between purge runs of the background task.
+        PURGE_BATCH_SIZE (int): Users deleted per purge transaction, with their selections, search trigrams and refresh tokens (and expired refresh tokens deleted per transaction).
+        PURGE_BATCH_PAUSE_SECONDS (float): Pause between purge batches, leaving the tables to other writers.
+        INTERNAL_STATS_ENABLED (bool): Mount the internal stats endpoints under /api/internal.
     """
 
-    SQL_SERVER_USER: str
-    SQL_SERVER_PASSWORD: str
-    SQL_SERVER_HOST: str
-    SQL_SERVER_PORT: int
-    SQL_SERVER_DB: str
-    SQL_SERVER_DRIVER: str
+    SQL_SERVER_USER: str | None = None
+    SQL_SERVER_PASSWORD: str | None = None
+    SQL_SERVER_HOST: str | None = None
+    SQL_SERVER_PORT: int | None = None
+    SQL_SERVER_DB: str | None = None
+    SQL_SERVER_DRIVER: str = "ODBC Driver 17 for SQL Server"
     SECRET_KEY: str
     ALGORITHM: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_WARMUP: int = 0
+    DB_PRE_PING: str = "idle"
+    DB_PRE_PING_IDLE_SECONDS: float = 30
+    DB_FAST_EXECUTEMANY: bool = True
+    HASH_EXECUTOR: str = "thread"
+    HASH_WORKERS: int | None = None
+    HASH_MAX_QUEUE: int = 64
+    DB_ASYNC_MODE: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+    DB_CREATE_SCHEMA: bool = False
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: float = 60
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_HASH_WORKERS: int | None = None
+    REVOCATION_BACKEND: str = "memory"
+    REVOCATION_SYNC_SECONDS: float = 5
+    REDIS_URL: str | None = None
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    METRICS_ENABLED: bool = False
+    SERVER_TIMING_ENABLED: bool = True
+    PROFILER_ENABLED: bool = False
+    PROFILER_HEADER_ENABLED: bool = False
+    PROFILER_ENGINE: str = "sampling"
+    PROFILER_THRESHOLD_MS: float = 500
+    PROFILER_SAMPLE_INTERVAL_MS: float = 5
+    PROFILER_MAX_PROFILES: int = 20
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    LOGIN_IP_LIMIT: int = 20
+    LOGIN_IP_WINDOW_SECONDS: float = 60
+    LOGIN_EMAIL_LIMIT: int = 10
+    LOGIN_EMAIL_WINDOW_SECONDS: float = 300
+    PASSWORD_SCHEMES: list[str] = ["bcrypt"]
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    JWT_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
+    JWKS_MAX_AGE_SECONDS: int = 300
+    DATABASE_URL: str | None = None
+    DATABASE_REPLICA_URLS: list[str] = []
+    ASYNC_DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_CHECK_SECONDS: float = 10
+    DB_READ_YOUR_WRITES_SECONDS: float = 5
+    SQLITE_PRAGMAS: dict[str, str] = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": "5000", "foreign_keys": "ON"}
+    PERMISSIONS_CACHE_MAX_SIZE: int = 10000
+    PERMISSIONS_CACHE_TTL_SECONDS: float = 10
+    AVAILABILITY_FILTER_ENABLED: bool = False
+    AVAILABILITY_FILTER_CAPACITY: int = 1000000
+    AVAILABILITY_FILTER_ERROR_RATE: float = 0.01
+    AVAILABILITY_FILTER_REFRESH_SECONDS: float = 300
+    USER_RETENTION_DAYS: float = 30
+    PURGE_ENABLED: bool = False
+    PURGE_INTERVAL_SECONDS: float = 3600
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_BATCH_PAUSE_SECONDS: float = 0.1
+    INTERNAL_STATS_ENABLED: bool = False
 
     class Config:
         """
@@ -1,56 +1,230 @@
 """
-FastAPI dependencies for retrieving the currently authenticated user from a JWT token.
+FastAPI dependencies that authenticate and authorize requests from a JWT access token.
 
 Provides:
 1. OAuth2 password bearer scheme integration.
-2. Dependency to extract and validate the current user from a token.
+2. `get_token_claims`, which verifies the bearer token without loading the user.
+3. `require_role` / `require_role_async`, which authorize from the token's role
+   claims without loading the user (see `app.core.roles`), and
+   `require_owner_or_role`, which also admits the user named in the path.
+
+The claims of verified tokens are cached (see `app.core.token_cache`), so
+repeated requests with the same token skip signature verification. Revocation
+(see `app.core.revocation`) is checked on every request, including cache hits,
+without a database round trip.
 """
 
+from collections.abc import Awaitable, Callable
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.user import User
-from app.core.config import settings
+from app.db.session import get_read_db, get_async_read_db
+from app.core.keys import get_key_ring
+from app.core.metrics import timed
+from app.core.profiler import record_roles
+from app.core.revocation import revocation_store
+from app.core.roles import Role, permissions_cache, permissions_version_query
+from app.core.token_cache import token_cache
 
 # ----- OAuth2 scheme -----
 # Defines the URL endpoint where clients can obtain the access token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-# ----- Dependency to get current user -----
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+# ----- Token helpers -----
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _decode_token(token: str) -> dict:
     """
-    Retrieves the currently authenticated user based on the JWT access token.
+    Decodes the JWT access token and checks it carries a subject and is not revoked.
 
     Args:
-        token (str): JWT access token provided via the Authorization header.
-        db (Session): SQLAlchemy database session.
+        token (str): JWT access token.
 
     Raises:
-        HTTPException: If the token is invalid, expired, or the user does not exist.
+        HTTPException: If the token is invalid, expired, revoked, or has no subject.
 
     Returns:
-        User: SQLAlchemy User model instance corresponding to the authenticated user.
+        dict: Decoded token claims.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
     try:
-        # Decode the token using the SECRET_KEY and ALGORITHM
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        # Verify the token with the key named in its header (keys are parsed once)
+        with timed("jwt_decode"):
+            payload = get_key_ring().decode(token)
         user_id: str = payload.get("sub")  # Extract user ID from token
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if revocation_store.is_revoked(payload):
+        raise _credentials_exception()
+    return payload
+
+# ----- Dependency to get the verified token claims -----
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Returns the verified claims of the bearer token without loading the user.
+
+    Args:
+        token (str): JWT access token provided via the Authorization header.
+
+    Raises:
+        HTTPException: If the token is invalid, expired, or revoked.
+
+    Returns:
+        dict: Decoded token claims.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        if revocation_store.is_revoked(cached.claims):
+            raise _credentials_exception()
+        return cached.claims
+    claims = _decode_token(token)
+    token_cache.put(token, claims)
+    return claims
+
+# ----- Role dependencies -----
+def _outdated_permissions_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token permissions are outdated; refresh the token",
+        headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+    )
+
+def _authorize(claims: dict, role: Role, current_version: int | None) -> dict:
+    """
+    Check the role claims of a token against the user's current permissions version.
+
+    Args:
+        claims (dict): Verified token claims.
+        role (Role): Required role.
+        current_version (int | None): The user's permissions version, None if the user no longer exists.
+
+    Raises:
+        HTTPException: 401 if the user is gone or their roles changed after the
+            token was issued, 403 if the token does not grant the role.
+
+    Returns:
+        dict: The claims.
+    """
+    if current_version is None:
+        raise _credentials_exception()
+    if claims.get("pv") != current_version:
+        raise _outdated_permissions_exception()
+    roles = claims.get("roles", ())
+    if role.value not in roles:
+        raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
+    record_roles(roles)
+    return claims
+
+def _permissions_version(db: Session, user_id: int) -> int | None:
+    """
+    Args:
+        db (Session): Read-only database session, used on cache misses.
+        user_id (int): ID of the token's user.
+
+    Returns:
+        int | None: The user's current permissions version, None if the user no longer exists.
+    """
+    current_version = permissions_cache.get(user_id)
+    if current_version is None:
+        current_version = db.execute(permissions_version_query(user_id)).scalar()
+        if current_version is not None:
+            permissions_cache.put(user_id, current_version)
+    return current_version
+
+async def _permissions_version_async(db: AsyncSession, user_id: int) -> int | None:
+    current_version = permissions_cache.get(user_id)
+    if current_version is None:
+        current_version = (await db.execute(permissions_version_query(user_id))).scalar()
+        if current_version is not None:
+            permissions_cache.put(user_id, current_version)
+    return current_version
+
+def require_role(role: Role) -> Callable[..., dict]:
+    """
+    Build a dependency that requires the token to grant a role.
+
+    The role is read from the token's claims. Only the user's permissions
+    version is looked up, and it is cached (see `PermissionsCache`), so most
+    authorized requests run no query at all.
+
+    Usage:
+        @router.get("/", dependencies=[Depends(require_role(Role.ADMIN))])
+
+    Args:
+        role (Role): Required role.
+
+    Returns:
+        Callable[..., dict]: Dependency returning the verified claims.
+    """
+    def dependency(claims: dict = Depends(get_token_claims), db: Session = Depends(get_read_db)) -> dict:
+        return _authorize(claims, role, _permissions_version(db, int(claims["sub"])))
+
+    return dependency
+
+def require_role_async(role: Role) -> Callable[..., Awaitable[dict]]:
+    """
+    Async variant of `require_role` for the async database mode.
+
+    Args:
+        role (Role): Required role.
+
+    Returns:
+        Callable[..., Awaitable[dict]]: Dependency returning the verified claims.
+    """
+    async def dependency(
+        claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_async_read_db)
+    ) -> dict:
+        return _authorize(claims, role, await _permissions_version_async(db, int(claims["sub"])))
+
+    return dependency
+
+def require_owner_or_role(role: Role) -> Callable[..., dict]:
+    """
+    Build a dependency for routes about the user in the `id` path parameter:
+    the user may always access their own data, other users need the role.
+
+    Args:
+        role (Role): Role required to access other users' data.
+
+    Returns:
+        Callable[..., dict]: Dependency returning the verified claims.
+    """
+    def dependency(id: int, claims: dict = Depends(get_token_claims), db: Session = Depends(get_read_db)) -> dict:
+        if claims["sub"] == str(id):
+            return claims
+        return _authorize(claims, role, _permissions_version(db, int(claims["sub"])))
+
+    return dependency
+
+def require_owner_or_role_async(role: Role) -> Callable[..., Awaitable[dict]]:
+    """
+    Async variant of `require_owner_or_role` for the async database mode.
+
+    Args:
+        role (Role): Role required to access other users' data.
+
+    Returns:
+        Callable[..., Awaitable[dict]]: Dependency returning the verified claims.
+    """
+    async def dependency(
+        id: int, claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_async_read_db)
+    ) -> dict:
+        if claims["sub"] == str(id):
+            return claims
+        return _authorize(claims, role, await _permissions_version_async(db, int(claims["sub"])))
 
-    # Query the database for the user
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
-        raise credentials_exception
+    return dependency
 
-    return user
\ No newline at end of file
+# Dependencies of the admin-only routes, and of routes for the user themself or an admin
+require_admin = require_role(Role.ADMIN)
+require_admin_async = require_role_async(Role.ADMIN)
+require_owner_or_admin = require_owner_or_role(Role.ADMIN)
+require_owner_or_admin_async = require_owner_or_role_async(Role.ADMIN)
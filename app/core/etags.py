@@ -0,0 +1,117 @@
+"""
+Entity tags and conditional requests (RFC 9110, section 13).
+
+This module provides:
+1. ETags for a single user profile, derived from its `version` column, and
+   for a page of profiles, derived from a fingerprint of the page's rows.
+2. `If-None-Match` / `If-Match` evaluation: weak comparison for conditional
+   GETs, strong comparison for writes.
+3. The 304 Not Modified response returned when the client's copy is current,
+   and the 412 Precondition Failed error for writes based on an old version.
+
+Profile responses may be stored by the client but must be revalidated
+(`Cache-Control: private, no-cache`), so an unchanged profile costs one small
+query and an empty 304 instead of the full body.
+"""
+
+import hashlib
+
+from fastapi import HTTPException, Response, status
+
+CACHE_CONTROL = "private, no-cache"
+
+# ----- Tags -----
+def profile_etag(version: int) -> str:
+    """
+    Args:
+        version (int): The user's `version` column.
+
+    Returns:
+        str: Strong ETag of the profile, e.g. `"v3"`.
+    """
+    return f'"v{version}"'
+
+def page_etag(count: int, id_sum: int, version_sum: int) -> str:
+    """
+    ETag of a page of profiles.
+
+    Versions only increase and new users get higher IDs than every existing
+    one, so an update, insert, delete or status change within the page window
+    changes at least one of the three numbers.
+
+    Args:
+        count (int): Rows in the page window (the page plus the row after it).
+        id_sum (int): Sum of their IDs.
+        version_sum (int): Sum of their versions.
+
+    Returns:
+        str: Strong ETag of the page.
+    """
+    digest = hashlib.blake2b(f"{count}:{id_sum}:{version_sum}".encode(), digest_size=8).hexdigest()
+    return f'"p{digest}"'
+
+# ----- Preconditions -----
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+def none_match(header: str | None, etag: str) -> bool:
+    """
+    Evaluate `If-None-Match` with the weak comparison (a `W/` prefix is ignored).
+
+    Args:
+        header (str | None): The `If-None-Match` request header.
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        bool: True if the client's copy is current, i.e. the response can be a 304.
+    """
+    if not header:
+        return False
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in _tags(header))
+
+def match(header: str | None, etag: str) -> bool:
+    """
+    Evaluate `If-Match` with the strong comparison.
+
+    Args:
+        header (str | None): The `If-Match` request header (None: no precondition).
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        bool: False if the header is present and names neither `*` nor the current ETag.
+    """
+    if header is None:
+        return True
+    return any(tag == "*" or tag == etag for tag in _tags(header))
+
+# ----- Responses -----
+def not_modified(etag: str) -> Response:
+    """
+    Args:
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        Response: Empty 304 response carrying the ETag and caching headers.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def precondition_failed() -> HTTPException:
+    """
+    Returns:
+        HTTPException: 412 for a write whose `If-Match` is stale, or whose user
+        was changed by another request after it was loaded.
+    """
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="The user was modified by another request; fetch it again",
+    )
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """
+    Args:
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        dict[str, str]: `ETag` and `Cache-Control` headers for a 200 response.
+    """
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
@@ -0,0 +1,208 @@
+"""
+Bounded worker pool for password hashing.
+
+bcrypt is deliberately slow, so running it inline in request handlers ties up
+the server's shared threadpool. This module provides:
+1. A dedicated thread or process executor sized from settings.
+2. Admission control: once the queue is full, callers get a 503 instead of waiting.
+3. Timing statistics that separate queue wait from actual hashing time.
+4. Attribution of queue wait and hashing time to the calling request's
+   metrics breakdown (workers run outside the request's context).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from app.core import metrics
+from app.core.config import settings
+
+# ----- Worker functions -----
+# Module-level so they can be pickled when running in a process pool.
+# time.monotonic() is system-wide on Linux, so timestamps taken in a worker
+# process can be compared with the ones taken in the event loop.
+def _timed_hash(password: str) -> tuple[str, float, float]:
+    from app.core.security import hash_password
+
+    started = time.monotonic()
+    result = hash_password(password)
+    return result, started, time.monotonic()
+
+def _timed_verify(plain_password: str, hashed_password: str) -> tuple[bool, float, float]:
+    from app.core.security import verify_password
+
+    started = time.monotonic()
+    result = verify_password(plain_password, hashed_password)
+    return result, started, time.monotonic()
+
+def _timed_dummy_verify() -> tuple[None, float, float]:
+    from app.core.security import dummy_verify
+
+    started = time.monotonic()
+    dummy_verify()
+    return None, started, time.monotonic()
+
+# Metrics phase of each worker function
+_PHASES = {_timed_hash: "hash", _timed_verify: "verify", _timed_dummy_verify: "verify"}
+
+# ----- Statistics -----
+@dataclass
+class HashingStats:
+    """
+    Cumulative counters for the hashing pool.
+
+    Attributes:
+        submitted (int): Jobs accepted into the pool.
+        completed (int): Jobs that finished (successfully or not).
+        rejected (int): Jobs refused because the queue was full.
+        queue_wait_total (float): Sum of seconds jobs spent waiting for a worker.
+        queue_wait_max (float): Longest observed queue wait in seconds.
+        hash_time_total (float): Sum of seconds spent inside bcrypt.
+        hash_time_max (float): Longest observed hashing time in seconds.
+    """
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    hash_time_total: float = 0.0
+    hash_time_max: float = 0.0
+
+    def record(self, queue_wait: float, hash_time: float) -> None:
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.hash_time_total += hash_time
+        self.hash_time_max = max(self.hash_time_max, hash_time)
+
+# ----- Pool -----
+class HashingPool:
+    """
+    Executor wrapper that limits how many hashing jobs may be queued at once.
+
+    Args:
+        kind (str): "thread" or "process".
+        workers (int): Number of workers in the executor.
+        max_queue (int): Jobs allowed to wait for a worker before new ones are rejected.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor: {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self.stats = HashingStats()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+
+    @property
+    def in_flight(self) -> int:
+        """int: Jobs currently queued or running."""
+        return self._in_flight
+
+    @property
+    def executor(self) -> Executor:
+        """Executor: The underlying executor, created on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="hashing"
+                        )
+        return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.stats.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+            self.stats.submitted += 1
+
+    def _release(self, queue_wait: float, hash_time: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.stats.record(queue_wait, hash_time)
+
+    async def run(self, fn, *args):
+        """
+        Run a timed worker function in the pool.
+
+        Args:
+            fn: One of the module-level `_timed_*` functions.
+            *args: Arguments forwarded to the worker.
+
+        Raises:
+            HTTPException: 503 if the pool queue is full.
+
+        Returns:
+            The worker's result.
+        """
+        self._acquire()
+        submitted = time.monotonic()
+        started = finished = submitted
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self.executor, fn, *args)
+            return result
+        finally:
+            queue_wait, hash_time = max(started - submitted, 0.0), max(finished - started, 0.0)
+            self._release(queue_wait, hash_time)
+            metrics.record("hash_queue", queue_wait)
+            phase = _PHASES.get(fn, "hash")
+            if self.kind == "process":
+                # Worker processes have their own (unexported) metrics registry
+                metrics.record(phase, hash_time)
+            else:
+                metrics.add_to_request(phase, hash_time)
+
+    def snapshot(self) -> dict:
+        """
+        Return the current pool configuration and statistics.
+
+        Returns:
+            dict: Configuration, in-flight count and cumulative timings in milliseconds.
+        """
+        s = self.stats
+        completed = s.completed or 1
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "submitted": s.submitted,
+            "completed": s.completed,
+            "rejected": s.rejected,
+            "queue_wait_ms_avg": s.queue_wait_total / completed * 1000,
+            "queue_wait_ms_max": s.queue_wait_max * 1000,
+            "hash_time_ms_avg": s.hash_time_total / completed * 1000,
+            "hash_time_ms_max": s.hash_time_max * 1000,
+        }
+
+    def shutdown(self) -> None:
+        """Shut down the executor, waiting for running jobs to finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# ----- Shared pool instance -----
+hashing_pool = HashingPool(
+    kind=settings.HASH_EXECUTOR,
+    workers=settings.HASH_WORKERS or os.cpu_count() or 1,
+    max_queue=settings.HASH_MAX_QUEUE,
+)
@@ -0,0 +1,186 @@
+"""
+JWT key management.
+
+This module provides:
+1. `KeyRing`, which parses the signing and verification keys once (at
+   startup, or on the first token operation) instead of on every
+   `encode`/`decode` call.
+2. Shared-secret (HS256/384/512) keys from `SECRET_KEY`, and asymmetric
+   (RS256/384/512, ES256/384/512) keys loaded from the PEM files in
+   `JWT_KEYS_DIR`, one file per key named `<kid>.pem`.
+3. `kid`-based rotation: tokens are signed with the key `JWT_ACTIVE_KID` and
+   carry its ID in the header; every other key in the directory still
+   verifies the tokens it signed. A directory may also hold public-only keys,
+   which verify but never sign.
+4. The JSON Web Key Set (RFC 7517) of the public keys, served at
+   `/.well-known/jwks.json` so other services can verify tokens locally.
+
+EdDSA is not supported by python-jose and is rejected at startup.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import settings
+from app.core.lazy import lazy
+
+HMAC_ALGORITHMS = ("HS256", "HS384", "HS512")
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+# ----- Keys -----
+@dataclass(frozen=True)
+class JWTKey:
+    """
+    A parsed key.
+
+    Attributes:
+        kid (str | None): Key ID written to the token header (None: no `kid` header).
+        signing (Key | None): Key used to sign, None for verification-only keys.
+        verification (Key): Key used to verify signatures (the public key for RS/ES).
+    """
+    kid: str | None
+    signing: Key | None
+    verification: Key
+
+class KeyRing:
+    """
+    The keys tokens are signed and verified with.
+
+    Args:
+        algorithm (str): JWT algorithm shared by all keys.
+        keys (list[JWTKey]): All known keys, with unique IDs.
+        active_kid (str | None): ID of the key that signs new tokens.
+
+    Raises:
+        ValueError: If the active key is missing or cannot sign.
+    """
+
+    def __init__(self, algorithm: str, keys: list[JWTKey], active_kid: str | None):
+        self.algorithm = algorithm
+        self._keys = {key.kid: key for key in keys}
+        active = self._keys.get(active_kid)
+        if active is None or active.signing is None:
+            raise ValueError(f"No private key with kid {active_kid!r} to sign tokens with")
+        self.active = active
+        self._headers = {"kid": active_kid} if active_kid else None
+        self.jwks = {"keys": [] if algorithm in HMAC_ALGORITHMS else [
+            {**key.verification.to_dict(), "kid": key.kid, "use": "sig"} for key in keys
+        ]}
+        # Served as-is by the JWKS endpoint
+        self.jwks_json = json.dumps(self.jwks).encode()
+
+    @classmethod
+    def from_secret(cls, secret: str, algorithm: str, kid: str | None = None) -> "KeyRing":
+        """
+        Key ring with a single shared secret.
+
+        Args:
+            secret (str): The shared secret.
+            algorithm (str): One of `HMAC_ALGORITHMS`.
+            kid (str | None): Optional key ID for the token header.
+
+        Raises:
+            ValueError: If the algorithm is not an HMAC algorithm.
+
+        Returns:
+            KeyRing: The key ring.
+        """
+        if algorithm not in HMAC_ALGORITHMS:
+            raise ValueError(f"{algorithm} needs a key pair; set JWT_KEYS_DIR")
+        key = jwk.construct(secret, algorithm)
+        return cls(algorithm, [JWTKey(kid, key, key)], kid)
+
+    @classmethod
+    def from_directory(cls, path: str, algorithm: str, active_kid: str | None) -> "KeyRing":
+        """
+        Key ring with the PEM keys of a directory, one `<kid>.pem` file per key.
+
+        Args:
+            path (str): Directory holding the keys.
+            algorithm (str): One of `ASYMMETRIC_ALGORITHMS`.
+            active_kid (str | None): ID of the private key that signs new tokens.
+
+        Raises:
+            ValueError: If the algorithm is not supported or the active key is missing.
+
+        Returns:
+            KeyRing: The key ring.
+        """
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm for key files: {algorithm!r}")
+        keys = []
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(".pem"):
+                continue
+            with open(os.path.join(path, name)) as file:
+                key = jwk.construct(file.read(), algorithm)
+            kid = name.removesuffix(".pem")
+            if key.is_public():
+                keys.append(JWTKey(kid, None, key))
+            else:
+                keys.append(JWTKey(kid, key, key.public_key()))
+        return cls(algorithm, keys, active_kid)
+
+    # ----- Tokens -----
+    def encode(self, claims: dict) -> str:
+        """
+        Sign claims with the active key.
+
+        Args:
+            claims (dict): Token payload.
+
+        Returns:
+            str: The encoded JWT.
+        """
+        return jwt.encode(claims, self.active.signing, algorithm=self.algorithm, headers=self._headers)
+
+    def decode(self, token: str) -> dict:
+        """
+        Verify a token with the key named in its header and return its claims.
+
+        Tokens without a `kid` header (issued before key IDs were configured)
+        are verified with the active key.
+
+        Args:
+            token (str): Encoded JWT.
+
+        Raises:
+            JWTError: If the key is unknown, or the token is malformed, badly signed or expired.
+
+        Returns:
+            dict: Decoded token claims.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._keys.get(kid) if kid is not None else self.active
+        if key is None:
+            raise JWTError("Unknown key ID")
+        return jwt.decode(token, key.verification, algorithms=[self.algorithm])
+
+# ----- Factory -----
+def build_key_ring() -> KeyRing:
+    """
+    Create the key ring from `ALGORITHM`, `SECRET_KEY`, `JWT_KEYS_DIR` and `JWT_ACTIVE_KID`.
+
+    Raises:
+        ValueError: If the algorithm is unsupported or its keys are not configured.
+
+    Returns:
+        KeyRing: The configured key ring.
+    """
+    algorithm = settings.ALGORITHM
+    if algorithm in HMAC_ALGORITHMS:
+        return KeyRing.from_secret(settings.SECRET_KEY, algorithm, settings.JWT_ACTIVE_KID)
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        if not settings.JWT_KEYS_DIR:
+            raise ValueError(f"ALGORITHM={algorithm} requires JWT_KEYS_DIR")
+        return KeyRing.from_directory(settings.JWT_KEYS_DIR, algorithm, settings.JWT_ACTIVE_KID)
+    raise ValueError(f"Unsupported ALGORITHM: {algorithm!r}")
+
+
+# ----- Shared key ring -----
+# Built by the application's startup or the first token operation, not at import
+get_key_ring = lazy(build_key_ring)
@@ -0,0 +1,67 @@
+"""
+Lazily created shared resources.
+
+This module provides `lazy`, a decorator for zero-argument factories (engines,
+the password context, the JWT key ring). The resource is built by the first
+call, either at application startup or on first use, instead of at import
+time. Importing the application therefore needs neither a reachable database
+nor its driver.
+"""
+
+import functools
+import threading
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+_UNSET = object()
+
+class Lazy(Generic[T]):
+    """
+    Factory whose result is built on the first call and shared afterwards.
+
+    Concurrent first calls build the value once.
+
+    Args:
+        factory (Callable[[], T]): Builds the value.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        functools.update_wrapper(self, factory)
+        self._factory = factory
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        value = self._value
+        if value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    self._value = self._factory()
+                value = self._value
+        return value
+
+    def loaded(self) -> bool:
+        """
+        Returns:
+            bool: True once the value has been built.
+        """
+        return self._value is not _UNSET
+
+def lazy(factory: Callable[[], T]) -> Lazy[T]:
+    """
+    Decorator turning a zero-argument factory into a `Lazy` resource.
+
+    Usage:
+        @lazy
+        def get_engine() -> Engine:
+            return build_engine(database_url())
+
+    Args:
+        factory (Callable[[], T]): Builds the value.
+
+    Returns:
+        Lazy[T]: Callable returning the shared value.
+    """
+    return Lazy(factory)
@@ -0,0 +1,408 @@
+"""
+Application metrics in the Prometheus text exposition format.
+
+This module provides:
+1. Thread-safe `Counter`, `Gauge` and `Histogram` metrics with labels,
+   collected in a registry that the `/metrics` endpoint renders.
+2. A per-request timing breakdown (`RequestTimings`) carried in a context
+   variable, so pool wait, SQL, password hashing and JWT time can be
+   attributed to the request that caused it.
+3. `record` and `timed`, which report a phase duration to both the global
+   histogram and the current request.
+4. SQLAlchemy engine hooks timing every statement.
+5. `MetricsMiddleware`, a pure ASGI middleware recording per-route latency
+   histograms and adding a `Server-Timing` header to every response.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond SQL up to slow bcrypt logins
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# ----- Metric types -----
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Counter:
+    """
+    Monotonically increasing value per label set.
+
+    Args:
+        name (str): Metric name.
+        documentation (str): HELP text.
+        labelnames (tuple[str, ...]): Label names, in order.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        Increase the counter of a label set.
+
+        Args:
+            amount (float): Value to add.
+            **labels: One value per label name.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Gauge(Counter):
+    """
+    Value per label set that can go up and down.
+
+    Args:
+        name (str): Metric name.
+        documentation (str): HELP text.
+        labelnames (tuple[str, ...]): Label names, in order.
+    """
+
+    def set(self, value: float, **labels) -> None:
+        """
+        Set the gauge of a label set.
+
+        Args:
+            value (float): New value.
+            **labels: One value per label name.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    """
+    Distribution of observed values per label set, with cumulative buckets.
+
+    Args:
+        name (str): Metric name.
+        documentation (str): HELP text.
+        labelnames (tuple[str, ...]): Label names, in order.
+        buckets (tuple[float, ...]): Upper bounds, ascending (+Inf is implicit).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value (float): Observed value (seconds for durations).
+            **labels: One value per label name.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = bound if isinstance(bound, str) else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: list[Counter | Gauge | Histogram] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text format.
+
+        Returns:
+            str: Exposition text, newline-terminated.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ----- Shared registry and metrics -----
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+REQUEST_DB_STATEMENTS = registry.histogram(
+    "http_request_db_statements", "SQL statements executed per request.", ("method", "route"), STATEMENT_BUCKETS
+)
+REQUEST_DB_DURATION = registry.histogram(
+    "http_request_db_duration_seconds", "Time spent executing SQL per request.", ("method", "route")
+)
+PHASE_DURATION = registry.histogram(
+    "app_phase_duration_seconds",
+    "Duration of individual operations: pool (connection checkout), db (one SQL statement), "
+    "hash and verify (password hashing), hash_queue (wait for a hashing worker), jwt_encode and jwt_decode.",
+    ("phase",),
+)
+RATE_LIMITED = registry.counter(
+    "rate_limit_rejections_total", "Requests rejected by a rate limit.", ("limit",)
+)
+PASSWORD_REHASHES = registry.counter(
+    "password_rehashes_total", "Outdated password hashes replaced after a login.", ("result",)
+)
+USERS_PURGED = registry.counter(
+    "users_purged_total", "Soft-deleted users removed by the purge, with their selections and tokens."
+)
+REFRESH_TOKENS_PRUNED = registry.counter(
+    "refresh_tokens_pruned_total", "Expired refresh token rows deleted by the purge."
+)
+PURGE_BATCH_DURATION = registry.histogram(
+    "user_purge_batch_duration_seconds", "Duration of one purge batch (one transaction)."
+)
+PURGE_PENDING = registry.gauge(
+    "user_purge_pending", "Soft-deleted users left after the last purge run, by whether their retention window is over.",
+    ("expired",),
+)
+PURGE_LAST_SUCCESS = registry.gauge(
+    "user_purge_last_success_timestamp_seconds", "Time the last purge run completed."
+)
+
+# ----- Per-request breakdown -----
+class RequestTimings:
+    """Time and call count per phase for one request."""
+
+    __slots__ = ("phases", "_lock")
+
+    def __init__(self):
+        self.phases: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.phases.setdefault(phase, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def get(self, phase: str) -> tuple[int, float]:
+        """
+        Totals of one phase.
+
+        Args:
+            phase (str): Phase name.
+
+        Returns:
+            tuple[int, float]: Number of operations and their total seconds.
+        """
+        with self._lock:
+            count, seconds = self.phases.get(phase, (0, 0.0))
+        return count, seconds
+
+    def server_timing(self, total: float) -> str:
+        """
+        Format the breakdown as a `Server-Timing` header value.
+
+        Args:
+            total (float): Seconds from request start to response start.
+
+        Returns:
+            str: e.g. `db;dur=1.2;desc="3 ops", verify;dur=240.5;desc="1 ops", app;dur=245.0`.
+        """
+        with self._lock:
+            phases = list(self.phases.items())
+        entries = [f'{phase};dur={seconds * 1000:.2f};desc="{count} ops"' for phase, (count, seconds) in phases]
+        entries.append(f"app;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+def add_to_request(phase: str, seconds: float) -> None:
+    """
+    Attribute time to the current request only (the global histogram is updated elsewhere).
+
+    Args:
+        phase (str): Phase name.
+        seconds (float): Duration.
+    """
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+def record(phase: str, seconds: float) -> None:
+    """
+    Record a phase duration globally and for the current request, if any.
+
+    Args:
+        phase (str): Phase name.
+        seconds (float): Duration.
+    """
+    PHASE_DURATION.observe(seconds, phase=phase)
+    add_to_request(phase, seconds)
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Time a block with `record`.
+
+    Args:
+        phase (str): Phase name.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+# ----- SQLAlchemy hooks -----
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every statement executed on an engine as the "db" phase.
+
+    Args:
+        engine (Engine): Sync engine (pass `async_engine.sync_engine` for async engines).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        record("db", time.perf_counter() - conn.info["metrics_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _failed_execute(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            record("db", time.perf_counter() - started.pop())
+
+# ----- ASGI middleware -----
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that records per-route latency and SQL usage.
+
+    Routes are labelled with their template (`/api/users/{id}`), so label
+    cardinality stays bounded; unmatched paths share the "unmatched" label.
+
+    Args:
+        app: The wrapped ASGI application.
+        server_timing (bool): Add a `Server-Timing` header with the request's breakdown.
+    """
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    value = timings.server_timing(time.perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", value.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_timings.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            statements, db_seconds = timings.get("db")
+            REQUESTS.inc(method=method, route=route, status=status_code)
+            REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            REQUEST_DB_STATEMENTS.observe(statements, method=method, route=route)
+            REQUEST_DB_DURATION.observe(db_seconds, method=method, route=route)
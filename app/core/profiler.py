@@ -0,0 +1,417 @@
+"""
+Opt-in profiling of slow requests.
+
+This module provides:
+1. Two capture engines:
+   - "sampling": a shared background thread samples the Python stacks of all
+     busy threads every `PROFILER_SAMPLE_INTERVAL_MS` while a request runs.
+     Several requests can be captured at once.
+   - "cprofile": deterministic `cProfile`. Python 3.12 allows only one active
+     profiler per process, so one request is captured at a time and
+     concurrent requests are skipped.
+   Both engines see the whole process while the request runs, so under
+   concurrency a profile also contains work done for other requests.
+2. `ProfilerMiddleware`, a pure ASGI middleware capturing requests when
+   `PROFILER_ENABLED` is set (kept if slower than `PROFILER_THRESHOLD_MS`) or
+   when an admin sends `X-Profile: 1` and `PROFILER_HEADER_ENABLED` is set.
+3. A ring buffer of the last `PROFILER_MAX_PROFILES` profiles, exported as
+   speedscope JSON (sampling) or pstats (cProfile) by the admin endpoints.
+
+The middleware is only installed when one of the triggers is enabled, so a
+disabled profiler adds no per-request work.
+"""
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.roles import Role
+
+PROFILE_HEADER = b"x-profile"
+
+# Innermost frames of threads that are waiting rather than working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+MAX_STACK_DEPTH = 128
+
+# ----- Profiles -----
+@dataclass
+class RequestProfile:
+    """
+    A captured request profile.
+
+    Attributes:
+        id (str): Unique identifier.
+        method (str): HTTP method.
+        path (str): Request path.
+        status (int): Response status code.
+        duration_ms (float): Request duration in milliseconds.
+        engine (str): "sampling" or "cprofile".
+        captured_at (datetime): When the request finished (UTC).
+        samples (Counter | None): Sample count per stack (thread name, frames...) for "sampling".
+        interval (float): Sampling interval in seconds.
+        stats (pstats.Stats | None): Profile statistics for "cprofile".
+    """
+    id: str
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    engine: str
+    captured_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    samples: Counter | None = None
+    interval: float = 0.0
+    stats: pstats.Stats | None = None
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: Metadata of the profile (no profile data).
+        """
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 2),
+            "engine": self.engine,
+            "captured_at": self.captured_at.isoformat(),
+            "format": "speedscope" if self.engine == "sampling" else "pstats",
+        }
+
+    def to_speedscope(self) -> dict:
+        """
+        Export a sampling profile in the speedscope file format (https://www.speedscope.app).
+
+        Each thread becomes a root frame so stacks of different threads stay apart.
+
+        Returns:
+            dict: speedscope JSON document.
+        """
+        frames: list[dict] = []
+        index: dict[tuple, int] = {}
+
+        def frame_id(key: tuple) -> int:
+            if key not in index:
+                index[key] = len(frames)
+                name, filename, line = key
+                frames.append({"name": name, "file": filename, "line": line} if filename else {"name": name})
+            return index[key]
+
+        samples, weights = [], []
+        for (thread, *stack), count in (self.samples or Counter()).most_common():
+            ids = [frame_id((f"thread {thread}", None, None))]
+            ids.extend(frame_id(frame) for frame in stack)
+            samples.append(ids)
+            weights.append(count * self.interval * 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "fast-api-auth",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.method} {self.path} ({self.duration_ms:.0f} ms)",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def to_pstats_text(self, limit: int = 60) -> str:
+        """
+        Render a cProfile profile as pstats text, sorted by cumulative time.
+
+        Args:
+            limit (int): Number of functions to list.
+
+        Returns:
+            str: pstats report.
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(stream=stream).add(self.stats)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def to_pstats_dump(self) -> bytes:
+        """
+        Serialize a cProfile profile in the `.prof` format read by `pstats` and snakeviz.
+
+        Returns:
+            bytes: Marshalled statistics.
+        """
+        return marshal.dumps(self.stats.stats)
+
+class ProfileBuffer:
+    """
+    Thread-safe ring buffer of the most recent profiles.
+
+    Args:
+        max_size (int): Profiles kept; older ones are dropped.
+    """
+
+    def __init__(self, max_size: int):
+        self._profiles: deque[RequestProfile] = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> list[RequestProfile]:
+        """
+        Returns:
+            list[RequestProfile]: Profiles, newest first.
+        """
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+# ----- Engines -----
+def _frame_key(frame) -> tuple[str, str, int]:
+    code = frame.f_code
+    return code.co_qualname, code.co_filename, code.co_firstlineno
+
+def _busy_stack(frame) -> list[tuple[str, str, int]] | None:
+    """Stack of a thread, outermost frame first, or None if the thread is idle."""
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+        return None
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+class StackSampler:
+    """
+    Background thread sampling all busy threads while captures are active.
+
+    The thread starts with the first capture and exits when the last one stops.
+
+    Args:
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._captures: set[int] = set()
+        self._samples: dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._next_id = 0
+
+    def start(self) -> int:
+        """
+        Begin a capture.
+
+        Returns:
+            int: Capture handle for `stop`.
+        """
+        with self._lock:
+            self._next_id += 1
+            capture = self._next_id
+            self._captures.add(capture)
+            self._samples[capture] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                self._thread.start()
+        return capture
+
+    def stop(self, capture: int) -> Counter:
+        """
+        End a capture.
+
+        Args:
+            capture (int): Handle returned by `start`.
+
+        Returns:
+            Counter: Sample count per (thread name, frames...) stack.
+        """
+        with self._lock:
+            self._captures.discard(capture)
+            return self._samples.pop(capture, Counter())
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _busy_stack(frame)
+                if stack is not None:
+                    stacks.append((names.get(ident, str(ident)), *stack))
+            with self._lock:
+                if not self._captures:
+                    self._thread = None
+                    return
+                for capture in self._captures:
+                    self._samples[capture].update(stacks)
+            time.sleep(self.interval)
+
+class RequestProfiler:
+    """
+    Captures profiles with the configured engine and keeps the interesting ones.
+
+    Args:
+        engine (str): "sampling" or "cprofile".
+        interval (float): Sampling interval in seconds.
+        max_profiles (int): Size of the ring buffer.
+    """
+
+    def __init__(self, engine: str, interval: float, max_profiles: int):
+        if engine not in ("sampling", "cprofile"):
+            raise ValueError(f"Unknown profiler engine: {engine!r}")
+        self.engine = engine
+        self.sampler = StackSampler(interval)
+        self.buffer = ProfileBuffer(max_profiles)
+        self._cprofile_lock = threading.Lock()
+
+    def start(self):
+        """
+        Begin capturing.
+
+        Returns:
+            The capture handle, or None if cProfile is already busy with another request.
+        """
+        if self.engine == "sampling":
+            return self.sampler.start()
+        if not self._cprofile_lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, capture) -> dict:
+        """
+        End a capture.
+
+        Args:
+            capture: Handle returned by `start`.
+
+        Returns:
+            dict: `RequestProfile` fields holding the captured data.
+        """
+        if self.engine == "sampling":
+            return {"samples": self.sampler.stop(capture), "interval": self.sampler.interval}
+        capture.disable()
+        self._cprofile_lock.release()
+        return {"stats": pstats.Stats(capture)}
+
+# ----- Request context -----
+@dataclass
+class _ProfiledRequest:
+    admin: bool = False
+
+_current_request: ContextVar[_ProfiledRequest | None] = ContextVar("profiled_request", default=None)
+
+def record_roles(roles) -> None:
+    """
+    Remember the roles of a profiled request's user, so header-triggered
+    profiles are only kept for admins. No-op for requests that are not profiled.
+
+    Args:
+        roles (Iterable[str]): Role names of the authenticated user.
+    """
+    request = _current_request.get()
+    if request is not None:
+        request.admin = Role.ADMIN.value in roles
+
+# ----- ASGI middleware -----
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware that profiles requests and stores the slow or requested ones.
+
+    Args:
+        app: The wrapped ASGI application.
+        profiler (RequestProfiler): Capture engine and buffer.
+        always (bool): Profile every request and keep those above `threshold`.
+        header (bool): Profile requests carrying `X-Profile: 1`, kept when sent by an admin.
+        threshold (float): Minimum duration in seconds for `always` profiles.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler, always: bool, header: bool, threshold: float):
+        self.app = app
+        self.profiler = profiler
+        self.always = always
+        self.header = header
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = self.header and any(
+            name == PROFILE_HEADER and value == b"1" for name, value in scope["headers"]
+        )
+        if not (self.always or requested):
+            await self.app(scope, receive, send)
+            return
+        capture = self.profiler.start()
+        if capture is None:
+            await self.app(scope, receive, send)
+            return
+
+        request = _ProfiledRequest()
+        token = _current_request.set(request)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            data = self.profiler.stop(capture)
+            keep = (self.always and elapsed >= self.threshold) or (requested and request.admin)
+            if keep:
+                self.profiler.buffer.add(RequestProfile(
+                    id=uuid.uuid4().hex,
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=elapsed * 1000,
+                    engine=self.profiler.engine,
+                    **data,
+                ))
+
+
+# ----- Shared profiler instance -----
+request_profiler = RequestProfiler(
+    engine=settings.PROFILER_ENGINE,
+    interval=settings.PROFILER_SAMPLE_INTERVAL_MS / 1000,
+    max_profiles=settings.PROFILER_MAX_PROFILES,
+)
@@ -0,0 +1,258 @@
+"""
+Rate limiting for expensive endpoints.
+
+Every login attempt costs a bcrypt verification, so unthrottled
+credential-stuffing traffic is effectively a CPU denial of service. This
+module provides:
+1. Sliding-window counters (the current and previous fixed windows, with the
+   previous one weighted by how much of it still overlaps the sliding window).
+2. Backends (selected with `RATE_LIMIT_BACKEND`):
+   - "memory": process-local, bounded to `RATE_LIMIT_MAX_KEYS` keys (least
+     recently used are dropped).
+   - "redis": shared by all workers; one pipelined round trip per check.
+3. `check_login_rate`, which limits login attempts per client IP and per
+   email before any database or bcrypt work, answering 429 with `Retry-After`.
+   Every attempt counts against the IP, but only failed ones
+   (`record_failed_login`) count against the email, so successful logins
+   never use up the email's limit.
+
+Rejected attempts are not counted, so a client that backs off as told is let
+through once the window allows it. The "redis" backend does network I/O, so
+async code calls these helpers through the threadpool.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+
+from app.core import metrics
+from app.core.config import settings
+
+# ----- Window arithmetic -----
+def _retry_after(previous: int, current: int, elapsed: float, window: float, limit: int, cost: int) -> float:
+    """
+    Seconds until `cost` more hits fit in the sliding window, or 0.0 if they fit now.
+
+    Args:
+        previous (int): Hits in the previous fixed window.
+        current (int): Hits in the current fixed window.
+        elapsed (float): Seconds since the current fixed window started.
+        window (float): Window length in seconds.
+        limit (int): Hits allowed per window.
+        cost (int): Hits the caller wants to add.
+    """
+    weight = 1 - elapsed / window
+    if previous * weight + current + cost <= limit:
+        return 0.0
+    if current + cost > limit:
+        # Wait for the next window, then for the current hits to decay enough
+        if current == 0:
+            return window - elapsed
+        return (window - elapsed) + window * max(0.0, 1 - (limit - cost) / current)
+    # Only the previous window's share is in the way
+    return max(0.0, window * (1 - (limit - cost - current) / previous) - elapsed)
+
+# ----- Base interface -----
+class RateLimiter(ABC):
+    """Interface shared by all rate limit backends."""
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window: float, cost: int = 1) -> float:
+        """
+        Count a hit if it fits into the limit.
+
+        Args:
+            key (str): Limited subject, e.g. "login:ip:203.0.113.7".
+            limit (int): Hits allowed per sliding window.
+            window (float): Window length in seconds.
+            cost (int): Hits to add.
+
+        Returns:
+            float: 0.0 if the hit was counted, otherwise seconds to wait before retrying.
+        """
+
+    @abstractmethod
+    def check(self, key: str, limit: int, window: float) -> float:
+        """
+        Check whether one more hit would fit into the limit, without counting it.
+
+        Args:
+            key (str): Limited subject.
+            limit (int): Hits allowed per sliding window.
+            window (float): Window length in seconds.
+
+        Returns:
+            float: 0.0 if a hit would be counted, otherwise seconds to wait before retrying.
+        """
+
+# ----- In-memory backend -----
+class MemoryRateLimiter(RateLimiter):
+    """
+    Process-local sliding-window counters.
+
+    Args:
+        max_keys (int): Maximum number of tracked keys; the least recently used are dropped.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> (window index, hits in previous window, hits in current window)
+        self._windows: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float, cost: int = 1) -> float:
+        now = time.time()
+        index = int(now // window)
+        with self._lock:
+            stored_index, previous, current = self._windows.get(key, (index, 0, 0))
+            if stored_index != index:
+                previous = current if stored_index == index - 1 else 0
+                current = 0
+            retry_after = _retry_after(previous, current, now - index * window, window, limit, cost)
+            if retry_after == 0.0:
+                current += cost
+            self._windows[key] = (index, previous, current)
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        return retry_after
+
+    def check(self, key: str, limit: int, window: float) -> float:
+        now = time.time()
+        index = int(now // window)
+        with self._lock:
+            stored_index, previous, current = self._windows.get(key, (index, 0, 0))
+        if stored_index != index:
+            previous = current if stored_index == index - 1 else 0
+            current = 0
+        return _retry_after(previous, current, now - index * window, window, limit, 1)
+
+# ----- Redis backend -----
+class RedisRateLimiter(RateLimiter):
+    """
+    Sliding-window counters on a Redis-compatible server, shared by all workers.
+
+    Args:
+        client: A redis-py compatible client (`redis.Redis`, `fakeredis.FakeRedis`, ...).
+        prefix (str): Key prefix.
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit"):
+        self._client = client
+        self._prefix = prefix
+
+    def hit(self, key: str, limit: int, window: float, cost: int = 1) -> float:
+        now = time.time()
+        index = int(now // window)
+        current_key = f"{self._prefix}:{key}:{index}"
+        pipe = self._client.pipeline()
+        pipe.incrby(current_key, cost)
+        pipe.expire(current_key, math.ceil(window * 2))
+        pipe.get(f"{self._prefix}:{key}:{index - 1}")
+        current, _, previous = pipe.execute()
+
+        retry_after = _retry_after(int(previous or 0), current - cost, now - index * window, window, limit, cost)
+        if retry_after > 0:
+            # Rejected hits do not count
+            self._client.decrby(current_key, cost)
+        return retry_after
+
+    def check(self, key: str, limit: int, window: float) -> float:
+        now = time.time()
+        index = int(now // window)
+        current, previous = self._client.mget(f"{self._prefix}:{key}:{index}", f"{self._prefix}:{key}:{index - 1}")
+        return _retry_after(int(previous or 0), int(current or 0), now - index * window, window, limit, 1)
+
+# ----- Factory -----
+def build_rate_limiter() -> RateLimiter:
+    """
+    Create the limiter selected by `RATE_LIMIT_BACKEND`.
+
+    Raises:
+        ValueError: If the backend name is unknown or Redis is selected without `REDIS_URL`.
+
+    Returns:
+        RateLimiter: The configured backend.
+    """
+    backend = settings.RATE_LIMIT_BACKEND
+    if backend == "memory":
+        return MemoryRateLimiter(settings.RATE_LIMIT_MAX_KEYS)
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("RATE_LIMIT_BACKEND=redis requires REDIS_URL")
+        import redis
+        return RedisRateLimiter(redis.Redis.from_url(settings.REDIS_URL))
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
+
+# ----- Request helpers -----
+def client_ip(request: Request) -> str:
+    """
+    Address of the client, taken from `X-Forwarded-For` when `RATE_LIMIT_TRUST_FORWARDED` is set.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        str: Client IP address ("unknown" if not available).
+    """
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def _too_many_requests(limit: str, retry_after: float) -> HTTPException:
+    metrics.RATE_LIMITED.inc(limit=limit)
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, please retry later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+def _email_key(email: str) -> str:
+    return f"login:email:{email.lower()}"
+
+def check_login_rate(request: Request, email: str) -> None:
+    """
+    Count a login attempt against the per-IP limit and check the per-email limit.
+
+    Call it before looking up the user, so rejected attempts cost neither a
+    database query nor a bcrypt verification. The attempt only counts against
+    the email if it fails (see `record_failed_login`).
+
+    Args:
+        request (Request): Incoming login request.
+        email (str): Email the client is trying to log in as.
+
+    Raises:
+        HTTPException: 429 with `Retry-After` if either limit is exhausted.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    retry_after = rate_limiter.hit(
+        f"login:ip:{client_ip(request)}", settings.LOGIN_IP_LIMIT, settings.LOGIN_IP_WINDOW_SECONDS
+    )
+    if retry_after:
+        raise _too_many_requests("login_ip", retry_after)
+    retry_after = rate_limiter.check(_email_key(email), settings.LOGIN_EMAIL_LIMIT, settings.LOGIN_EMAIL_WINDOW_SECONDS)
+    if retry_after:
+        raise _too_many_requests("login_email", retry_after)
+
+def record_failed_login(email: str) -> None:
+    """
+    Count a failed login attempt against the per-email limit.
+
+    Args:
+        email (str): Email the client failed to log in as.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    rate_limiter.hit(_email_key(email), settings.LOGIN_EMAIL_LIMIT, settings.LOGIN_EMAIL_WINDOW_SECONDS)
+
+
+# ----- Shared limiter instance -----
+rate_limiter = build_rate_limiter()
@@ -0,0 +1,235 @@
+"""
+Server-side revocation of access tokens.
+
+Every access token carries a unique `jti` and an `iat`. A token is revoked when
+either its `jti` was revoked (logout) or it was issued before a per-user
+cut-off (password change, account deletion). Entries only need to live until
+the affected tokens would have expired anyway.
+
+Backends (selected with `REVOCATION_BACKEND`):
+1. "memory": process-local dictionaries with TTL expiry.
+2. "sql": the memory backend, persisted to the `revoked_tokens` and
+   `user_token_revocations` tables and re-synced periodically, so checks never
+   touch the database.
+3. "redis": any redis-py compatible client (e.g. `fakeredis.FakeRedis` in tests);
+   keys expire through Redis TTLs and checks cost one MGET.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+
+# ----- Base interface -----
+class RevocationStore(ABC):
+    """Interface shared by all revocation backends."""
+
+    @abstractmethod
+    def revoke_token(self, jti: str, user_id: int | None, expires_at: float) -> None:
+        """
+        Revoke a single token.
+
+        Args:
+            jti (str): The token's unique ID.
+            user_id (int | None): Owner of the token.
+            expires_at (float): The token's `exp`; the entry can be dropped afterwards.
+        """
+
+    @abstractmethod
+    def revoke_user(self, user_id: int) -> None:
+        """
+        Revoke every token issued to a user up to now.
+
+        Args:
+            user_id (int): ID of the user.
+        """
+
+    @abstractmethod
+    def is_revoked(self, claims: dict) -> bool:
+        """
+        Check decoded token claims against the store.
+
+        Args:
+            claims (dict): Verified JWT claims (`jti`, `sub`, `iat`).
+
+        Returns:
+            bool: True if the token must be rejected.
+        """
+
+    def maintain(self) -> None:
+        """Periodic housekeeping (purging, syncing). Called from a background task."""
+
+    @staticmethod
+    def _user_cutoff_ttl() -> float:
+        # Tokens older than their maximum lifetime are expired anyway
+        return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# ----- In-memory backend -----
+class MemoryRevocationStore(RevocationStore):
+    """Process-local revocation store with lazy and periodic TTL expiry."""
+
+    def __init__(self):
+        self._tokens: dict[str, float] = {}
+        self._users: dict[int, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def revoke_token(self, jti: str, user_id: int | None, expires_at: float) -> None:
+        with self._lock:
+            self._tokens[jti] = expires_at
+
+    def revoke_user(self, user_id: int) -> None:
+        now = time.time()
+        self._set_user_cutoff(user_id, now, now + self._user_cutoff_ttl())
+
+    def _set_user_cutoff(self, user_id: int, not_before: float, expires_at: float) -> None:
+        with self._lock:
+            current = self._users.get(user_id)
+            if current is None or current[0] < not_before:
+                self._users[user_id] = (not_before, expires_at)
+
+    def is_revoked(self, claims: dict) -> bool:
+        jti = claims.get("jti")
+        if jti is not None and jti in self._tokens:
+            return True
+        cutoff = self._users.get(int(claims.get("sub", 0)))
+        if cutoff is not None:
+            return float(claims.get("iat", 0)) < cutoff[0]
+        return False
+
+    def maintain(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+            self._users = {uid: entry for uid, entry in self._users.items() if entry[1] > now}
+
+# ----- SQL backend -----
+class SQLRevocationStore(MemoryRevocationStore):
+    """
+    Memory store backed by SQL tables shared between workers.
+
+    Writes go to both the database and the local cache; other workers see them
+    after their next `maintain()` run (every `REVOCATION_SYNC_SECONDS`).
+
+    Args:
+        session_factory: Callable returning a new SQLAlchemy `Session`.
+    """
+
+    # Re-read rows slightly older than the last sync to cover in-flight commits
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, session_factory):
+        super().__init__()
+        self._session_factory = session_factory
+        self._synced_until: datetime | None = None
+
+    def revoke_token(self, jti: str, user_id: int | None, expires_at: float) -> None:
+        from app.models.token import RevokedToken
+
+        super().revoke_token(jti, user_id, expires_at)
+        with self._session_factory() as db:
+            db.merge(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            db.commit()
+
+    def revoke_user(self, user_id: int) -> None:
+        from app.models.token import UserTokenRevocation
+
+        now = time.time()
+        expires_at = now + self._user_cutoff_ttl()
+        self._set_user_cutoff(user_id, now, expires_at)
+        with self._session_factory() as db:
+            db.merge(UserTokenRevocation(user_id=user_id, not_before=now, expires_at=expires_at))
+            db.commit()
+
+    def maintain(self) -> None:
+        """Pull revocations written by other workers and purge expired rows."""
+        from sqlalchemy import delete, func, select
+        from app.models.token import RevokedToken, UserTokenRevocation
+
+        now = time.time()
+        with self._session_factory() as db:
+            # Use the database clock for the sync watermark, since revoked_at is set by the server
+            synced_until = db.execute(select(func.now())).scalar()
+            tokens = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+            users = select(
+                UserTokenRevocation.user_id, UserTokenRevocation.not_before, UserTokenRevocation.expires_at
+            ).where(UserTokenRevocation.expires_at > now)
+            if self._synced_until is not None:
+                since = self._synced_until - self.SYNC_OVERLAP
+                tokens = tokens.where(RevokedToken.revoked_at >= since)
+                users = users.where(UserTokenRevocation.revoked_at >= since)
+            new_tokens = db.execute(tokens).all()
+            new_users = db.execute(users).all()
+
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            db.execute(delete(UserTokenRevocation).where(UserTokenRevocation.expires_at <= now))
+            db.commit()
+
+        with self._lock:
+            for jti, expires_at in new_tokens:
+                self._tokens[jti] = expires_at
+        for user_id, not_before, expires_at in new_users:
+            self._set_user_cutoff(user_id, not_before, expires_at)
+        self._synced_until = synced_until
+        super().maintain()
+
+# ----- Redis backend -----
+class RedisRevocationStore(RevocationStore):
+    """
+    Revocation store on a Redis-compatible server.
+
+    Args:
+        client: A redis-py compatible client (`redis.Redis`, `fakeredis.FakeRedis`, ...).
+        prefix (str): Key prefix.
+    """
+
+    def __init__(self, client, prefix: str = "revoked"):
+        self._client = client
+        self._prefix = prefix
+
+    def revoke_token(self, jti: str, user_id: int | None, expires_at: float) -> None:
+        ttl = int(expires_at - time.time()) + 1
+        if ttl > 0:
+            self._client.set(f"{self._prefix}:jti:{jti}", 1, ex=ttl)
+
+    def revoke_user(self, user_id: int) -> None:
+        self._client.set(
+            f"{self._prefix}:user:{user_id}", repr(time.time()), ex=int(self._user_cutoff_ttl()) + 1
+        )
+
+    def is_revoked(self, claims: dict) -> bool:
+        token_flag, cutoff = self._client.mget(
+            f"{self._prefix}:jti:{claims.get('jti')}", f"{self._prefix}:user:{claims.get('sub')}"
+        )
+        if token_flag is not None:
+            return True
+        return cutoff is not None and float(claims.get("iat", 0)) < float(cutoff)
+
+# ----- Factory -----
+def build_revocation_store() -> RevocationStore:
+    """
+    Create the store selected by `REVOCATION_BACKEND`.
+
+    Raises:
+        ValueError: If the backend name is unknown or Redis is selected without `REDIS_URL`.
+
+    Returns:
+        RevocationStore: The configured backend.
+    """
+    backend = settings.REVOCATION_BACKEND
+    if backend == "memory":
+        return MemoryRevocationStore()
+    if backend == "sql":
+        from app.db.session import SessionLocal
+        return SQLRevocationStore(SessionLocal)
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("REVOCATION_BACKEND=redis requires REDIS_URL")
+        import redis
+        return RedisRevocationStore(redis.Redis.from_url(settings.REDIS_URL))
+    raise ValueError(f"Unknown REVOCATION_BACKEND: {backend!r}")
+
+
+# ----- Shared store instance -----
+revocation_store = build_revocation_store()
@@ -0,0 +1,163 @@
+"""
+Roles and permission claims of access tokens.
+
+This module provides:
+1. `Role`, the roles a user can hold, stored space-separated in `users.roles`.
+2. The `roles` and `pv` (permissions version) claims that `create_access_token`
+   embeds at login and refresh, so role checks need no user lookup.
+3. `PermissionsCache`, a bounded TTL cache of each user's current permissions
+   version. Changing a user's roles bumps the version, so tokens issued before
+   are rejected by `require_role` (see `app.core.deps`) although they have not
+   expired yet.
+
+The cache is invalidated immediately in the process that changed the roles.
+Other workers notice within `PERMISSIONS_CACHE_TTL_SECONDS`.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from enum import Enum
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.user import User
+
+# ----- Roles -----
+class Role(str, Enum):
+    """
+    Roles granted to users.
+
+    Attributes:
+        ADMIN: Manages users and reads the diagnostics endpoints.
+    """
+    ADMIN = "admin"
+
+def parse_roles(value: str | None) -> tuple[str, ...]:
+    """
+    Args:
+        value (str | None): The `users.roles` column.
+
+    Returns:
+        tuple[str, ...]: Role names, sorted.
+    """
+    return tuple(sorted(set(value.split()))) if value else ()
+
+def format_roles(roles: Iterable[Role | str]) -> str:
+    """
+    Args:
+        roles (Iterable[Role | str]): Roles to store.
+
+    Raises:
+        ValueError: If a role is unknown.
+
+    Returns:
+        str: Value of the `users.roles` column.
+    """
+    return " ".join(sorted({Role(role).value for role in roles}))
+
+# ----- Claims -----
+def access_claims(user_id: int, roles: str | None, permissions_version: int) -> dict:
+    """
+    Build the claims of an access token.
+
+    Args:
+        user_id (int): ID of the user.
+        roles (str | None): The user's `roles` column.
+        permissions_version (int): The user's `permissions_version` column.
+
+    Returns:
+        dict: `sub`, `roles` and `pv` claims for `create_access_token`.
+    """
+    return {"sub": str(user_id), "roles": list(parse_roles(roles)), "pv": permissions_version}
+
+def access_claims_query(user_id: int):
+    """
+    Build the query for the columns `access_claims` needs, e.g. when refreshing a token.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        Select: ID, roles and permissions version of the user.
+    """
+    return select(User.id, User.roles, User.permissions_version).where(User.id == user_id)
+
+def permissions_version_query(user_id: int):
+    """
+    Build the query for a user's current permissions version.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        Select: Primary key lookup of `permissions_version`.
+    """
+    return select(User.permissions_version).where(User.id == user_id)
+
+# ----- Cache -----
+class PermissionsCache:
+    """
+    Thread-safe LRU/TTL cache of permissions versions keyed by user ID.
+
+    Args:
+        max_size (int): Maximum number of cached users. 0 disables the cache.
+        ttl (float): Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> int | None:
+        """
+        Args:
+            user_id (int): ID of the user.
+
+        Returns:
+            int | None: The cached version, or None if absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[0]
+
+    def put(self, user_id: int, version: int) -> None:
+        """
+        Args:
+            user_id (int): ID of the user.
+            version (int): The version read from the database.
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Forget a user's version after their roles changed.
+
+        Args:
+            user_id (int): ID of the user.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+permissions_cache = PermissionsCache(settings.PERMISSIONS_CACHE_MAX_SIZE, settings.PERMISSIONS_CACHE_TTL_SECONDS)
@@ -2,28 +2,94 @@
 Security utilities for password hashing and JWT token management.
 
 Provides:
-1. Password hashing and verification using bcrypt.
-2. JWT access token creation and decoding.
+1. Password hashing and verification with the schemes and costs configured
+   in settings (bcrypt by default, argon2 optionally), including detection of
+   stored hashes that should be upgraded. The context is built at startup
+   or on first use, not at import.
+2. Async variants that run hashing on the dedicated hashing pool, and
+   blocking variants of them for sync routes, which run in the threadpool.
+3. A dummy verification for unknown users, so failed logins take the same
+   time whether or not the email exists.
+4. JWT access token creation and decoding with the keys of `app.core.keys`.
+
+Every operation is timed into the application metrics (`app.core.metrics`).
 """
 
+import time
+import uuid
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from anyio import from_thread
+from jose import JWTError
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.keys import get_key_ring
+from app.core.lazy import lazy
+from app.core.hashing import hashing_pool, _timed_hash, _timed_verify, _timed_dummy_verify
+from app.core.metrics import timed
 
 # ----- JWT Settings -----
-SECRET_KEY = settings.SECRET_KEY      # Secret key for signing JWTs
-ALGORITHM = settings.ALGORITHM        # Algorithm used for JWT encoding
-ACCESS_TOKEN_EXPIRE_MINUTES = 60      # Default token expiration time
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES  # Default token expiration time
 
 # ----- Password context -----
-# Passlib context to hash and verify passwords
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_crypt_context(
+    schemes: list[str] | None = None,
+    bcrypt_rounds: int | None = None,
+    argon2_time_cost: int | None = None,
+) -> CryptContext:
+    """
+    Build the passlib context from the password settings.
+
+    The first scheme hashes new passwords; the others are only accepted for
+    verification and marked deprecated. The configured cost is also the only
+    accepted one, so hashes made with an older (lower or higher) cost are
+    reported by `password_needs_update` as well.
+
+    Args:
+        schemes (list[str] | None): Overrides `PASSWORD_SCHEMES`.
+        bcrypt_rounds (int | None): Overrides `BCRYPT_ROUNDS`.
+        argon2_time_cost (int | None): Overrides `ARGON2_TIME_COST`.
+
+    Returns:
+        CryptContext: The configured context.
+    """
+    schemes = schemes or settings.PASSWORD_SCHEMES
+    options = {}
+    if "bcrypt" in schemes:
+        rounds = bcrypt_rounds or settings.BCRYPT_ROUNDS
+        options.update(bcrypt__rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds)
+    if "argon2" in schemes:
+        # argon2 compares memory cost and parallelism itself; time cost is its "rounds"
+        time_cost = argon2_time_cost or settings.ARGON2_TIME_COST
+        options.update(
+            argon2__time_cost=time_cost,
+            argon2__min_rounds=time_cost,
+            argon2__max_rounds=time_cost,
+            argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+            argon2__parallelism=settings.ARGON2_PARALLELISM,
+        )
+    return CryptContext(schemes=schemes, default=schemes[0], deprecated="auto", **options)
+
+# Passlib context to hash and verify passwords, built at startup or by the first
+# password operation (and once per hashing worker process)
+get_crypt_context = lazy(build_crypt_context)
+
+def load_password_backends() -> None:
+    """
+    Build the password context and load the backend of each scheme.
+
+    passlib loads a backend (and runs its self-test) on the first hash or
+    verification; calling this at startup keeps that cost off the first login.
+    """
+    context = get_crypt_context()
+    for scheme in context.schemes():
+        handler = context.handler(scheme)
+        if hasattr(handler, "get_backend"):
+            handler.get_backend()
 
 # ----- Password utilities -----
 def hash_password(password: str) -> str:
     """
-    Hashes a plain password using bcrypt.
+    Hashes a plain password with the default scheme.
 
     Args:
         password (str): Plain text password.
@@ -31,7 +97,8 @@ def hash_password(password: str) -> str:
     Returns:
         str: Hashed password.
     """
-    return pwd_context.hash(password)
+    with timed("hash"):
+        return get_crypt_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -44,13 +111,122 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if passwords match, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    with timed("verify"):
+        return get_crypt_context().verify(plain_password, hashed_password)
+
+def password_needs_update(hashed_password: str) -> bool:
+    """
+    Checks whether a stored hash uses a deprecated scheme or a different cost
+    than configured. Cheap: only the hash string is parsed.
+
+    Args:
+        hashed_password (str): Hashed password stored in the database.
+
+    Returns:
+        bool: True if the hash should be replaced after the next successful verification.
+    """
+    return get_crypt_context().needs_update(hashed_password)
+
+def dummy_verify() -> None:
+    """
+    Spends the time of a password verification without a stored hash.
+
+    Called when the email of a login attempt is unknown, so response times do
+    not reveal which emails are registered.
+    """
+    with timed("verify"):
+        get_crypt_context().dummy_verify()
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes a plain password on the hashing pool without blocking the event loop.
+
+    Args:
+        password (str): Plain text password.
+
+    Raises:
+        HTTPException: 503 if the hashing pool queue is full.
+
+    Returns:
+        str: Hashed password.
+    """
+    return await hashing_pool.run(_timed_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password on the hashing pool without blocking the event loop.
+
+    Args:
+        plain_password (str): Password entered by user.
+        hashed_password (str): Hashed password stored in the database.
+
+    Raises:
+        HTTPException: 503 if the hashing pool queue is full.
+
+    Returns:
+        bool: True if passwords match, False otherwise.
+    """
+    return await hashing_pool.run(_timed_verify, plain_password, hashed_password)
+
+async def dummy_verify_async() -> None:
+    """
+    Runs `dummy_verify` on the hashing pool without blocking the event loop.
+
+    Raises:
+        HTTPException: 503 if the hashing pool queue is full.
+    """
+    await hashing_pool.run(_timed_dummy_verify)
+
+# Sync routes run in the threadpool: these wait there for the hashing pool,
+# so the pool's admission control applies to them too.
+def hash_password_pooled(password: str) -> str:
+    """
+    Hashes a plain password on the hashing pool, from a threadpool worker.
+
+    Args:
+        password (str): Plain text password.
+
+    Raises:
+        HTTPException: 503 if the hashing pool queue is full.
+
+    Returns:
+        str: Hashed password.
+    """
+    return from_thread.run(hash_password_async, password)
+
+def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password on the hashing pool, from a threadpool worker.
+
+    Args:
+        plain_password (str): Password entered by user.
+        hashed_password (str): Hashed password stored in the database.
+
+    Raises:
+        HTTPException: 503 if the hashing pool queue is full.
+
+    Returns:
+        bool: True if passwords match, False otherwise.
+    """
+    return from_thread.run(verify_password_async, plain_password, hashed_password)
+
+def dummy_verify_pooled() -> None:
+    """
+    Runs `dummy_verify` on the hashing pool, from a threadpool worker.
+
+    Raises:
+        HTTPException: 503 if the hashing pool queue is full.
+    """
+    from_thread.run(dummy_verify_async)
 
 # ----- JWT utilities -----
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
     Creates a JWT access token with an optional expiration.
 
+    Every token gets a unique `jti` and a sub-second `iat` so it can be revoked
+    individually (logout) or together with all older tokens of its user.
+
     Args:
         data (dict): Payload data to encode in the token (e.g., user ID).
         expires_delta (timedelta | None): Optional token expiration time. Defaults to ACCESS_TOKEN_EXPIRE_MINUTES.
@@ -60,8 +236,9 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     """
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
+    with timed("jwt_encode"):
+        return get_key_ring().encode(to_encode)
 
 def decode_access_token(token: str):
     """
@@ -74,6 +251,7 @@ def decode_access_token(token: str):
         dict | None: Decoded token payload if valid, None if invalid or expired.
     """
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with timed("jwt_decode"):
+            return get_key_ring().decode(token)
     except JWTError:
         return None
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+In-process cache of verified access tokens.
+
+Verifying a JWT signature on every authenticated request is wasted work when
+the same token is presented again and again. This module provides:
+1. `TokenCache`, a bounded LRU of verified claims keyed by the token's SHA-256
+   digest, whose entries expire at the token's `exp` or after
+   `TOKEN_CACHE_TTL_SECONDS`, whichever comes first.
+2. Per-user invalidation, so the tokens of a changed or deleted user are
+   verified again in this process. Other workers drop them once they expire.
+
+Entries hold the claims only: the user is never cached, and revocation is
+still checked on every hit (see `app.core.deps.get_token_claims`).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+# ----- Entries -----
+@dataclass(frozen=True, slots=True)
+class CachedToken:
+    """
+    A verified token held in the cache.
+
+    Attributes:
+        claims (dict): Decoded JWT claims.
+        user_id (int): ID of the token's user (its `sub` claim).
+        expires_at (float): Epoch seconds after which the entry is discarded.
+    """
+    claims: dict
+    user_id: int
+    expires_at: float
+
+# ----- Cache -----
+class TokenCache:
+    """
+    Thread-safe LRU/TTL cache of verified tokens.
+
+    Args:
+        max_size (int): Maximum number of cached tokens. 0 disables the cache.
+        ttl (float): Maximum lifetime of an entry in seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, CachedToken] = OrderedDict()
+        self._by_user: dict[int, set[bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _remove(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_user.get(entry.user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry.user_id]
+
+    def get(self, token: str) -> CachedToken | None:
+        """
+        Look up a token.
+
+        Args:
+            token (str): Raw JWT as sent by the client.
+
+        Returns:
+            CachedToken | None: The cached entry, or None on a miss or expiry.
+        """
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, claims: dict) -> None:
+        """
+        Store a verified token.
+
+        Args:
+            token (str): Raw JWT as sent by the client.
+            claims (dict): Decoded JWT claims (must contain `sub` and `exp`).
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = min(float(claims.get("exp", 0)), time.time() + self.ttl)
+        if expires_at <= time.time():
+            return
+        key = self._key(token)
+        user_id = int(claims["sub"])
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = CachedToken(claims=claims, user_id=user_id, expires_at=expires_at)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Drop every cached token of a user.
+
+        Args:
+            user_id (int): ID of the user who changed or was deleted.
+        """
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Return cache size and counters.
+
+        Returns:
+            dict: Size, capacity, TTL and hit/miss/eviction/expiration/invalidation counters.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# ----- Shared cache instance -----
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE if settings.TOKEN_CACHE_ENABLED else 0,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,47 @@
+"""
+Schema bootstrap for local development, tests and load tests.
+
+This module handles:
+1. Stand-ins for the reference tables that `user_selections` points to
+   (`stocks`, `cryptocurrencies`, `currencies`). They are owned by other
+   services, so only their key columns are declared: enough for the foreign
+   keys to resolve and for the whole schema to be created in an empty database.
+2. `create_schema`, which creates the missing tables of this service and the
+   stand-ins. Existing tables, including real reference tables, are left alone.
+"""
+
+from sqlalchemy import Column, Integer, String, Table, inspect
+from sqlalchemy.engine import Connection, Engine
+from app.db.session import Base
+from app.models.token import RefreshToken, RevokedToken, UserTokenRevocation
+from app.models.user import User, UserSearchTrigram, UserSelection
+
+# ----- Reference table stand-ins -----
+REFERENCE_TABLES = [
+    Table("stocks", Base.metadata, Column("id", Integer, primary_key=True)),
+    Table("cryptocurrencies", Base.metadata, Column("id", Integer, primary_key=True)),
+    Table("currencies", Base.metadata, Column("currency_code", String(10), primary_key=True)),
+]
+
+# Tables owned by this service, in dependency order
+SERVICE_TABLES = [
+    User.__table__, UserSelection.__table__, RefreshToken.__table__,
+    RevokedToken.__table__, UserTokenRevocation.__table__, UserSearchTrigram.__table__,
+]
+
+# ----- Bootstrap -----
+def create_schema(bind: Engine | Connection) -> list[str]:
+    """
+    Create every missing table (reference stand-ins first).
+
+    Args:
+        bind (Engine | Connection): Sync engine or connection. For async engines,
+            call it through `AsyncConnection.run_sync`.
+
+    Returns:
+        list[str]: Names of the tables that were created.
+    """
+    tables = REFERENCE_TABLES + SERVICE_TABLES
+    existing = set(inspect(bind).get_table_names())
+    Base.metadata.create_all(bind, tables=tables)
+    return [table.name for table in tables if table.name not in existing]
@@ -0,0 +1,157 @@
+"""
+Database URLs and dialect-specific engine tuning.
+
+This module handles:
+1. Resolving the sync and async database URLs. `DATABASE_URL` and
+   `ASYNC_DATABASE_URL` are derived from each other when only one is set,
+   and SQL Server (built from the `SQL_SERVER_*` settings) is the fallback.
+2. Engine keyword arguments per backend:
+   - SQLite: connections usable across threads, one shared connection for
+     in-memory databases.
+   - PostgreSQL: the psycopg (3) driver for both sync and async engines.
+   - SQL Server: pyodbc `fast_executemany` for bulk statements.
+3. SQLite pragmas (`SQLITE_PRAGMAS`, WAL journaling by default) applied to
+   every new connection.
+"""
+
+import urllib
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
+from app.core.config import settings
+from app.db.pool import pool_options
+
+# Sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "mssql+pyodbc": "mssql+aioodbc",
+}
+SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+asyncpg": "postgresql+psycopg",
+    "mssql+aioodbc": "mssql+pyodbc",
+}
+# Pool arguments that only apply to queue pools
+QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+# ----- URLs -----
+def sql_server_url(is_async: bool = False) -> str:
+    """
+    SQL Server URL built from the `SQL_SERVER_*` settings.
+
+    Args:
+        is_async (bool): Use the aioodbc driver instead of pyodbc.
+
+    Raises:
+        ValueError: If the SQL Server settings are incomplete.
+
+    Returns:
+        str: SQLAlchemy URL with an ODBC connection string.
+    """
+    required = ("SQL_SERVER_HOST", "SQL_SERVER_PORT", "SQL_SERVER_DB", "SQL_SERVER_USER", "SQL_SERVER_PASSWORD")
+    missing = [name for name in required if getattr(settings, name) is None]
+    if missing:
+        raise ValueError(f"Set DATABASE_URL or the SQL Server settings ({', '.join(missing)} missing)")
+    conn_str = (
+        f"DRIVER={{{settings.SQL_SERVER_DRIVER}}};"
+        f"SERVER={settings.SQL_SERVER_HOST},{settings.SQL_SERVER_PORT};"
+        f"DATABASE={settings.SQL_SERVER_DB};"
+        f"UID={settings.SQL_SERVER_USER};"
+        f"PWD={settings.SQL_SERVER_PASSWORD};"
+        "TrustServerCertificate=yes;"  # Accept self-signed certificates
+    )
+    driver = "mssql+aioodbc" if is_async else "mssql+pyodbc"
+    return f"{driver}:///?odbc_connect={urllib.parse.quote_plus(conn_str)}"
+
+def _with_driver(url: str, drivers: dict[str, str]) -> str:
+    parsed = make_url(url)
+    if parsed.drivername not in drivers:
+        raise ValueError(f"No matching driver for {parsed.drivername!r}; set both database URLs")
+    return parsed.set(drivername=drivers[parsed.drivername]).render_as_string(hide_password=False)
+
+def database_url() -> str:
+    """
+    URL of the sync engine.
+
+    Returns:
+        str: `DATABASE_URL` (plain "postgresql://" uses psycopg), else derived
+        from `ASYNC_DATABASE_URL`, else SQL Server.
+    """
+    if settings.DATABASE_URL:
+        if make_url(settings.DATABASE_URL).drivername == "postgresql":
+            return _with_driver(settings.DATABASE_URL, ASYNC_DRIVERS)
+        return settings.DATABASE_URL
+    if settings.ASYNC_DATABASE_URL:
+        return _with_driver(settings.ASYNC_DATABASE_URL, SYNC_DRIVERS)
+    return sql_server_url()
+
+def async_database_url() -> str:
+    """
+    URL of the async engine.
+
+    Returns:
+        str: `ASYNC_DATABASE_URL`, else derived from `DATABASE_URL`, else SQL Server.
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    if settings.DATABASE_URL:
+        return _with_driver(settings.DATABASE_URL, ASYNC_DRIVERS)
+    return sql_server_url(is_async=True)
+
+# ----- Engine options -----
+def _is_memory_sqlite(url) -> bool:
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Keyword arguments for `create_engine`/`create_async_engine`.
+
+    Args:
+        url (str): Database URL.
+        is_async (bool): Whether the options are for an async engine.
+
+    Returns:
+        dict: Pool options (see `app.db.pool`) plus the backend's tuning.
+    """
+    options = pool_options(is_async)
+    parsed = make_url(url)
+    backend, driver = parsed.get_backend_name(), parsed.get_driver_name()
+    if backend == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(parsed):
+            # Every connection would get its own empty database; share one instead
+            options["poolclass"] = StaticPool
+            for name in QUEUE_POOL_OPTIONS:
+                options.pop(name)
+    elif backend == "postgresql":
+        options["connect_args"] = {"application_name": "fast-api-auth"}
+    elif backend == "mssql" and driver == "pyodbc":
+        # Lets pyodbc send executemany() batches in one round trip
+        options["fast_executemany"] = settings.DB_FAST_EXECUTEMANY
+    return options
+
+def configure_dialect(engine: Engine) -> None:
+    """
+    Apply per-connection tuning; currently the SQLite pragmas.
+
+    Args:
+        engine (Engine): Sync engine (use `AsyncEngine.sync_engine` for async engines).
+    """
+    if engine.dialect.name != "sqlite" or not settings.SQLITE_PRAGMAS:
+        return
+    pragmas = [f"PRAGMA {name}={value}" for name, value in settings.SQLITE_PRAGMAS.items()]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
@@ -0,0 +1,243 @@
+"""
+Connection pool configuration and telemetry.
+
+This module handles:
+1. Translating the `DB_POOL_*` settings into engine keyword arguments.
+2. An idle-based pre-ping that only tests connections that sat unused in the
+   pool longer than `DB_PRE_PING_IDLE_SECONDS`, instead of on every checkout.
+3. Pool classes that record checkout latency and timeouts for the internal
+   stats endpoint and the "pool" metrics phase.
+4. Pool warm-up: opening connections at startup, so the first requests of a
+   worker do not pay for connection setup (`DB_POOL_WARMUP`).
+"""
+
+import threading
+import time
+from contextlib import AsyncExitStack, ExitStack
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core import metrics
+from app.core.config import settings
+
+# ----- Statistics -----
+@dataclass
+class PoolStats:
+    """
+    Cumulative checkout counters for a connection pool.
+
+    Attributes:
+        checkouts (int): Successful checkouts.
+        timeouts (int): Checkouts that gave up after `DB_POOL_TIMEOUT`.
+        checkout_time_total (float): Sum of seconds spent waiting for a connection.
+        checkout_time_max (float): Longest observed checkout wait in seconds.
+        pings (int): Idle pre-pings issued.
+        ping_failures (int): Idle pre-pings that found a dead connection.
+    """
+    checkouts: int = 0
+    timeouts: int = 0
+    checkout_time_total: float = 0.0
+    checkout_time_max: float = 0.0
+    pings: int = 0
+    ping_failures: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_checkout(self, elapsed: float, timed_out: bool) -> None:
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.checkout_time_total += elapsed
+            self.checkout_time_max = max(self.checkout_time_max, elapsed)
+
+    def record_ping(self, ok: bool) -> None:
+        with self.lock:
+            self.pings += 1
+            if not ok:
+                self.ping_failures += 1
+
+# ----- Instrumented pools -----
+class _InstrumentedPoolMixin:
+    """Times every checkout, including the wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.record_checkout(elapsed, timed_out)
+            metrics.record("pool", elapsed)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the counters.
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# ----- Engine options -----
+def pool_options(is_async: bool = False) -> dict:
+    """
+    Build pool-related keyword arguments for `create_engine`/`create_async_engine`.
+
+    Args:
+        is_async (bool): Whether the options are for the async engine.
+
+    Returns:
+        dict: Keyword arguments derived from the `DB_POOL_*` and `DB_PRE_PING` settings.
+    """
+    if settings.DB_PRE_PING not in ("always", "idle", "never"):
+        raise ValueError(f"Unknown DB_PRE_PING strategy: {settings.DB_PRE_PING!r}")
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_PRE_PING == "always",
+    }
+
+def install_idle_pre_ping(engine: Engine, idle_seconds: float) -> None:
+    """
+    Ping pooled connections on checkout only if they have been idle for a while.
+
+    A failed ping raises `DisconnectionError`, which makes the pool discard the
+    connection and transparently retry the checkout with a new one.
+
+    Args:
+        engine (Engine): Sync engine (use `AsyncEngine.sync_engine` for async engines).
+        idle_seconds (float): Minimum idle time before a connection is pinged.
+    """
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.pop("checked_in_at", None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        stats = getattr(engine.pool, "stats", None)
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            if stats:
+                stats.record_ping(ok=False)
+            raise exc.DisconnectionError() from e
+        else:
+            if stats:
+                stats.record_ping(ok=True)
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+def configure_engine(engine: Engine) -> None:
+    """
+    Apply post-creation pool behaviour (currently the idle pre-ping strategy).
+
+    Args:
+        engine (Engine): Sync engine to configure.
+    """
+    if settings.DB_PRE_PING == "idle":
+        install_idle_pre_ping(engine, settings.DB_PRE_PING_IDLE_SECONDS)
+
+# ----- Warm-up -----
+def _warm_up_count(engine: Engine, connections: int) -> int:
+    # Overflow connections are closed when returned, so only pool_size of them would stay open
+    pool = engine.pool
+    return min(connections, pool.size()) if isinstance(pool, QueuePool) else 0
+
+def warm_up(engine: Engine, connections: int) -> int:
+    """
+    Open pooled connections ahead of the first requests.
+
+    The connections are checked out together and then returned, so the pool
+    keeps them open.
+
+    Args:
+        engine (Engine): Sync engine to warm up.
+        connections (int): Connections to open, capped at the pool size.
+
+    Returns:
+        int: Connections opened (0 for pools that do not keep connections).
+    """
+    count = _warm_up_count(engine, connections)
+    with ExitStack() as stack:
+        for _ in range(count):
+            stack.enter_context(engine.connect())
+    return count
+
+async def warm_up_async(engine: AsyncEngine, connections: int) -> int:
+    """
+    Async variant of `warm_up`.
+
+    Args:
+        engine (AsyncEngine): Async engine to warm up.
+        connections (int): Connections to open, capped at the pool size.
+
+    Returns:
+        int: Connections opened.
+    """
+    count = _warm_up_count(engine.sync_engine, connections)
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            await stack.enter_async_context(engine.connect())
+    return count
+
+# ----- Telemetry -----
+def pool_snapshot(engine: Engine) -> dict:
+    """
+    Return live usage and cumulative checkout statistics for an engine's pool.
+
+    Args:
+        engine (Engine): Sync engine to inspect.
+
+    Returns:
+        dict: Pool size, in-use/idle/overflow counts, checkout latency (ms), timeouts and pings.
+    """
+    pool = engine.pool
+    snapshot = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        snapshot.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        with stats.lock:
+            attempts = (stats.checkouts + stats.timeouts) or 1
+            snapshot.update({
+                "checkouts": stats.checkouts,
+                "timeouts": stats.timeouts,
+                "checkout_ms_avg": stats.checkout_time_total / attempts * 1000,
+                "checkout_ms_max": stats.checkout_time_max * 1000,
+                "pings": stats.pings,
+                "ping_failures": stats.ping_failures,
+            })
+    return snapshot
@@ -0,0 +1,222 @@
+"""
+Read replica routing.
+
+This module provides:
+1. `ReplicaSet`, which hands out replica engines round-robin and skips
+   replicas that failed their last health check or dropped a connection,
+   until a later check succeeds.
+2. `ReadYourWrites`, an in-process record of users who wrote recently, so
+   their reads go to the primary until the replicas have caught up.
+3. `PrimarySession`, the session class of the primary, which marks the
+   session's user in `ReadYourWrites` when it commits a write.
+
+Only read-only dependencies (`get_read_db`, `get_async_read_db`) use
+replicas; `get_db` always talks to the primary.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from jose import JWTError, jwt
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from fastapi import Request
+
+from app.core.config import settings
+from app.db.pool import pool_snapshot
+
+# ----- Replica set -----
+class ReplicaSet:
+    """
+    Round-robin selection over healthy replica engines.
+
+    Args:
+        engines (list): Replica engines, all sync (`Engine`) or all async (`AsyncEngine`).
+    """
+
+    def __init__(self, engines: list):
+        self.engines = engines
+        self._healthy = {id(engine): True for engine in engines}
+        self._counter = itertools.count()
+        for engine in engines:
+            self._watch_disconnects(engine)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def _watch_disconnects(self, engine) -> None:
+        sync_engine: Engine = getattr(engine, "sync_engine", engine)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _mark_down(context):
+            if context.is_disconnect:
+                self.mark(engine, healthy=False)
+
+    def mark(self, engine, healthy: bool) -> None:
+        """
+        Record the health of a replica.
+
+        Args:
+            engine: One of the replica engines.
+            healthy (bool): Whether it may receive reads.
+        """
+        self._healthy[id(engine)] = healthy
+
+    def choose(self):
+        """
+        Next healthy replica in round-robin order.
+
+        Returns:
+            The replica engine, or None if no replica is healthy.
+        """
+        count = len(self.engines)
+        start = next(self._counter)
+        for offset in range(count):
+            engine = self.engines[(start + offset) % count]
+            if self._healthy[id(engine)]:
+                return engine
+        return None
+
+    def check(self) -> None:
+        """Ping every sync replica with `SELECT 1` and record the result."""
+        for engine in self.engines:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except Exception:
+                self.mark(engine, healthy=False)
+            else:
+                self.mark(engine, healthy=True)
+
+    async def check_async(self) -> None:
+        """Ping every async replica with `SELECT 1` and record the result."""
+        for engine in self.engines:
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception:
+                self.mark(engine, healthy=False)
+            else:
+                self.mark(engine, healthy=True)
+
+    def snapshot(self) -> list[dict]:
+        """
+        Returns:
+            list[dict]: Per replica: URL (without password), health and pool statistics.
+        """
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self._healthy[id(engine)],
+                **pool_snapshot(getattr(engine, "sync_engine", engine)),
+            }
+            for engine in self.engines
+        ]
+
+# ----- Read-your-writes -----
+class ReadYourWrites:
+    """
+    Users whose reads go to the primary because they wrote recently.
+
+    The record is per process: with several workers, a user's next request
+    may land on a worker that did not see the write.
+
+    Args:
+        window (float): Seconds after a write during which reads use the primary (0 disables).
+        max_size (int): Users tracked at most; the oldest entries are dropped first.
+    """
+
+    def __init__(self, window: float, max_size: int = 100_000):
+        self.window = window
+        self.max_size = max_size
+        self._until: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int | str) -> None:
+        """
+        Send the user's reads to the primary for the next `window` seconds.
+
+        Args:
+            user_id (int | str): User ID (the token's `sub`).
+        """
+        if self.window <= 0:
+            return
+        with self._lock:
+            self._until[str(user_id)] = time.monotonic() + self.window
+            self._until.move_to_end(str(user_id))
+            while len(self._until) > self.max_size:
+                self._until.popitem(last=False)
+
+    def active(self, user_id: str | None) -> bool:
+        """
+        Args:
+            user_id (str | None): User ID, or None for anonymous requests.
+
+        Returns:
+            bool: True if the user wrote within the window.
+        """
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._until.get(user_id)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._until[user_id]
+                return False
+            return True
+
+def request_subject(request: Request) -> str | None:
+    """
+    Subject (`sub`) of the request's bearer token, read without verification.
+
+    Only used to pick a database; authentication still verifies the token.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        str | None: User ID, or None without a readable token.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return str(subject) if subject is not None else None
+
+# ----- Primary sessions -----
+class PrimarySession(Session):
+    """
+    Session on the primary that reports committed writes to `read_your_writes`.
+
+    Set `info["actor"]` to the user ID the session writes for.
+    """
+
+@event.listens_for(PrimarySession, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(PrimarySession, "after_commit")
+def _committed(session):
+    actor = session.info.get("actor")
+    if session.info.pop("wrote", False) and actor is not None:
+        read_your_writes.mark(actor)
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _rolled_back(session):
+    session.info.pop("wrote", None)
+
+
+# ----- Shared read-your-writes record -----
+read_your_writes = ReadYourWrites(settings.DB_READ_YOUR_WRITES_SECONDS)
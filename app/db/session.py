@@ -2,66 +2,309 @@
 Database session management and SQLAlchemy engine setup.
 
 This module handles:
-1. Building the connection string for SQL Server using environment settings.
-2. Creating a SQLAlchemy engine for database interactions.
-3. Providing a session factory to generate database sessions.
+1. Creating a SQLAlchemy engine for the configured database (URL resolution
+   and per-dialect tuning live in `app.db.dialects`). Engines are created at
+   application startup (`init_engines`) or on first use, never at import.
+2. Sharing one engine builder between the primary, async and replica engines.
+3. Providing session factories that bind to the engine on their first session.
 4. Declaring a base class for ORM models.
 5. Providing a dependency (`get_db`) for FastAPI endpoints.
+6. Optionally, an async engine, session factory and `get_async_db` dependency
+   when `DB_ASYNC_MODE` is enabled.
+7. Timing every statement for the application metrics.
+8. Optional read replicas and the `get_read_db` / `get_async_read_db`
+   dependencies for read-only endpoints (see `app.db.replicas`).
 """
 
+from collections.abc import Callable
+
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
-import urllib
-
-# ----- Build connection string -----
-# Connection string for SQL Server using ODBC Driver 17.
-conn_str = (
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={settings.SQL_SERVER_HOST},{settings.SQL_SERVER_PORT};"
-    f"DATABASE={settings.SQL_SERVER_DB};"
-    f"UID={settings.SQL_SERVER_USER};"
-    f"PWD={settings.SQL_SERVER_PASSWORD};"
-    "TrustServerCertificate=yes;"  # Accept self-signed certificates
-)
-
-# URL encode the connection string for SQLAlchemy
-params = urllib.parse.quote_plus(conn_str)
+from app.core.lazy import lazy
+from app.core.metrics import instrument_engine
+from app.db.dialects import async_database_url, configure_dialect, database_url, engine_options
+from app.db.pool import configure_engine
+from app.db.replicas import PrimarySession, ReplicaSet, read_your_writes, request_subject
 
 # ----- Create SQLAlchemy Engine -----
 # Engine manages the database connection pool and executes SQL queries.
-engine = create_engine(
-    f"mssql+pyodbc:///?odbc_connect={params}",
-    pool_pre_ping=True  # Ensures connections are alive before use
-)
+# Pool sizing and the pre-ping strategy come from the DB_POOL_* settings;
+# the backend's own tuning (SQLite pragmas, pyodbc fast_executemany, ...)
+# comes from `app.db.dialects`.
+def build_engine(url: str):
+    """
+    Create a sync engine with the configured pool, dialect tuning, pre-ping and metrics hooks.
+
+    Args:
+        url (str): Database URL.
+
+    Returns:
+        Engine: The configured engine.
+    """
+    new_engine = create_engine(url, **engine_options(url))
+    configure_dialect(new_engine)
+    configure_engine(new_engine)
+    instrument_engine(new_engine)
+    return new_engine
+
+def build_async_engine(url: str):
+    """
+    Create an async engine with the configured pool, dialect tuning, pre-ping and metrics hooks.
+
+    Args:
+        url (str): Async database URL.
+
+    Returns:
+        AsyncEngine: The configured engine.
+    """
+    new_engine = create_async_engine(url, **engine_options(url, is_async=True))
+    configure_dialect(new_engine.sync_engine)
+    configure_engine(new_engine.sync_engine)
+    instrument_engine(new_engine.sync_engine)
+    return new_engine
+
+# ----- Shared engines -----
+# Built on first use, so importing the application needs neither a reachable
+# database nor its driver. The async engine is only built in async mode, so the
+# async driver (aioodbc, aiosqlite, psycopg) is not required otherwise.
+@lazy
+def get_engine() -> Engine:
+    """
+    Returns:
+        Engine: The primary sync engine.
+    """
+    return build_engine(database_url())
+
+@lazy
+def get_async_engine() -> AsyncEngine:
+    """
+    Returns:
+        AsyncEngine: The primary async engine.
+    """
+    return build_async_engine(async_database_url())
+
+# Replica sessions are bound per request to the engine picked by the replica set.
+# Only the replicas of the active mode are created.
+@lazy
+def get_replicas() -> ReplicaSet:
+    """
+    Returns:
+        ReplicaSet: Sync read replicas (empty in async mode).
+    """
+    return ReplicaSet([] if settings.DB_ASYNC_MODE else [build_engine(url) for url in settings.DATABASE_REPLICA_URLS])
+
+@lazy
+def get_async_replicas() -> ReplicaSet:
+    """
+    Returns:
+        ReplicaSet: Async read replicas (empty in sync mode).
+    """
+    return ReplicaSet([build_async_engine(url) for url in settings.ASYNC_DATABASE_REPLICA_URLS]
+                      if settings.DB_ASYNC_MODE else [])
+
+def init_engines() -> list:
+    """
+    Create the engines of the active mode (primary and replicas) ahead of the first request.
+
+    Returns:
+        list: The primary engine followed by the replica engines
+        (`AsyncEngine`s in async mode, `Engine`s otherwise).
+    """
+    if settings.DB_ASYNC_MODE:
+        return [get_async_engine(), *get_async_replicas().engines]
+    return [get_engine(), *get_replicas().engines]
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of every engine that was created."""
+    if get_engine.loaded():
+        get_engine().dispose()
+    if get_replicas.loaded():
+        for replica in get_replicas().engines:
+            replica.dispose()
+    if get_async_engine.loaded():
+        await get_async_engine().dispose()
+    if get_async_replicas.loaded():
+        for replica in get_async_replicas().engines:
+            await replica.dispose()
+
+# ----- Session factories -----
+class _BindOnFirstSession:
+    """
+    Session factory mixin that binds sessions to `bind_factory()` unless a bind is given.
+
+    Args:
+        bind_factory (Callable): Returns the engine, creating it on the first call.
+        **kw: Arguments of the session factory.
+    """
+
+    def __init__(self, bind_factory: Callable, **kw):
+        super().__init__(**kw)
+        self._bind_factory = bind_factory
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw:
+            local_kw["bind"] = self._bind_factory()
+        return super().__call__(**local_kw)
+
+class LazySessionmaker(_BindOnFirstSession, sessionmaker):
+    pass
+
+class LazyAsyncSessionmaker(_BindOnFirstSession, async_sessionmaker):
+    pass
 
-# ----- Session factory -----
 # Creates new database sessions. Each session should be used within a context
-# and closed when done.
-SessionLocal = sessionmaker(
+# and closed when done. Sessions are request-scoped, so objects are not expired
+# on commit: returning an entity after a write needs no reload query.
+SessionLocal = LazySessionmaker(
+    get_engine,
+    class_=PrimarySession,
     autocommit=False,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False,
 )
 
+# expire_on_commit=False avoids implicit lazy loads (which would need I/O)
+# when attributes are read after a commit.
+AsyncSessionLocal = LazyAsyncSessionmaker(
+    get_async_engine,
+    class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def choose_replica(replica_set: ReplicaSet, request: Request):
+    """
+    Pick the replica that serves a read-only request.
+
+    Args:
+        replica_set (ReplicaSet): Replicas of the active mode.
+        request (Request): Incoming request.
+
+    Returns:
+        The replica engine, or None if the primary must serve the request (no
+        healthy replica, or the user wrote within `DB_READ_YOUR_WRITES_SECONDS`).
+    """
+    if not replica_set or read_your_writes.active(request_subject(request)):
+        return None
+    return replica_set.choose()
+
+def read_session() -> Session:
+    """
+    New session for reads outside a request's dependencies, such as streamed responses.
+
+    Returns:
+        Session: Session on a healthy replica, or on the primary.
+    """
+    replicas = get_replicas()
+    replica = replicas.choose() if replicas else None
+    return ReadSessionLocal(bind=replica) if replica is not None else SessionLocal()
+
+def async_read_session() -> AsyncSession:
+    """
+    Async variant of `read_session`.
+
+    Returns:
+        AsyncSession: Session on a healthy replica, or on the primary.
+    """
+    async_replicas = get_async_replicas()
+    replica = async_replicas.choose() if async_replicas else None
+    return AsyncReadSessionLocal(bind=replica) if replica is not None else AsyncSessionLocal()
+
 # ----- Declarative base -----
 # Base class for ORM models. All models should inherit from this.
 Base = declarative_base()
 
 # ----- Dependency for FastAPI -----
-def get_db():
+def get_db(request: Request):
     """
     Dependency to provide a database session to FastAPI endpoints.
 
+    With replicas configured, the session remembers the requesting user so a
+    committed write sends their next reads to the primary.
+
+    Args:
+        request (Request): Incoming request.
+
     Yields:
-        Session: SQLAlchemy database session.
+        Session: SQLAlchemy database session on the primary.
 
     Usage in FastAPI endpoints:
         def endpoint(db: Session = Depends(get_db)):
             ...
     """
     db = SessionLocal()
+    if get_replicas():
+        db.info["actor"] = request_subject(request)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Dependency to provide a session for read-only endpoints.
+
+    Uses a replica when one is configured and healthy. Otherwise it shares
+    the request's primary session, so no second connection is checked out.
+
+    Args:
+        request (Request): Incoming request.
+        db (Session): The request's primary session.
+
+    Yields:
+        Session: Session on a replica, or the primary session.
+    """
+    replica = choose_replica(get_replicas(), request)
+    if replica is None:
+        yield db
+        return
+    read_db = ReadSessionLocal(bind=replica)
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+async def get_async_db(request: Request):
+    """
+    Async dependency to provide a database session to FastAPI endpoints.
+
+    Args:
+        request (Request): Incoming request.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session on the primary.
+
+    Usage in FastAPI endpoints:
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        if get_async_replicas():
+            db.info["actor"] = request_subject(request)
+        yield db
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Async variant of `get_read_db`.
+
+    Args:
+        request (Request): Incoming request.
+        db (AsyncSession): The request's primary session.
+
+    Yields:
+        AsyncSession: Session on a replica, or the primary session.
+    """
+    replica = choose_replica(get_async_replicas(), request)
+    if replica is None:
+        yield db
+        return
+    async with AsyncReadSessionLocal(bind=replica) as read_db:
+        yield read_db
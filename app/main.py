@@ -1,7 +1,163 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
-from app.api import auth, users
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
+from app.api import auth, users, selections, internal, jwks, metrics, profiles
+from app.core.availability import availability_filter
+from app.core.config import settings
+from app.core.hashing import hashing_pool
+from app.core.keys import get_key_ring
+from app.core.metrics import MetricsMiddleware
+from app.core.profiler import ProfilerMiddleware, request_profiler
+from app.core.revocation import revocation_store
+from app.core.security import load_password_backends
+from app.db import bootstrap
+from app.db.pool import warm_up, warm_up_async
+from app.db.session import dispose_engines, get_async_engine, get_engine, get_async_replicas, get_replicas, init_engines
+from app.services import async_user_service
+from app.services.purge_service import run_purge
+from app.services.user_service import load_availability_filter
 
-app = FastAPI(title="Finance API", version="1.0.0")
+logger = logging.getLogger(__name__)
 
-app.include_router(auth.router, prefix="/api")
-app.include_router(users.router, prefix="/api")
\ No newline at end of file
+async def create_schema():
+    """
+    Create missing tables for local development and tests (see `app.db.bootstrap`).
+    """
+    if settings.DB_ASYNC_MODE:
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(bootstrap.create_schema)
+    else:
+        await run_in_threadpool(bootstrap.create_schema, get_engine())
+
+async def init_resources():
+    """
+    Build the shared resources ahead of the first request: the key ring, the
+    password context and its backends, and the engines of the active mode,
+    with `DB_POOL_WARMUP` connections opened per engine.
+
+    Raises:
+        ValueError: If the JWT keys or the database are misconfigured.
+    """
+    get_key_ring()
+    load_password_backends()
+    if settings.DB_ASYNC_MODE:
+        for engine in init_engines():
+            await warm_up_async(engine, settings.DB_POOL_WARMUP)
+    else:
+        for engine in await run_in_threadpool(init_engines):
+            await run_in_threadpool(warm_up, engine, settings.DB_POOL_WARMUP)
+
+async def maintain_revocations():
+    """Periodically purge expired revocations and sync them between workers."""
+    while True:
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+        try:
+            await run_in_threadpool(revocation_store.maintain)
+        except Exception:
+            # A transient database error must not stop future runs
+            logger.exception("Revocation store maintenance failed")
+
+async def check_replicas():
+    """Periodically ping the read replicas so failed ones are skipped and recovered ones reused."""
+    while True:
+        await asyncio.sleep(settings.DB_REPLICA_CHECK_SECONDS)
+        if settings.DB_ASYNC_MODE:
+            await get_async_replicas().check_async()
+        else:
+            await run_in_threadpool(get_replicas().check)
+
+async def maintain_availability_filter():
+    """Load the availability filter, then rebuild it every `AVAILABILITY_FILTER_REFRESH_SECONDS`."""
+    while True:
+        try:
+            if settings.DB_ASYNC_MODE:
+                await async_user_service.load_availability_filter()
+            else:
+                await run_in_threadpool(load_availability_filter)
+        except Exception:
+            # Until a load succeeds, every value is looked up in the database
+            logger.exception("Availability filter load failed")
+        if availability_filter.ready and settings.AVAILABILITY_FILTER_REFRESH_SECONDS <= 0:
+            return
+        # Without periodic rebuilds, a failed first load is retried after 10 seconds
+        await asyncio.sleep(settings.AVAILABILITY_FILTER_REFRESH_SECONDS or 10)
+
+async def purge_deleted_users():
+    """Periodically purge the users deleted more than `USER_RETENTION_DAYS` ago, and expired refresh tokens."""
+    while True:
+        try:
+            purged, pruned = await run_in_threadpool(run_purge)
+            if purged or pruned:
+                logger.info("Purged %d deleted users and %d expired refresh tokens", purged, pruned)
+        except Exception:
+            # A transient database error must not stop future runs
+            logger.exception("Purge of deleted users failed")
+        await asyncio.sleep(settings.PURGE_INTERVAL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    await init_resources()
+    if settings.DB_CREATE_SCHEMA:
+        await create_schema()
+    tasks = [asyncio.create_task(maintain_revocations())]
+    if get_replicas() or get_async_replicas():
+        tasks.append(asyncio.create_task(check_replicas()))
+    if settings.AVAILABILITY_FILTER_ENABLED:
+        tasks.append(asyncio.create_task(maintain_availability_filter()))
+    if settings.PURGE_ENABLED:
+        tasks.append(asyncio.create_task(purge_deleted_users()))
+    logger.info("Startup completed in %.1f ms", (time.perf_counter() - started) * 1000)
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    hashing_pool.shutdown()
+    await dispose_engines()
+
+# ----- Application factory -----
+def create_app() -> FastAPI:
+    """
+    Build the application: routers and middleware, chosen by the settings.
+
+    Nothing connects to the database here. Engines, the password context and
+    the JWT keys are created by the lifespan at startup, or on first use.
+
+    Returns:
+        FastAPI: The application.
+    """
+    # orjson renders the validated response content several times faster than json.dumps
+    app = FastAPI(title="Finance API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+    if settings.DB_ASYNC_MODE:
+        app.include_router(auth.async_router, prefix="/api")
+        app.include_router(users.async_router, prefix="/api")
+        app.include_router(selections.async_router, prefix="/api")
+    else:
+        app.include_router(auth.router, prefix="/api")
+        app.include_router(users.router, prefix="/api")
+        app.include_router(selections.router, prefix="/api")
+    app.include_router(jwks.router)
+    if settings.INTERNAL_STATS_ENABLED:
+        app.include_router(internal.router, prefix="/api")
+    if settings.PROFILER_ENABLED or settings.PROFILER_HEADER_ENABLED:
+        app.include_router(profiles.async_router if settings.DB_ASYNC_MODE else profiles.router, prefix="/api")
+        app.add_middleware(
+            ProfilerMiddleware,
+            profiler=request_profiler,
+            always=settings.PROFILER_ENABLED,
+            header=settings.PROFILER_HEADER_ENABLED,
+            threshold=settings.PROFILER_THRESHOLD_MS / 1000,
+        )
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router)
+        app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+    return app
+
+# For `uvicorn app.main:app`; `uvicorn --factory app.main:create_app` builds a fresh one
+app = create_app()
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, index=True)
+    expires_at = Column(Float, nullable=False)   # epoch seconds, same as the token's exp
+    revoked_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+class UserTokenRevocation(Base):
+    __tablename__ = "user_token_revocations"
+
+    user_id = Column(Integer, primary_key=True)
+    not_before = Column(Float, nullable=False)   # tokens issued before this epoch time are revoked
+    expires_at = Column(Float, nullable=False)
+    revoked_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)    # shared by all rotations of one login
+    token_hash = Column(String(64), unique=True, nullable=False)  # SHA-256 of the opaque token
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)                 # UTC
+    used_at = Column(DateTime, nullable=True)                     # set when rotated
+    revoked_at = Column(DateTime, nullable=True)                  # set on reuse, logout or password change
+
+    __table_args__ = (
+        # Range scan of expired rows by the purge (see app.services.purge_service)
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
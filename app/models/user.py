@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from app.db.session import Base
 
+# `users.status` of soft-deleted users, hidden everywhere until purged (see app.services.purge_service)
+DELETED_STATUS = 0
+
 class User(Base):
     __tablename__ = "users"
     
@@ -13,6 +16,22 @@ class User(Base):
     access_token = Column(String(2048))
     created_at = Column(DateTime, server_default=func.now())
     status = Column(Integer, default=1)
+    # Set with status = DELETED_STATUS; the row is purged once it is older than the retention window
+    deleted_at = Column(DateTime, nullable=True)
+    # Bumped by every ORM update; the profile's ETag and the optimistic lock of writes
+    version = Column(Integer, nullable=False, server_default="1")
+    # Space-separated role names (see app.core.roles), embedded in access tokens
+    roles = Column(String(200), nullable=False, server_default="")
+    # Bumped when the roles change; tokens carrying an older version are rejected by require_role
+    permissions_version = Column(Integer, nullable=False, server_default="1")
+
+    __table_args__ = (
+        # Supports keyset pagination of active users (filter on status, order by id)
+        # and the purge's scan of soft-deleted users
+        Index("ix_users_status_id", "status", "id"),
+    )
+    # UPDATE/DELETE statements match the loaded version and raise StaleDataError if it changed
+    __mapper_args__ = {"version_id_col": version}
 
 class UserSelection(Base):
     __tablename__ = "user_selections"
@@ -24,4 +43,42 @@ class UserSelection(Base):
     currency_code = Column(String(10), ForeignKey("currencies.currency_code"), nullable=True)
     selected_at = Column(DateTime)
     created_at = Column(DateTime, server_default=func.now())
-    status = Column(Integer, default=1)
\ No newline at end of file
+    status = Column(Integer, default=1)
+
+    __table_args__ = (
+        # A user's watchlist (status = 1), covering the returned columns where supported
+        Index(
+            "ix_user_selections_user_status", "user_id", "status",
+            mssql_include=["stock_id", "crypto_id", "currency_code", "selected_at"],
+            postgresql_include=["stock_id", "crypto_id", "currency_code", "selected_at"],
+        ),
+        # One row per user and target (removed selections are reactivated), and
+        # follower counts per target: a range of the index, no table access
+        *(
+            Index(
+                f"ux_user_selections_{column}_user", column, "user_id",
+                unique=True,
+                mssql_where=text(f"{column} IS NOT NULL"),
+                postgresql_where=text(f"{column} IS NOT NULL"),
+                sqlite_where=text(f"{column} IS NOT NULL"),
+                mssql_include=["status"],
+                postgresql_include=["status"],
+            )
+            for column in ("stock_id", "crypto_id", "currency_code")
+        ),
+    )
+
+# Substring search index (see app.services.search_service): one row per
+# distinct lowercase trigram of each user's username, email and phone number
+class UserSearchTrigram(Base):
+    __tablename__ = "user_search_trigrams"
+
+    # Primary key order serves the search: the users holding a trigram, in ID order
+    field = Column(SmallInteger, primary_key=True, autoincrement=False)
+    trigram = Column(String(3), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, autoincrement=False)
+
+    __table_args__ = (
+        # Reindexing and deleting a user
+        Index("ix_user_search_trigrams_user", "user_id"),
+    )
@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+
+# Targets accepted per bulk request
+MAX_SELECTIONS_PER_REQUEST = 1000
+
+# ----- Requests -----
+class SelectionTarget(BaseModel):
+    """
+    A stock, cryptocurrency or currency a user can follow. Exactly one field is set.
+    
+    Attributes:
+        stock_id (Optional[int]): ID of a row in `stocks`.
+        crypto_id (Optional[int]): ID of a row in `cryptocurrencies`.
+        currency_code (Optional[str]): Code of a row in `currencies`.
+    """
+    stock_id: Optional[int] = None
+    crypto_id: Optional[int] = None
+    currency_code: Optional[str] = Field(None, max_length=10)
+
+    @model_validator(mode="after")
+    def exactly_one_target(self) -> "SelectionTarget":
+        if sum(value is not None for value in (self.stock_id, self.crypto_id, self.currency_code)) != 1:
+            raise ValueError("Set exactly one of stock_id, crypto_id and currency_code")
+        return self
+
+
+class SelectionBulkRequest(BaseModel):
+    """
+    Schema for adding or removing several selections at once.
+    
+    Attributes:
+        selections (list[SelectionTarget]): Targets to add or remove (1-1000).
+    """
+    selections: list[SelectionTarget] = Field(min_length=1, max_length=MAX_SELECTIONS_PER_REQUEST)
+
+
+# ----- Responses -----
+class UserSelectionResponse(BaseModel):
+    """
+    One entry of a user's watchlist.
+    
+    Attributes:
+        stock_id (Optional[int]): Followed stock.
+        crypto_id (Optional[int]): Followed cryptocurrency.
+        currency_code (Optional[str]): Followed currency.
+        selected_at (Optional[datetime]): When the target was (last) added.
+    """
+    stock_id: Optional[int] = None
+    crypto_id: Optional[int] = None
+    currency_code: Optional[str] = None
+    selected_at: Optional[datetime] = None
+
+
+class SelectionBulkResponse(BaseModel):
+    """
+    Outcome of a bulk add or remove.
+    
+    Attributes:
+        changed (int): Targets added (or reactivated) or removed.
+        unchanged (int): Targets already in the requested state.
+    """
+    changed: int
+    unchanged: int
+
+
+class SelectionFollowersResponse(BaseModel):
+    """
+    Number of users following a target.
+    
+    Attributes:
+        stock_id (Optional[int]): The stock, for stock targets.
+        crypto_id (Optional[int]): The cryptocurrency, for crypto targets.
+        currency_code (Optional[str]): The currency, for currency targets.
+        followers (int): Users with an active selection of the target.
+    """
+    stock_id: Optional[int] = None
+    crypto_id: Optional[int] = None
+    currency_code: Optional[str] = None
+    followers: int
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 from datetime import datetime
+from app.core.roles import Role
 
 # ----- Requests -----
 class UserRegisterRequest(BaseModel):
@@ -47,6 +48,36 @@ class UserUpdateRequest(BaseModel):
     password: Optional[str] = None
 
 
+class TokenRefreshRequest(BaseModel):
+    """
+    Schema for exchanging a refresh token for a new access token.
+    
+    Attributes:
+        refresh_token (str): Refresh token returned by login or a previous refresh.
+    """
+    refresh_token: str
+
+
+class UserRolesRequest(BaseModel):
+    """
+    Schema for replacing a user's roles.
+    
+    Attributes:
+        roles (list[Role]): The complete set of roles; an empty list removes them all.
+    """
+    roles: list[Role]
+
+
+class LogoutRequest(BaseModel):
+    """
+    Optional body for logout requests.
+    
+    Attributes:
+        refresh_token (Optional[str]): Refresh token of this session; its whole rotation family is revoked.
+    """
+    refresh_token: Optional[str] = None
+
+
 # ----- Responses -----
 class UserRegisterResponse(BaseModel):
     """
@@ -60,16 +91,32 @@ class UserRegisterResponse(BaseModel):
     password: Optional[str] = None
 
 
+class UserAvailabilityResponse(BaseModel):
+    """
+    Schema for availability check responses. Only the fields that were asked are present.
+    
+    Attributes:
+        username (Optional[bool]): True if the username is free.
+        email (Optional[bool]): True if the email is free.
+        phone_number (Optional[bool]): True if the phone number is free.
+    """
+    username: Optional[bool] = None
+    email: Optional[bool] = None
+    phone_number: Optional[bool] = None
+
+
 class UserLoginResponse(BaseModel):
     """
-    Schema for user login response.
+    Schema for user login and token refresh responses.
     
     Attributes:
-        access_token (str): JWT access token for authentication.
+        access_token (str): Short-lived JWT access token for authentication.
         user_id (int): ID of the authenticated user.
+        refresh_token (Optional[str]): Single-use token for POST /api/auth/refresh.
     """
     access_token: str
     user_id: int
+    refresh_token: Optional[str] = None
 
 
 class UserResponse(BaseModel):
@@ -82,14 +129,13 @@ class UserResponse(BaseModel):
         email (EmailStr): Email address of the user.
     
     Config:
-        orm_mode = True: Enables compatibility with ORM objects (like SQLAlchemy models).
+        from_attributes = True: Enables compatibility with ORM objects (like SQLAlchemy models).
     """
     id: int
     username: str
     email: EmailStr
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserProfileResponse(BaseModel):
@@ -104,7 +150,7 @@ class UserProfileResponse(BaseModel):
         created_at (datetime): Timestamp of when the user was created.
     
     Config:
-        orm_mode = True: Enables compatibility with ORM objects (like SQLAlchemy models).
+        from_attributes = True: Enables compatibility with ORM objects (like SQLAlchemy models).
     """
     id: int
     username: str
@@ -112,5 +158,57 @@ class UserProfileResponse(BaseModel):
     email: EmailStr
     created_at: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class UserRolesResponse(BaseModel):
+    """
+    Schema for a user's roles after a change.
+    
+    Attributes:
+        id (int): Unique identifier of the user.
+        roles (list[str]): Names of the user's roles.
+        permissions_version (int): Version embedded in tokens issued from now on.
+    """
+    id: int
+    roles: list[str]
+    permissions_version: int
+
+
+class UserImportConflict(BaseModel):
+    """
+    A bulk-import row skipped because a unique field is already taken.
+    
+    Attributes:
+        row (int): 1-based row number in the uploaded file (excluding the CSV header).
+        field (str): Conflicting field (username, email or phone_number).
+        value (str): The value that is already in use.
+    """
+    row: int
+    field: str
+    value: str
+
+
+class UserImportError(BaseModel):
+    """
+    A bulk-import row skipped because it could not be parsed or validated.
+    
+    Attributes:
+        row (int): 1-based row number in the uploaded file (excluding the CSV header).
+        detail (str): Why the row was rejected.
+    """
+    row: int
+    detail: str
+
+
+class UserImportResponse(BaseModel):
+    """
+    Summary of a bulk user import.
+    
+    Attributes:
+        inserted (int): Number of users created.
+        conflicts (list[UserImportConflict]): Rows skipped because of uniqueness conflicts.
+        errors (list[UserImportError]): Rows skipped because they were invalid.
+    """
+    inserted: int = 0
+    conflicts: list[UserImportConflict] = []
+    errors: list[UserImportError] = []
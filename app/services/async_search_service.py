@@ -0,0 +1,31 @@
+"""
+Async counterparts of `app.services.search_service` for use with `AsyncSession`.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.search_service import page_from_rows, search_query
+
+
+async def search_users(
+    db: AsyncSession, field: str, term: str, mode: str, cursor: str | None, limit: int
+) -> tuple[list[dict], str | None]:
+    """
+    Return one page of the active users matching a search.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        field (str): "username", "email" or "phone_number".
+        term (str): Search term.
+        mode (str): "prefix" or "contains".
+        cursor (str | None): `X-Next-Cursor` of the previous page.
+        limit (int): Maximum number of users to return.
+
+    Raises:
+        HTTPException: 422 if a substring term is too short or the cursor is invalid.
+
+    Returns:
+        tuple[list[dict], str | None]: Profile rows and the cursor of the next page.
+    """
+    result = await db.execute(search_query(field, term, mode, cursor, limit))
+    return page_from_rows(result.mappings().all(), field, mode, limit)
@@ -0,0 +1,120 @@
+"""
+Async counterparts of `app.services.selection_service` for use with `AsyncSession`.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.replicas import read_your_writes
+from app.models.user import UserSelection
+from app.schemas.selection import SelectionBulkResponse, SelectionTarget
+from app.services.selection_service import (
+    existing_selections_query,
+    follower_rows,
+    followers_query,
+    group_targets,
+    plan_additions,
+    reactivate_statement,
+    remove_statement,
+    unknown_target,
+    user_status_query,
+    verify_user,
+    watchlist_query,
+)
+
+
+async def list_selections(db: AsyncSession, user_id: int) -> list[dict]:
+    """
+    Return a user's watchlist.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the user.
+
+    Returns:
+        list[dict]: `UserSelectionResponse` fields per active selection.
+    """
+    result = await db.execute(watchlist_query(user_id))
+    return [dict(row) for row in result.mappings()]
+
+
+async def add_selections(db: AsyncSession, user_id: int, targets: list[SelectionTarget]) -> SelectionBulkResponse:
+    """
+    Add targets to a user's watchlist.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the user.
+        targets (list[SelectionTarget]): Targets to add.
+
+    Raises:
+        HTTPException: 404 if the user does not exist or is deleted, 422 if a target does not exist.
+
+    Returns:
+        SelectionBulkResponse: Number of targets added and already followed.
+    """
+    verify_user((await db.execute(user_status_query(user_id))).scalar())
+    groups = group_targets(targets)
+    for attempt in range(2):
+        now = datetime.utcnow()
+        rows = (await db.execute(existing_selections_query(user_id, groups))).all()
+        reactivate, new_rows, unchanged = plan_additions(rows, groups, user_id, now)
+        try:
+            if reactivate:
+                await db.execute(reactivate_statement(reactivate, now))
+            if new_rows:
+                await db.execute(insert(UserSelection), new_rows)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            if attempt:
+                raise unknown_target()
+            continue
+        read_your_writes.mark(user_id)
+        return SelectionBulkResponse(changed=len(reactivate) + len(new_rows), unchanged=unchanged)
+
+
+async def remove_selections(db: AsyncSession, user_id: int, targets: list[SelectionTarget]) -> SelectionBulkResponse:
+    """
+    Remove targets from a user's watchlist.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the user.
+        targets (list[SelectionTarget]): Targets to remove.
+
+    Raises:
+        HTTPException: 404 if the user does not exist or is deleted.
+
+    Returns:
+        SelectionBulkResponse: Number of targets removed and not followed in the first place.
+    """
+    verify_user((await db.execute(user_status_query(user_id))).scalar())
+    groups = group_targets(targets)
+    removed = (await db.execute(remove_statement(user_id, groups))).rowcount
+    await db.commit()
+    read_your_writes.mark(user_id)
+    requested = sum(len(values) for values in groups.values())
+    return SelectionBulkResponse(changed=removed, unchanged=requested - removed)
+
+
+async def count_followers(db: AsyncSession, targets: dict[str, list]) -> list[dict]:
+    """
+    Count the users following each target.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        targets (dict[str, list]): Targets per target column.
+
+    Returns:
+        list[dict]: `SelectionFollowersResponse` fields per target.
+    """
+    result = []
+    for column, values in targets.items():
+        if values:
+            counts = dict((await db.execute(followers_query(column, values))).tuples().all())
+            result.extend(follower_rows(column, values, counts))
+    return result
@@ -0,0 +1,105 @@
+"""
+Async counterparts of `app.services.token_service` for use with `AsyncSession`.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import create_access_token
+from app.core.roles import access_claims, access_claims_query
+from app.models.token import RefreshToken
+from app.schemas.user import UserLoginResponse
+from app.services.token_service import (
+    claim_statement, hash_refresh_token, invalid_refresh_token,
+    new_refresh_token, revoke_family_statement
+)
+
+async def _find(db: AsyncSession, raw_token: str) -> RefreshToken | None:
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(raw_token))
+    )
+    return result.scalars().first()
+
+
+async def issue_refresh_token(db: AsyncSession, user_id: int) -> str:
+    """
+    Start a new refresh token family for a fresh login.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the authenticated user.
+
+    Returns:
+        str: The raw refresh token.
+    """
+    raw_token, row = new_refresh_token(user_id)
+    db.add(row)
+    await db.commit()
+    return raw_token
+
+
+async def rotate_refresh_token(db: AsyncSession, raw_token: str) -> UserLoginResponse:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        raw_token (str): Refresh token presented by the client.
+
+    Raises:
+        HTTPException: 401 if the token is unknown, expired or revoked, or was
+            already used (in which case its whole family is revoked).
+
+    Returns:
+        UserLoginResponse: New access token, user ID and the next refresh token.
+    """
+    token = await _find(db, raw_token)
+    if token is None:
+        raise invalid_refresh_token()
+    if token.expires_at <= datetime.utcnow():
+        raise invalid_refresh_token("Refresh token expired")
+    user_id, family_id = token.user_id, token.family_id
+    if token.revoked_at is not None or token.used_at is not None or (await db.execute(claim_statement(token))).rowcount != 1:
+        # Reuse of a rotated token: assume it leaked and end the whole session
+        await db.rollback()
+        await db.execute(revoke_family_statement(family_id))
+        await db.commit()
+        raise invalid_refresh_token("Refresh token reuse detected")
+
+    # Re-read the roles, so a refreshed token reflects role changes
+    claims_row = (await db.execute(access_claims_query(user_id))).first()
+    if claims_row is None:
+        await db.rollback()
+        raise invalid_refresh_token()
+    next_token, row = new_refresh_token(user_id, family_id)
+    db.add(row)
+    await db.commit()
+    access_token = create_access_token(access_claims(*claims_row))
+    return UserLoginResponse(access_token=access_token, user_id=user_id, refresh_token=next_token)
+
+
+async def revoke_refresh_family(db: AsyncSession, raw_token: str) -> None:
+    """
+    Revoke the family of a refresh token (logout of one session).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        raw_token (str): Refresh token of the session to end.
+    """
+    token = await _find(db, raw_token)
+    if token is not None:
+        await db.execute(revoke_family_statement(token.family_id))
+        await db.commit()
+
+
+async def delete_user_refresh_tokens(db: AsyncSession, user_id: int) -> None:
+    """
+    Delete all refresh tokens of a user (before the user row itself is deleted).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the user.
+    """
+    await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
@@ -0,0 +1,437 @@
+"""
+Async counterparts of `app.services.user_service` for use with `AsyncSession`.
+
+The functions mirror the sync service one-to-one so the async routers behave
+exactly like the sync ones; only the database I/O is awaited.
+"""
+
+from collections.abc import AsyncIterator
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+from fastapi import BackgroundTasks, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from app.db.session import AsyncSessionLocal, async_read_session
+from app.db.replicas import read_your_writes
+from app.models.user import DELETED_STATUS, User
+from app.core import metrics
+from app.core.availability import availability_filter
+from app.core.etags import page_etag, precondition_failed
+from app.core.revocation import revocation_store
+from app.core.roles import Role, access_claims, format_roles, permissions_cache
+from app.core.token_cache import token_cache
+from app.core.security import (
+    hash_password_async, verify_password_async, dummy_verify_async, password_needs_update,
+    create_access_token
+)
+from app.services import async_token_service
+from app.services.search_index import SEARCH_FIELDS, index_user_async, indexed_values
+from app.services.selection_service import remove_all_statement
+from app.services.token_service import revoke_user_statement
+from app.services.user_service import (
+    PROFILE_COLUMNS,
+    STREAM_BATCH_SIZE,
+    active_profiles_query,
+    encode_ndjson,
+    field_taken,
+    page_fingerprint_query,
+    page_from_rows,
+    profile_row_query,
+    profile_version_query,
+    registration_values,
+    taken_fields,
+    taken_fields_query,
+    unchecked_values,
+)
+from app.schemas.user import (
+    UserRegisterRequest, UserRegisterResponse,
+    UserLoginRequest, UserLoginResponse,
+    UserUpdateRequest, UserProfileResponse, UserRolesResponse
+)
+
+async def find_taken_fields(db: AsyncSession, values: dict[str, str | None], use_filter: bool = True) -> list[str]:
+    """
+    Find which of the given usernames, emails and phone numbers are in use.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        values (dict[str, str | None]): Values keyed by field name (None: not asked).
+        use_filter (bool): Consult the availability filter first.
+
+    Returns:
+        list[str]: Fields whose value is in use.
+    """
+    if use_filter:
+        values = unchecked_values(values)
+    else:
+        values = {field: value for field, value in values.items() if value is not None}
+    if not values:
+        return []
+    result = await db.execute(taken_fields_query(values))
+    return taken_fields(result.one(), values)
+
+
+async def check_availability(db: AsyncSession, values: dict[str, str | None]) -> dict[str, bool]:
+    """
+    Report whether usernames, emails and phone numbers are free.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        values (dict[str, str | None]): Values keyed by field name (None: not asked).
+
+    Returns:
+        dict[str, bool]: True for each asked field whose value is free.
+    """
+    taken = await find_taken_fields(db, values)
+    return {field: field not in taken for field, value in values.items() if value is not None}
+
+
+async def load_availability_filter() -> None:
+    """
+    Rebuild the availability filter from the `users` table. Batches are
+    hashed into the filter in a worker thread to keep the event loop free.
+    """
+    availability_filter.begin_load()
+    try:
+        async with async_read_session() as db:
+            query = select(User.username, User.email, User.phone_number).execution_options(yield_per=STREAM_BATCH_SIZE)
+            result = await db.stream(query)
+            async for rows in result.partitions():
+                await run_in_threadpool(availability_filter.load, rows)
+    except BaseException:
+        availability_filter.abort_load()
+        raise
+    availability_filter.finish_load()
+
+
+async def register_user(db: AsyncSession, user_data: UserRegisterRequest) -> UserRegisterResponse:
+    """
+    Register a new user in the database.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_data (UserRegisterRequest): User registration data including username, phone, email, and password.
+
+    Raises:
+        HTTPException: 409 naming the field if the username, email or phone number is taken.
+
+    Returns:
+        UserRegisterResponse: Contains the created user's ID and the provided password.
+    """
+    values = registration_values(user_data)
+    taken = await find_taken_fields(db, values)
+    if taken:
+        raise field_taken(taken[0])
+    user = User(
+        username=user_data.username,
+        phone_number=user_data.phone_number,
+        email=user_data.email,
+        password=await hash_password_async(user_data.password)
+    )
+    db.add(user)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # Taken by a concurrent registration after the check
+        await db.rollback()
+        taken = await find_taken_fields(db, values, use_filter=False)
+        raise field_taken(taken[0] if taken else None)
+    await index_user_async(db, user)
+    await db.commit()
+    availability_filter.add(values)
+    return UserRegisterResponse(user_id=user.id, password=user_data.password)
+
+
+async def authenticate_user(
+    db: AsyncSession, login_data: UserLoginRequest, background_tasks: BackgroundTasks | None = None
+) -> UserLoginResponse | None:
+    """
+    Authenticate a user and generate an access token.
+
+    If the stored hash uses a deprecated scheme or an outdated cost, it is
+    replaced by `rehash_password` after the response has been sent.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        login_data (UserLoginRequest): User login data including email and password.
+        background_tasks (BackgroundTasks | None): Response background tasks; without them hashes are not upgraded.
+
+    Returns:
+        UserLoginResponse | None: Returns a login response with access token and user ID if authentication succeeds; None otherwise.
+    """
+    result = await db.execute(select(User).where(User.email == login_data.email))
+    user = result.scalars().first()
+    if not user or user.status == DELETED_STATUS:
+        # Unknown email: spend the same bcrypt time so timing does not reveal it
+        await dummy_verify_async()
+        return None
+    if not await verify_password_async(login_data.password, user.password):
+        return None
+    if background_tasks is not None and password_needs_update(user.password):
+        background_tasks.add_task(rehash_password, user.id, user.password, login_data.password)
+
+    token = create_access_token(access_claims(user.id, user.roles, user.permissions_version))
+    refresh_token = await async_token_service.issue_refresh_token(db, user.id)
+    return UserLoginResponse(access_token=token, user_id=user.id, refresh_token=refresh_token)
+
+
+async def rehash_password(user_id: int, old_hash: str, password: str) -> None:
+    """
+    Replace an outdated password hash with one made by the current settings.
+
+    Runs as a background task after a successful login, in its own session
+    because the request's session is closed by then. The update only applies
+    while the stored hash is still `old_hash`.
+
+    Args:
+        user_id (int): ID of the user who logged in.
+        old_hash (str): Hash the password was verified against.
+        password (str): The verified plain password.
+    """
+    try:
+        new_hash = await hash_password_async(password)
+    except HTTPException:
+        # Hashing pool saturated: leave it for the next login
+        metrics.PASSWORD_REHASHES.inc(result="busy")
+        return
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash)
+        )
+        await db.commit()
+    metrics.PASSWORD_REHASHES.inc(result="upgraded" if result.rowcount == 1 else "changed")
+
+
+async def get_user_profile(db: AsyncSession, user_id: int) -> UserProfileResponse:
+    """
+    Retrieve a user's profile by ID.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the user to retrieve.
+
+    Raises:
+        HTTPException: If the user does not exist (404).
+
+    Returns:
+        UserProfileResponse: User profile data.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
+
+
+async def get_user_profile_row(db: AsyncSession, user_id: int) -> dict:
+    """
+    Retrieve a user's profile columns and status by ID, without building the ORM entity.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the user to retrieve.
+
+    Raises:
+        HTTPException: If the user does not exist (404).
+
+    Returns:
+        dict: `UserProfileResponse` fields plus `status` and `version`.
+    """
+    result = await db.execute(profile_row_query(user_id))
+    row = result.mappings().first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return dict(row)
+
+
+async def get_user_version(db: AsyncSession, user_id: int) -> tuple[int, int]:
+    """
+    Retrieve a user's status and version by ID (an index lookup, no profile columns).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user_id (int): ID of the user.
+
+    Raises:
+        HTTPException: If the user does not exist (404).
+
+    Returns:
+        tuple[int, int]: Status and version.
+    """
+    result = await db.execute(profile_version_query(user_id))
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return row.status, row.version
+
+
+async def update_user_profile(db: AsyncSession, user: User, data: UserUpdateRequest) -> UserProfileResponse:
+    """
+    Update an existing user's profile.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user (User): User to update, already loaded in this session (see `get_user_profile`).
+        data (UserUpdateRequest): Updated user data (username, phone_number, email, password).
+
+    Raises:
+        HTTPException: 409 naming the field if the new username, email or phone
+            number is taken, 412 if another request changed the user since it was loaded.
+
+    Returns:
+        UserProfileResponse: Updated user profile data.
+    """
+    # Only values that differ from the user's own need to be free
+    values = {
+        field: getattr(data, field)
+        for field in SEARCH_FIELDS
+        if getattr(data, field) and getattr(data, field) != getattr(user, field)
+    }
+    taken = await find_taken_fields(db, values)
+    if taken:
+        raise field_taken(taken[0])
+    changed = list(values)
+    for field in changed:
+        setattr(user, field, getattr(data, field))
+    if data.password:
+        user.password = await hash_password_async(data.password)
+        await db.execute(revoke_user_statement(user.id))
+
+    try:
+        # The UPDATE first, so a stale version fails before the index is rewritten
+        await db.flush()
+        await index_user_async(db, user, changed)
+        await db.commit()
+    except StaleDataError:
+        # The UPDATE matched no row: the version changed since the user was loaded
+        await db.rollback()
+        raise precondition_failed()
+    except IntegrityError:
+        # Taken by a concurrent write after the check
+        await db.rollback()
+        taken = await find_taken_fields(db, values, use_filter=False)
+        raise field_taken(taken[0] if taken else None)
+    token_cache.invalidate_user(user.id)
+    availability_filter.add(indexed_values(user, changed))
+    # Replicas may still serve the old row; read it from the primary for a while
+    read_your_writes.mark(user.id)
+    if data.password:
+        # A password change signs the user out everywhere
+        await run_in_threadpool(revocation_store.revoke_user, user.id)
+    return user
+
+
+async def set_user_roles(db: AsyncSession, user: User, roles: list[Role]) -> UserRolesResponse:
+    """
+    Replace a user's roles.
+
+    Bumps the user's permissions version, so `require_role` rejects the
+    tokens issued before the change with 401 until the client refreshes them.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user (User): User to change, already loaded in this session (see `get_user_profile`).
+        roles (list[Role]): The complete set of roles.
+
+    Raises:
+        HTTPException: If another request changed the user since it was loaded (412).
+
+    Returns:
+        UserRolesResponse: The stored roles and the new permissions version.
+    """
+    user.roles = format_roles(roles)
+    user.permissions_version += 1
+    try:
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise precondition_failed()
+    permissions_cache.invalidate(user.id)
+    token_cache.invalidate_user(user.id)
+    read_your_writes.mark(user.id)
+    return UserRolesResponse(id=user.id, roles=user.roles.split(), permissions_version=user.permissions_version)
+
+
+async def delete_user_profile(db: AsyncSession, user: User) -> dict:
+    """
+    Soft-delete a user.
+
+    The user gets status 0 and `deleted_at`, which hides them from every read
+    and login. Their selections are marked removed, their refresh tokens are
+    deleted and their access tokens revoked. The row itself, still holding
+    its username, email and phone number, is removed by the purge once it is
+    older than `USER_RETENTION_DAYS` (see `app.services.purge_service`).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user (User): User to delete, already loaded in this session (see `get_user_profile`).
+
+    Raises:
+        HTTPException: If another request changed the user since it was loaded (412).
+
+    Returns:
+        dict: Confirmation message.
+    """
+    user_id = user.id
+    user.status = DELETED_STATUS
+    user.deleted_at = datetime.utcnow()
+    await async_token_service.delete_user_refresh_tokens(db, user_id)
+    await db.execute(remove_all_statement(user_id))
+    try:
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise precondition_failed()
+    token_cache.invalidate_user(user_id)
+    read_your_writes.mark(user_id)
+    await run_in_threadpool(revocation_store.revoke_user, user_id)
+    return {"message": "User deleted successfully"}
+
+
+async def list_user_profiles(db: AsyncSession, cursor: int | None, limit: int) -> tuple[list[dict], int | None, str]:
+    """
+    Return one keyset page of active user profiles.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        cursor (int | None): ID of the last user on the previous page, or None for the first page.
+        limit (int): Maximum number of users to return.
+
+    Returns:
+        tuple[list[dict], int | None, str]: The page of profiles, the cursor for the
+        next page (None on the last page) and the page's ETag.
+    """
+    columns = (*PROFILE_COLUMNS, User.version)
+    result = await db.execute(active_profiles_query(cursor, columns).limit(limit + 1))
+    return page_from_rows(result.mappings().all(), limit)
+
+
+async def get_page_etag(db: AsyncSession, cursor: int | None, limit: int) -> str:
+    """
+    Compute the ETag of a page without reading its rows.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        cursor (int | None): ID of the last user on the previous page.
+        limit (int): Page size.
+
+    Returns:
+        str: The ETag `list_user_profiles` would return.
+    """
+    result = await db.execute(page_fingerprint_query(cursor, limit))
+    count, id_sum, version_sum = result.one()
+    return page_etag(count, id_sum, version_sum)
+
+
+async def stream_user_profiles() -> AsyncIterator[bytes]:
+    """
+    Stream all active user profiles as NDJSON lines.
+
+    Yields:
+        bytes: One JSON-encoded `UserProfileResponse` per line, a batch at a time.
+    """
+    async with async_read_session() as db:
+        result = await db.stream(active_profiles_query().execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for rows in result.mappings().partitions():
+            yield encode_ndjson(rows)
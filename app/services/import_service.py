@@ -0,0 +1,229 @@
+"""
+Bulk user import from CSV or NDJSON streams.
+
+Rows are processed in batches of `IMPORT_BATCH_SIZE`:
+1. Each row is validated against `UserRegisterRequest`.
+2. Uniqueness conflicts (within the batch and against existing users) are
+   found with indexed IN lookups per batch and reported per row.
+3. Passwords of the remaining rows are hashed in parallel.
+4. The batch is written with one executemany INSERT, its search trigrams
+   (see `app.services.search_index`) with another, and committed.
+
+Invalid or conflicting rows are reported but never abort the import.
+"""
+
+import csv
+import io
+import json
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.availability import availability_filter
+from app.core.config import settings
+from app.core.security import hash_password
+from app.models.user import User
+from app.services.search_index import index_users
+from app.schemas.user import (
+    UserRegisterRequest, UserImportConflict, UserImportError, UserImportResponse
+)
+
+# Unique columns checked before inserting, in reporting order
+UNIQUE_FIELDS = ("username", "email", "phone_number")
+
+# Rows per conflict lookup; three IN lists of this size stay well under
+# SQL Server's 2100 bind parameter limit.
+LOOKUP_CHUNK_SIZE = 500
+
+# ----- Parsing -----
+def parse_rows(stream: BinaryIO, fmt: str) -> Iterator[tuple[int, dict | str]]:
+    """
+    Read raw rows from an uploaded file.
+
+    Args:
+        stream (BinaryIO): File-like object with UTF-8 content.
+        fmt (str): "csv" (with a header row) or "ndjson" (one JSON object per line).
+
+    Yields:
+        tuple[int, dict | str]: 1-based row number and the row as a dict, or an
+        error message if the row could not be decoded.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+    elif fmt == "ndjson":
+        number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, f"Invalid JSON: {e.msg}"
+                continue
+            yield number, row if isinstance(row, dict) else "Expected a JSON object"
+    else:
+        raise ValueError(f"Unsupported import format: {fmt!r}")
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+# ----- Import -----
+def _find_conflicts(
+    db: Session, batch: list[tuple[int, UserRegisterRequest]], report: UserImportResponse
+) -> list[tuple[int, UserRegisterRequest]]:
+    """
+    Drop rows whose unique fields are taken, recording a conflict for each.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        batch (list[tuple[int, UserRegisterRequest]]): Validated rows with their row numbers.
+        report (UserImportResponse): Report to append conflicts to.
+
+    Returns:
+        list[tuple[int, UserRegisterRequest]]: Rows that can be inserted.
+    """
+    taken = {field: set() for field in UNIQUE_FIELDS}
+    for chunk in _batches(batch, LOOKUP_CHUNK_SIZE):
+        existing = db.execute(
+            select(User.username, User.email, User.phone_number).where(or_(
+                User.username.in_({user.username for _, user in chunk}),
+                User.email.in_({user.email for _, user in chunk}),
+                User.phone_number.in_({user.phone_number for _, user in chunk}),
+            ))
+        )
+        for row in existing.mappings():
+            for field in UNIQUE_FIELDS:
+                taken[field].add(row[field])
+
+    accepted = []
+    for number, user in batch:
+        conflict = next((f for f in UNIQUE_FIELDS if getattr(user, f) in taken[f]), None)
+        if conflict:
+            report.conflicts.append(
+                UserImportConflict(row=number, field=conflict, value=getattr(user, conflict))
+            )
+            continue
+        # Later rows in the same batch must not reuse these values either
+        for field in UNIQUE_FIELDS:
+            taken[field].add(getattr(user, field))
+        accepted.append((number, user))
+    return accepted
+
+def _insert_rows(db: Session, rows: list[dict], numbers: list[int], report: UserImportResponse) -> None:
+    """
+    Insert a batch with one executemany, falling back to per-row inserts if a
+    concurrent writer took one of the values after the conflict check.
+    """
+    # Every value of the batch is in use afterwards, by these rows or by the conflicting ones
+    for row in rows:
+        availability_filter.add({field: row[field] for field in UNIQUE_FIELDS})
+    try:
+        db.execute(insert(User), rows)
+        _index_rows(db, rows)
+        db.commit()
+        report.inserted += len(rows)
+        return
+    except IntegrityError:
+        db.rollback()
+
+    for number, row in zip(numbers, rows):
+        try:
+            with db.begin_nested():
+                db.execute(insert(User), [row])
+                _index_rows(db, [row])
+            report.inserted += 1
+        except IntegrityError:
+            field = _conflicting_field(db, row)
+            report.conflicts.append(UserImportConflict(row=number, field=field, value=row[field]))
+    db.commit()
+
+def _index_rows(db: Session, rows: list[dict]) -> None:
+    """
+    Add the search trigrams of freshly inserted rows, looked up by email for their IDs.
+    """
+    for chunk in _batches([row["email"] for row in rows], LOOKUP_CHUNK_SIZE):
+        index_users(db, db.execute(
+            select(User.id, User.username, User.email, User.phone_number).where(User.email.in_(chunk))
+        ))
+
+def _conflicting_field(db: Session, row: dict) -> str:
+    for field in UNIQUE_FIELDS:
+        column = getattr(User, field)
+        if db.execute(select(User.id).where(column == row[field])).first():
+            return field
+    return "email"
+
+def import_users(
+    db: Session,
+    stream: BinaryIO,
+    fmt: str,
+    batch_size: int | None = None,
+    executor: Executor | None = None,
+) -> UserImportResponse:
+    """
+    Import users from a CSV or NDJSON stream.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        stream (BinaryIO): File-like object with the rows.
+        fmt (str): "csv" or "ndjson".
+        batch_size (int | None): Rows per INSERT batch. Defaults to `IMPORT_BATCH_SIZE`.
+        executor (Executor | None): Executor used to hash passwords. A thread pool
+            of `IMPORT_HASH_WORKERS` threads is created when omitted.
+
+    Returns:
+        UserImportResponse: Number of inserted users plus per-row conflicts and errors.
+    """
+    report = UserImportResponse()
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    own_executor = executor is None
+    if own_executor:
+        # Separate from the request hashing pool so an import cannot starve logins
+        executor = ThreadPoolExecutor(
+            max_workers=settings.IMPORT_HASH_WORKERS or os.cpu_count() or 1,
+            thread_name_prefix="import-hashing",
+        )
+    try:
+        for raw_batch in _batches(parse_rows(stream, fmt), batch_size):
+            batch = []
+            for number, raw in raw_batch:
+                if isinstance(raw, str):
+                    report.errors.append(UserImportError(row=number, detail=raw))
+                    continue
+                try:
+                    batch.append((number, UserRegisterRequest.model_validate(raw)))
+                except ValidationError as e:
+                    report.errors.append(UserImportError(row=number, detail=str(e.errors()[0]["msg"])))
+            if not batch:
+                continue
+
+            accepted = _find_conflicts(db, batch, report)
+            if not accepted:
+                continue
+            hashes = executor.map(hash_password, [user.password for _, user in accepted])
+            rows = [
+                {
+                    "username": user.username,
+                    "phone_number": user.phone_number,
+                    "email": user.email,
+                    "password": hashed,
+                }
+                for (_, user), hashed in zip(accepted, hashes)
+            ]
+            _insert_rows(db, rows, [number for number, _ in accepted], report)
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True)
+    return report
@@ -0,0 +1,207 @@
+"""
+Purge of soft-deleted users and expired refresh tokens.
+
+Deleting a user only sets `status = 0` and `deleted_at` (see
+`delete_user_profile`), so the request takes no locks beyond the user's own
+rows. This module provides:
+1. `purge_deleted_users`, which hard-deletes the users deleted more than
+   `USER_RETENTION_DAYS` ago, together with the rows that reference them
+   (selections, search trigrams, refresh tokens). Each batch of at most
+   `PURGE_BATCH_SIZE` users is its own short transaction, with a pause in
+   between, so the purge never holds many locks at once.
+2. `prune_refresh_tokens`, which deletes expired refresh token rows in the
+   same bounded batches. Every rotation adds a row, so without it the
+   `refresh_tokens` table would only grow.
+3. Progress metrics: purged users, pruned tokens, batch durations, the users
+   still waiting and the time of the last completed run.
+
+Both run as a background task of the worker with `PURGE_ENABLED` (see
+`app.main`), or from `python -m app.cli purge-deleted-users` and
+`python -m app.cli prune-refresh-tokens`.
+"""
+
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.token import RefreshToken
+from app.models.user import DELETED_STATUS, User, UserSelection
+from app.services.search_index import unindex_statement
+from app.services.token_service import expired_refresh_tokens_query
+
+# ----- Query builders -----
+def purgeable_users_query(cutoff: datetime, limit: int):
+    """
+    Build the query for the next batch of users to purge.
+
+    Args:
+        cutoff (datetime): Users deleted before this time are purged.
+        limit (int): Batch size.
+
+    Returns:
+        Select: IDs in ID order, a range of the `(status, id)` index.
+    """
+    return (
+        select(User.id)
+        .where(User.status == DELETED_STATUS, User.deleted_at < cutoff)
+        .order_by(User.id)
+        .limit(limit)
+    )
+
+def purge_statements(user_ids: list[int]) -> list:
+    """
+    Args:
+        user_ids (list[int]): Soft-deleted users.
+
+    Returns:
+        list: DELETE statements for the rows referencing the users, then the
+        users themselves (only if they are still deleted).
+    """
+    return [
+        delete(UserSelection).where(UserSelection.user_id.in_(user_ids)),
+        unindex_statement(user_ids),
+        delete(RefreshToken).where(RefreshToken.user_id.in_(user_ids)),
+        delete(User)
+        .where(User.id.in_(user_ids), User.status == DELETED_STATUS)
+        .execution_options(synchronize_session=False),
+    ]
+
+def pending_query(cutoff: datetime):
+    """
+    Args:
+        cutoff (datetime): Retention cut-off of the run.
+
+    Returns:
+        Select: Numbers of soft-deleted users past and within the retention window.
+    """
+    expired = User.deleted_at < cutoff
+    return select(
+        func.count(case((expired, 1))), func.count(case((~expired, 1)))
+    ).where(User.status == DELETED_STATUS)
+
+# ----- Services -----
+def purge_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """
+    Purge one batch of users in one transaction.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        cutoff (datetime): Users deleted before this time are purged.
+        batch_size (int): Maximum number of users.
+
+    Returns:
+        int: Number of users purged (less than `batch_size` once none are left).
+    """
+    started = time.perf_counter()
+    user_ids = db.execute(purgeable_users_query(cutoff, batch_size)).scalars().all()
+    if not user_ids:
+        db.rollback()
+        return 0
+    for statement in purge_statements(user_ids):
+        db.execute(statement)
+    db.commit()
+    metrics.USERS_PURGED.inc(len(user_ids))
+    metrics.PURGE_BATCH_DURATION.observe(time.perf_counter() - started)
+    return len(user_ids)
+
+
+def purge_deleted_users(
+    db: Session,
+    retention_days: float | None = None,
+    batch_size: int | None = None,
+    pause: float | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Purge every user deleted longer ago than the retention window.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        retention_days (float | None): Defaults to `USER_RETENTION_DAYS`.
+        batch_size (int | None): Users per transaction. Defaults to `PURGE_BATCH_SIZE`.
+        pause (float | None): Seconds between batches. Defaults to `PURGE_BATCH_PAUSE_SECONDS`.
+        progress (Callable[[int], None] | None): Called with the running total after each batch.
+
+    Returns:
+        int: Number of users purged.
+    """
+    retention_days = settings.USER_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    pause = settings.PURGE_BATCH_PAUSE_SECONDS if pause is None else pause
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+
+    purged = 0
+    while True:
+        count = purge_batch(db, cutoff, batch_size)
+        purged += count
+        if progress is not None and count:
+            progress(purged)
+        if count < batch_size:
+            break
+        if pause > 0:
+            time.sleep(pause)
+
+    expired, retained = db.execute(pending_query(cutoff)).one()
+    db.rollback()
+    metrics.PURGE_PENDING.set(expired, expired="true")
+    metrics.PURGE_PENDING.set(retained, expired="false")
+    metrics.PURGE_LAST_SUCCESS.set(time.time())
+    return purged
+
+
+def prune_refresh_tokens(
+    db: Session,
+    batch_size: int | None = None,
+    pause: float | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Delete every expired refresh token row, one batch per transaction.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        batch_size (int | None): Rows per transaction. Defaults to `PURGE_BATCH_SIZE`.
+        pause (float | None): Seconds between batches. Defaults to `PURGE_BATCH_PAUSE_SECONDS`.
+        progress (Callable[[int], None] | None): Called with the running total after each batch.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    pause = settings.PURGE_BATCH_PAUSE_SECONDS if pause is None else pause
+    now = datetime.utcnow()
+
+    pruned = 0
+    while True:
+        token_ids = db.execute(expired_refresh_tokens_query(now, batch_size)).scalars().all()
+        if token_ids:
+            db.execute(delete(RefreshToken).where(RefreshToken.id.in_(token_ids)))
+        db.commit()
+        pruned += len(token_ids)
+        metrics.REFRESH_TOKENS_PRUNED.inc(len(token_ids))
+        if progress is not None and token_ids:
+            progress(pruned)
+        if len(token_ids) < batch_size:
+            return pruned
+        if pause > 0:
+            time.sleep(pause)
+
+
+def run_purge() -> tuple[int, int]:
+    """
+    Run `purge_deleted_users` and `prune_refresh_tokens` with their own session, for the background task.
+
+    Returns:
+        tuple[int, int]: Numbers of users purged and of refresh tokens deleted.
+    """
+    db = SessionLocal()
+    try:
+        return purge_deleted_users(db), prune_refresh_tokens(db)
+    finally:
+        db.close()
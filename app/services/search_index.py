@@ -0,0 +1,186 @@
+"""
+Trigram index behind the substring search of users (see `app.services.search_service`).
+
+This module handles:
+1. The rows of `user_search_trigrams`: every distinct lowercase trigram of a
+   user's username, email and phone number.
+2. Keeping them current. The writes of `user_service`, `async_user_service`
+   and `import_service` reindex the changed columns in their own transaction,
+   and the purge of deleted users removes their rows.
+3. `rebuild_search_index` (`python -m app.cli rebuild-search-index`), which
+   fills the index for existing users and users written by other means.
+"""
+
+from collections.abc import Iterable, Iterator
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.user import User, UserSearchTrigram
+
+# Searchable columns and their code in `user_search_trigrams.field`
+SEARCH_FIELDS = {"username": 1, "email": 2, "phone_number": 3}
+
+# Trigrams of a search term that are joined; the substring check on the
+# candidates covers the rest of the term
+MAX_QUERY_TRIGRAMS = 6
+
+# Users per batch of `rebuild_search_index`; their trigram rows are inserted with one executemany
+INDEX_BATCH_SIZE = 500
+
+# ----- Rows -----
+def trigrams(value: str | None) -> set[str]:
+    """
+    Args:
+        value (str | None): Column value.
+
+    Returns:
+        set[str]: Distinct trigrams of the lowercase value (empty below three characters).
+    """
+    if not value:
+        return set()
+    value = value.lower()
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+def query_trigrams(term: str) -> list[str]:
+    """
+    Pick the trigrams a substring search joins: non-overlapping ones that
+    cover the term, plus the last one, at most `MAX_QUERY_TRIGRAMS`.
+
+    Args:
+        term (str): Lowercase search term of at least three characters.
+
+    Returns:
+        list[str]: Distinct trigrams of the term.
+    """
+    positions = [*range(0, len(term) - 2, 3), len(term) - 3]
+    return list(dict.fromkeys(term[i:i + 3] for i in positions))[:MAX_QUERY_TRIGRAMS]
+
+def trigram_rows(user_id: int, values: dict[str, str | None]) -> list[dict]:
+    """
+    Args:
+        user_id (int): ID of the user.
+        values (dict[str, str | None]): Column values keyed by field name.
+
+    Returns:
+        list[dict]: `user_search_trigrams` rows of the values.
+    """
+    return [
+        {"field": SEARCH_FIELDS[field], "trigram": gram, "user_id": user_id}
+        for field, value in values.items()
+        for gram in trigrams(value)
+    ]
+
+def indexed_values(user: User, fields: Iterable[str] = SEARCH_FIELDS) -> dict[str, str | None]:
+    """
+    Args:
+        user (User | Row): User, or a row with the searchable columns.
+        fields (Iterable[str]): Fields to read.
+
+    Returns:
+        dict[str, str | None]: Column values keyed by field name.
+    """
+    return {field: getattr(user, field) for field in fields}
+
+def unindex_statement(user_ids: list[int], fields: Iterable[str] = SEARCH_FIELDS):
+    """
+    Args:
+        user_ids (list[int]): IDs of the users.
+        fields (Iterable[str]): Fields whose trigrams are removed.
+
+    Returns:
+        Delete: Removes the users' trigram rows of the fields.
+    """
+    statement = delete(UserSearchTrigram).where(UserSearchTrigram.user_id.in_(user_ids))
+    codes = [SEARCH_FIELDS[field] for field in fields]
+    if len(codes) < len(SEARCH_FIELDS):
+        statement = statement.where(UserSearchTrigram.field.in_(codes))
+    return statement
+
+def searchable_users_query(after_id: int | None, limit: int):
+    """
+    Build the query for one batch of users to index, in ID order.
+
+    Args:
+        after_id (int | None): ID of the last user of the previous batch.
+        limit (int): Batch size.
+
+    Returns:
+        Select: ID and searchable columns.
+    """
+    query = select(User.id, User.username, User.email, User.phone_number).order_by(User.id).limit(limit)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    return query
+
+# ----- Maintenance -----
+def index_user(db: Session, user: User, fields: Iterable[str] = SEARCH_FIELDS) -> None:
+    """
+    Replace a user's trigram rows of the given fields, in the caller's transaction.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user (User): User with an ID (flushed).
+        fields (Iterable[str]): Fields that changed.
+    """
+    fields = list(fields)
+    if not fields:
+        return
+    db.execute(unindex_statement([user.id], fields))
+    rows = trigram_rows(user.id, indexed_values(user, fields))
+    if rows:
+        db.execute(insert(UserSearchTrigram), rows)
+
+
+def index_users(db: Session, users: Iterable) -> None:
+    """
+    Add the trigram rows of new users, in the caller's transaction.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        users (Iterable): Rows with `id` and the searchable columns.
+    """
+    rows = [row for user in users for row in trigram_rows(user.id, indexed_values(user))]
+    if rows:
+        db.execute(insert(UserSearchTrigram), rows)
+
+
+def rebuild_search_index(db: Session, batch_size: int = INDEX_BATCH_SIZE) -> Iterator[int]:
+    """
+    Reindex every user, one committed batch at a time.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        batch_size (int): Users per batch.
+
+    Yields:
+        int: Number of users indexed so far, after each batch.
+    """
+    done = 0
+    after_id = None
+    while users := db.execute(searchable_users_query(after_id, batch_size)).all():
+        db.execute(unindex_statement([user.id for user in users]))
+        index_users(db, users)
+        db.commit()
+        done += len(users)
+        after_id = users[-1].id
+        yield done
+
+
+async def index_user_async(db: AsyncSession, user: User, fields: Iterable[str] = SEARCH_FIELDS) -> None:
+    """
+    Replace a user's trigram rows of the given fields, in the caller's transaction (async twin of `index_user`).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        user (User): User with an ID (flushed).
+        fields (Iterable[str]): Fields that changed.
+    """
+    fields = list(fields)
+    if not fields:
+        return
+    await db.execute(unindex_statement([user.id], fields))
+    rows = trigram_rows(user.id, indexed_values(user, fields))
+    if rows:
+        await db.execute(insert(UserSearchTrigram), rows)
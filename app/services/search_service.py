@@ -0,0 +1,160 @@
+"""
+User search for administrators.
+
+This module provides:
+1. Prefix search on username, email or phone number, a range seek of the
+   column's unique index, ordered by the searched column.
+2. Substring search backed by the trigram index of `app.services.search_index`.
+   The users holding the term's trigrams are found by joining the trigrams'
+   primary key ranges, which are in user ID order, and then checked against
+   the term itself.
+
+Both searches return the profile columns of active users (status != 0) one
+keyset page at a time, so their cost depends on the page size and the
+selectivity of the term, not on the number of users.
+"""
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.user import DELETED_STATUS, User, UserSearchTrigram
+from app.services.search_index import SEARCH_FIELDS, query_trigrams
+from app.services.user_service import PROFILE_COLUMNS
+
+# Substring search terms must contain at least one trigram
+MIN_CONTAINS_LENGTH = 3
+
+LIKE_ESCAPE = "\\"
+
+# ----- Query builders -----
+def _escape_like(term: str) -> str:
+    return term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+def _prefix_upper_bound(term: str) -> str | None:
+    # Smallest string greater than every string starting with the term
+    last = ord(term[-1])
+    return None if last >= 0x10FFFF else term[:-1] + chr(last + 1)
+
+def invalid_search(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+def prefix_search_query(field: str, term: str, cursor: str | None, limit: int):
+    """
+    Build the query for users whose column starts with the term.
+
+    The range condition lets every database seek the column's unique index;
+    LIKE then applies the database's own matching rules, so case sensitivity
+    follows the column's collation.
+
+    Args:
+        field (str): "username", "email" or "phone_number".
+        term (str): Prefix.
+        cursor (str | None): Column value of the last user on the previous page.
+        limit (int): Page size.
+
+    Returns:
+        Select: Profile columns, ordered by the searched column.
+    """
+    column = getattr(User, field)
+    conditions = [column >= term, column.like(_escape_like(term) + "%", escape=LIKE_ESCAPE), User.status != DELETED_STATUS]
+    upper = _prefix_upper_bound(term)
+    if upper is not None:
+        conditions.append(column < upper)
+    if cursor is not None:
+        conditions.append(column > cursor)
+    return select(*PROFILE_COLUMNS).where(*conditions).order_by(column).limit(limit)
+
+def contains_search_query(field: str, term: str, cursor: str | None, limit: int):
+    """
+    Build the query for users whose column contains the term, ignoring case.
+
+    Args:
+        field (str): "username", "email" or "phone_number".
+        term (str): Substring of at least `MIN_CONTAINS_LENGTH` characters.
+        cursor (str | None): ID of the last user on the previous page.
+        limit (int): Page size.
+
+    Raises:
+        HTTPException: 422 if the term is too short or the cursor is not a user ID.
+
+    Returns:
+        Select: Profile columns, ordered by ID.
+    """
+    if len(term) < MIN_CONTAINS_LENGTH:
+        raise invalid_search(f"Substring search needs at least {MIN_CONTAINS_LENGTH} characters")
+    if cursor is not None and not cursor.isdigit():
+        raise invalid_search("Invalid cursor")
+    term = term.lower()
+    code = SEARCH_FIELDS[field]
+    grams = query_trigrams(term)
+    first, *others = [aliased(UserSearchTrigram) for _ in grams]
+
+    query = select(*PROFILE_COLUMNS).select_from(first)
+    for alias, gram in zip(others, grams[1:]):
+        query = query.join(alias, and_(alias.field == code, alias.trigram == gram, alias.user_id == first.user_id))
+    query = query.join(User, User.id == first.user_id).where(
+        first.field == code,
+        first.trigram == grams[0],
+        User.status != DELETED_STATUS,
+        func.lower(getattr(User, field)).like(f"%{_escape_like(term)}%", escape=LIKE_ESCAPE),
+    )
+    if cursor is not None:
+        query = query.where(first.user_id > int(cursor))
+    return query.order_by(first.user_id).limit(limit)
+
+def search_query(field: str, term: str, mode: str, cursor: str | None, limit: int):
+    """
+    Args:
+        field (str): "username", "email" or "phone_number".
+        term (str): Search term.
+        mode (str): "prefix" or "contains".
+        cursor (str | None): Cursor of the previous page.
+        limit (int): Page size.
+
+    Returns:
+        Select: Query of one page window (`limit + 1` rows).
+    """
+    build = prefix_search_query if mode == "prefix" else contains_search_query
+    return build(field, term, cursor, limit + 1)
+
+def page_from_rows(rows: list, field: str, mode: str, limit: int) -> tuple[list[dict], str | None]:
+    """
+    Args:
+        rows (list): Up to `limit + 1` profile row mappings.
+        field (str): Searched field.
+        mode (str): "prefix" or "contains".
+        limit (int): Page size.
+
+    Returns:
+        tuple[list[dict], str | None]: The page and the cursor of the next page (None on the last page).
+    """
+    profiles = [dict(row) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return profiles, None
+    return profiles, str(profiles[-1][field if mode == "prefix" else "id"])
+
+# ----- Services -----
+def search_users(
+    db: Session, field: str, term: str, mode: str, cursor: str | None, limit: int
+) -> tuple[list[dict], str | None]:
+    """
+    Return one page of the active users matching a search.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        field (str): "username", "email" or "phone_number".
+        term (str): Search term.
+        mode (str): "prefix" (case sensitivity follows the column collation)
+            or "contains" (case-insensitive, at least three characters).
+        cursor (str | None): `X-Next-Cursor` of the previous page.
+        limit (int): Maximum number of users to return.
+
+    Raises:
+        HTTPException: 422 if a substring term is too short or the cursor is invalid.
+
+    Returns:
+        tuple[list[dict], str | None]: Profile rows and the cursor of the next page.
+    """
+    rows = db.execute(search_query(field, term, mode, cursor, limit)).mappings().all()
+    return page_from_rows(rows, field, mode, limit)
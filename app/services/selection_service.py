@@ -0,0 +1,329 @@
+"""
+User selections: the stocks, cryptocurrencies and currencies a user follows.
+
+This module provides:
+1. The watchlist of a user, read through the `(user_id, status)` index.
+2. Bulk add and remove. The number of statements per request does not grow
+   with the number of targets: a primary key lookup of the user's status, one
+   lookup of the user's rows for the targets, one UPDATE reactivating removed
+   selections and one executemany INSERT for the new ones (the status and a
+   single UPDATE for removals).
+3. Follower counts, one grouped count per kind of target, each a range scan
+   of the unique `(target, user_id)` index.
+
+A removed selection keeps its row with status 0, so adding the target again
+reactivates it and each user has at most one row per target.
+
+Writes check that the user is not soft-deleted. The owner of a watchlist is
+admitted by the token alone (see `require_owner_or_role`), and revoking the
+tokens of a deleted user happens after its transaction commits, so it is not
+relied upon here.
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.replicas import read_your_writes
+from app.models.user import DELETED_STATUS, User, UserSelection
+from app.schemas.selection import SelectionBulkResponse, SelectionTarget
+
+# Target columns of `user_selections`; exactly one is set per row
+TARGET_COLUMNS = ("stock_id", "crypto_id", "currency_code")
+
+ACTIVE = 1
+REMOVED = 0
+
+# ----- Query builders -----
+def group_targets(targets: Iterable[SelectionTarget]) -> dict[str, set]:
+    """
+    Group targets by column, dropping duplicates.
+
+    Args:
+        targets (Iterable[SelectionTarget]): Requested targets.
+
+    Returns:
+        dict[str, set]: Values per target column (only columns with values).
+    """
+    groups: dict[str, set] = {}
+    for target in targets:
+        for column in TARGET_COLUMNS:
+            value = getattr(target, column)
+            if value is not None:
+                groups.setdefault(column, set()).add(value)
+    return groups
+
+def targets_filter(groups: dict[str, set]):
+    """
+    Args:
+        groups (dict[str, set]): Values per target column, as returned by `group_targets`.
+
+    Returns:
+        ColumnElement: Condition matching rows of any of the targets.
+    """
+    return or_(*(getattr(UserSelection, column).in_(values) for column, values in groups.items()))
+
+def watchlist_query(user_id: int):
+    """
+    Build the query for a user's active selections.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        Select: Target columns and `selected_at`, in the order the targets were first added.
+    """
+    return (
+        select(UserSelection.stock_id, UserSelection.crypto_id, UserSelection.currency_code, UserSelection.selected_at)
+        .where(UserSelection.user_id == user_id, UserSelection.status == ACTIVE)
+        .order_by(UserSelection.id)
+    )
+
+def existing_selections_query(user_id: int, groups: dict[str, set]):
+    """
+    Build the query for a user's rows, active or removed, of the given targets.
+
+    Args:
+        user_id (int): ID of the user.
+        groups (dict[str, set]): Values per target column.
+
+    Returns:
+        Select: ID, target columns and status of each row.
+    """
+    columns = [getattr(UserSelection, column) for column in TARGET_COLUMNS]
+    return select(UserSelection.id, *columns, UserSelection.status).where(
+        UserSelection.user_id == user_id, targets_filter(groups)
+    )
+
+def plan_additions(rows: Iterable, groups: dict[str, set], user_id: int, now: datetime) -> tuple[list[int], list[dict], int]:
+    """
+    Decide how to add the targets, given the user's existing rows for them.
+
+    Args:
+        rows (Iterable): Rows of `existing_selections_query`.
+        groups (dict[str, set]): Values per target column.
+        user_id (int): ID of the user.
+        now (datetime): Selection timestamp.
+
+    Returns:
+        tuple[list[int], list[dict], int]: IDs of removed rows to reactivate,
+        rows to insert, and the number of targets that are already active.
+    """
+    found = {}
+    for row in rows:
+        for column in TARGET_COLUMNS:
+            value = getattr(row, column)
+            if value is not None:
+                found[column, value] = row
+    reactivate = [row.id for row in found.values() if row.status != ACTIVE]
+    unchanged = len(found) - len(reactivate)
+    new_rows = [
+        {
+            "user_id": user_id,
+            **dict.fromkeys(TARGET_COLUMNS),
+            column: value,
+            "selected_at": now,
+            "status": ACTIVE,
+        }
+        for column, values in groups.items()
+        for value in values
+        if (column, value) not in found
+    ]
+    return reactivate, new_rows, unchanged
+
+def reactivate_statement(ids: list[int], now: datetime):
+    """
+    Args:
+        ids (list[int]): IDs of removed selections.
+        now (datetime): Selection timestamp.
+
+    Returns:
+        Update: Marks the selections active again.
+    """
+    return update(UserSelection).where(UserSelection.id.in_(ids)).values(status=ACTIVE, selected_at=now)
+
+def remove_statement(user_id: int, groups: dict[str, set]):
+    """
+    Args:
+        user_id (int): ID of the user.
+        groups (dict[str, set]): Values per target column.
+
+    Returns:
+        Update: Marks the user's active selections of the targets removed.
+    """
+    return (
+        update(UserSelection)
+        .where(UserSelection.user_id == user_id, UserSelection.status == ACTIVE, targets_filter(groups))
+        .values(status=REMOVED)
+    )
+
+def remove_all_statement(user_id: int):
+    """
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        Update: Marks all of the user's active selections removed (when the user is deleted).
+    """
+    return (
+        update(UserSelection)
+        .where(UserSelection.user_id == user_id, UserSelection.status == ACTIVE)
+        .values(status=REMOVED)
+    )
+
+def user_status_query(user_id: int):
+    """
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        Select: Primary key lookup of the user's status.
+    """
+    return select(User.status).where(User.id == user_id)
+
+def followers_query(column: str, values: list):
+    """
+    Build the follower count query for targets of one kind.
+
+    Args:
+        column (str): Target column.
+        values (list): Targets.
+
+    Returns:
+        Select: (target, count) for targets with at least one follower.
+    """
+    target = getattr(UserSelection, column)
+    return (
+        select(target, func.count())
+        .where(target.in_(values), UserSelection.status == ACTIVE)
+        .group_by(target)
+    )
+
+def follower_rows(column: str, values: list, counts: dict) -> list[dict]:
+    """
+    Args:
+        column (str): Target column.
+        values (list): Requested targets, in request order.
+        counts (dict): Followers per target, as returned by `followers_query`.
+
+    Returns:
+        list[dict]: `SelectionFollowersResponse` fields per target (0 for targets nobody follows).
+    """
+    return [{column: value, "followers": counts.get(value, 0)} for value in values]
+
+def verify_user(user_status: int | None) -> None:
+    """
+    Args:
+        user_status (int | None): Result of `user_status_query`, None if the user does not exist.
+
+    Raises:
+        HTTPException: 404 if the user does not exist or is deleted.
+    """
+    if user_status is None or user_status == DELETED_STATUS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+def unknown_target() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="Unknown user or selection target",
+    )
+
+# ----- Services -----
+def list_selections(db: Session, user_id: int) -> list[dict]:
+    """
+    Return a user's watchlist.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): ID of the user.
+
+    Returns:
+        list[dict]: `UserSelectionResponse` fields per active selection.
+    """
+    return [dict(row) for row in db.execute(watchlist_query(user_id)).mappings()]
+
+
+def add_selections(db: Session, user_id: int, targets: list[SelectionTarget]) -> SelectionBulkResponse:
+    """
+    Add targets to a user's watchlist.
+
+    Targets that are already followed are left alone. If a concurrent request
+    added one of the targets in between, the lookup is repeated once.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): ID of the user.
+        targets (list[SelectionTarget]): Targets to add.
+
+    Raises:
+        HTTPException: 404 if the user does not exist or is deleted, 422 if a target does not exist.
+
+    Returns:
+        SelectionBulkResponse: Number of targets added and already followed.
+    """
+    verify_user(db.execute(user_status_query(user_id)).scalar())
+    groups = group_targets(targets)
+    for attempt in range(2):
+        now = datetime.utcnow()
+        rows = db.execute(existing_selections_query(user_id, groups)).all()
+        reactivate, new_rows, unchanged = plan_additions(rows, groups, user_id, now)
+        try:
+            if reactivate:
+                db.execute(reactivate_statement(reactivate, now))
+            if new_rows:
+                db.execute(insert(UserSelection), new_rows)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            if attempt:
+                raise unknown_target()
+            continue
+        read_your_writes.mark(user_id)
+        return SelectionBulkResponse(changed=len(reactivate) + len(new_rows), unchanged=unchanged)
+
+
+def remove_selections(db: Session, user_id: int, targets: list[SelectionTarget]) -> SelectionBulkResponse:
+    """
+    Remove targets from a user's watchlist.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): ID of the user.
+        targets (list[SelectionTarget]): Targets to remove.
+
+    Raises:
+        HTTPException: 404 if the user does not exist or is deleted.
+
+    Returns:
+        SelectionBulkResponse: Number of targets removed and not followed in the first place.
+    """
+    verify_user(db.execute(user_status_query(user_id)).scalar())
+    groups = group_targets(targets)
+    removed = db.execute(remove_statement(user_id, groups)).rowcount
+    db.commit()
+    read_your_writes.mark(user_id)
+    requested = sum(len(values) for values in groups.values())
+    return SelectionBulkResponse(changed=removed, unchanged=requested - removed)
+
+
+def count_followers(db: Session, targets: dict[str, list]) -> list[dict]:
+    """
+    Count the users following each target.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        targets (dict[str, list]): Targets per target column.
+
+    Returns:
+        list[dict]: `SelectionFollowersResponse` fields per target.
+    """
+    result = []
+    for column, values in targets.items():
+        if values:
+            counts = dict(db.execute(followers_query(column, values)).tuples().all())
+            result.extend(follower_rows(column, values, counts))
+    return result
@@ -0,0 +1,197 @@
+"""
+Refresh token issuance and rotation.
+
+Refresh tokens are opaque random strings; only their SHA-256 digest is stored.
+Each login starts a token *family*. Every refresh marks the presented token
+as used and issues a new one in the same family, so a token that is presented
+twice can only mean it was stolen: the whole family is then revoked.
+A used or revoked row is only needed for that check until it expires, so
+expired rows are deleted by the purge (see `app.services.purge_service`).
+
+Refreshing never touches bcrypt, which keeps the password check off the
+steady-state path while access tokens stay short-lived.
+"""
+
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.roles import access_claims, access_claims_query
+from app.models.token import RefreshToken
+from app.schemas.user import UserLoginResponse
+
+# ----- Helpers -----
+def hash_refresh_token(raw_token: str) -> str:
+    """
+    Digest stored in place of the refresh token.
+
+    Args:
+        raw_token (str): Refresh token as given to the client.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest.
+    """
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+def new_refresh_token(user_id: int, family_id: str | None = None) -> tuple[str, RefreshToken]:
+    """
+    Create a refresh token and its (unsaved) database row.
+
+    Args:
+        user_id (int): Owner of the token.
+        family_id (str | None): Rotation family to join. A new family is started when omitted.
+
+    Returns:
+        tuple[str, RefreshToken]: The raw token for the client and the row to add to the session.
+    """
+    raw_token = secrets.token_urlsafe(48)
+    row = RefreshToken(
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4().hex,
+        token_hash=hash_refresh_token(raw_token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    return raw_token, row
+
+def invalid_refresh_token(detail: str = "Invalid refresh token") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def revoke_family_statement(family_id: str):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+def revoke_user_statement(user_id: int):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+def claim_statement(token: RefreshToken):
+    # Conditional update: only one concurrent refresh can claim a token
+    return (
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == token.id,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(used_at=datetime.utcnow())
+    )
+
+def expired_refresh_tokens_query(now: datetime, limit: int):
+    """
+    Build the query for the next batch of expired refresh tokens.
+
+    An expired token is rejected before the reuse check, so its row no
+    longer serves any purpose, whether it was used, revoked or neither.
+
+    Args:
+        now (datetime): Current UTC time.
+        limit (int): Batch size.
+
+    Returns:
+        Select: IDs of expired rows, a range of the `expires_at` index.
+    """
+    return (
+        select(RefreshToken.id)
+        .where(RefreshToken.expires_at <= now)
+        .order_by(RefreshToken.expires_at)
+        .limit(limit)
+    )
+
+# ----- Service functions -----
+def issue_refresh_token(db: Session, user_id: int) -> str:
+    """
+    Start a new refresh token family for a fresh login.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): ID of the authenticated user.
+
+    Returns:
+        str: The raw refresh token.
+    """
+    raw_token, row = new_refresh_token(user_id)
+    db.add(row)
+    db.commit()
+    return raw_token
+
+
+def rotate_refresh_token(db: Session, raw_token: str) -> UserLoginResponse:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        raw_token (str): Refresh token presented by the client.
+
+    Raises:
+        HTTPException: 401 if the token is unknown, expired or revoked, or was
+            already used (in which case its whole family is revoked).
+
+    Returns:
+        UserLoginResponse: New access token, user ID and the next refresh token.
+    """
+    token = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(raw_token)).first()
+    if token is None:
+        raise invalid_refresh_token()
+    if token.expires_at <= datetime.utcnow():
+        raise invalid_refresh_token("Refresh token expired")
+    user_id, family_id = token.user_id, token.family_id
+    if token.revoked_at is not None or token.used_at is not None or db.execute(claim_statement(token)).rowcount != 1:
+        # Reuse of a rotated token: assume it leaked and end the whole session
+        db.rollback()
+        db.execute(revoke_family_statement(family_id))
+        db.commit()
+        raise invalid_refresh_token("Refresh token reuse detected")
+
+    # Re-read the roles, so a refreshed token reflects role changes
+    claims_row = db.execute(access_claims_query(user_id)).first()
+    if claims_row is None:
+        db.rollback()
+        raise invalid_refresh_token()
+    next_token, row = new_refresh_token(user_id, family_id)
+    db.add(row)
+    db.commit()
+    access_token = create_access_token(access_claims(*claims_row))
+    return UserLoginResponse(access_token=access_token, user_id=user_id, refresh_token=next_token)
+
+
+def revoke_refresh_family(db: Session, raw_token: str) -> None:
+    """
+    Revoke the family of a refresh token (logout of one session).
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        raw_token (str): Refresh token of the session to end.
+    """
+    token = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(raw_token)).first()
+    if token is not None:
+        db.execute(revoke_family_statement(token.family_id))
+        db.commit()
+
+
+def delete_user_refresh_tokens(db: Session, user_id: int) -> None:
+    """
+    Delete all refresh tokens of a user (before the user row itself is deleted).
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): ID of the user.
+    """
+    db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
@@ -1,13 +1,254 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+import orjson
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
-from app.models.user import User
-from app.core.security import hash_password, verify_password, create_access_token
+from sqlalchemy.orm.exc import StaleDataError
+from fastapi import BackgroundTasks, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from app.db.session import SessionLocal, read_session
+from app.db.replicas import read_your_writes
+from app.models.user import DELETED_STATUS, User
+from app.core import metrics
+from app.core.availability import availability_filter
+from app.core.etags import page_etag, precondition_failed
+from app.core.revocation import revocation_store
+from app.core.roles import Role, access_claims, format_roles, permissions_cache
+from app.core.token_cache import token_cache
+from app.core.security import (
+    hash_password_async, hash_password_pooled, verify_password_pooled, dummy_verify_pooled,
+    password_needs_update, create_access_token
+)
+from app.services.search_index import SEARCH_FIELDS, index_user, indexed_values
+from app.services.selection_service import remove_all_statement
+from app.services.token_service import (
+    issue_refresh_token, delete_user_refresh_tokens, revoke_user_statement
+)
 from app.schemas.user import (
     UserRegisterRequest, UserRegisterResponse, 
     UserLoginRequest, UserLoginResponse, 
-    UserUpdateRequest, UserProfileResponse
+    UserUpdateRequest, UserProfileResponse, UserRolesResponse
 )
 
+# ----- Listing helpers -----
+# Columns returned by the profile read endpoints. Selecting them directly
+# avoids building ORM entities for rows that are only serialized.
+PROFILE_COLUMNS = (User.id, User.username, User.phone_number, User.email, User.created_at)
+
+# Rows fetched per round trip when streaming the user list.
+STREAM_BATCH_SIZE = 1000
+
+
+def active_profiles_query(after_id: int | None = None, columns: tuple = PROFILE_COLUMNS):
+    """
+    Build the keyset-ordered query for active user profiles.
+
+    Args:
+        after_id (int | None): Only return users with an ID greater than this cursor.
+        columns (tuple): Selected columns.
+
+    Returns:
+        Select: Column-only select ordered by ID, served by the (status, id) index.
+    """
+    stmt = select(*columns).where(User.status != DELETED_STATUS)
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    return stmt.order_by(User.id)
+
+
+def page_fingerprint_query(after_id: int | None, limit: int):
+    """
+    Build the query for the ETag of a page of active user profiles.
+
+    Aggregates the page window (the page plus the row after it, which decides
+    the next-page cursor) inside the database, so only one row is returned.
+
+    Args:
+        after_id (int | None): ID of the last user on the previous page.
+        limit (int): Page size.
+
+    Returns:
+        Select: Row count, sum of IDs and sum of versions of the window (see `page_etag`).
+    """
+    window = active_profiles_query(after_id, (User.id, User.version)).limit(limit + 1).subquery()
+    return select(
+        func.count(), func.coalesce(func.sum(window.c.id), 0), func.coalesce(func.sum(window.c.version), 0)
+    ).select_from(window)
+
+
+def profile_row_query(user_id: int):
+    """
+    Build the query for one user's profile columns, status and version.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        Select: Column-only select; the status lets callers reject inactive users.
+    """
+    return select(*PROFILE_COLUMNS, User.status, User.version).where(User.id == user_id)
+
+
+def profile_version_query(user_id: int):
+    """
+    Build the query for one user's status and version, used to answer conditional GETs.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        Select: Status and version of the user.
+    """
+    return select(User.status, User.version).where(User.id == user_id)
+
+
+
+def taken_fields_query(values: dict[str, str]):
+    """
+    Build the combined uniqueness check of registration values.
+
+    One statement seeks the unique index of every column (an index union on
+    SQL Server) and reports which of the values matched, as compared by the
+    database's collation.
+
+    Args:
+        values (dict[str, str]): Values keyed by field name ("username", "email", "phone_number").
+
+    Returns:
+        Select: One row with a 1/0 (NULL when nothing matched) flag per field.
+    """
+    conditions = {field: getattr(User, field) == value for field, value in values.items()}
+    return select(
+        *(func.max(case((condition, 1), else_=0)).label(field) for field, condition in conditions.items())
+    ).where(or_(*conditions.values()))
+
+
+def unchecked_values(values: dict[str, str | None]) -> dict[str, str]:
+    """
+    Drop the values the availability filter knows to be free.
+
+    Args:
+        values (dict[str, str | None]): Values keyed by field name (None: not asked).
+
+    Returns:
+        dict[str, str]: Values that need a database lookup (all of them while the filter is not loaded).
+    """
+    return {
+        field: value for field, value in values.items()
+        if value is not None and availability_filter.might_be_taken(field, value)
+    }
+
+
+def taken_fields(row, values: dict[str, str]) -> list[str]:
+    """
+    Args:
+        row (Row): Result of `taken_fields_query`.
+        values (dict[str, str]): Values that were looked up.
+
+    Returns:
+        list[str]: Fields whose value is in use, in field order.
+    """
+    return [field for field in values if getattr(row, field)]
+
+
+def field_taken(field: str | None) -> HTTPException:
+    """
+    Args:
+        field (str | None): Field whose value is in use, None if unknown.
+
+    Returns:
+        HTTPException: 409 naming the field.
+    """
+    detail = f"{field} is already registered" if field else "Username, email or phone number is already registered"
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+def registration_values(user_data: UserRegisterRequest) -> dict[str, str]:
+    """
+    Args:
+        user_data (UserRegisterRequest): Registration data.
+
+    Returns:
+        dict[str, str]: The unique values of the registration, keyed by field name.
+    """
+    return {field: getattr(user_data, field) for field in ("username", "email", "phone_number")}
+
+
+def encode_ndjson(rows: Iterable) -> bytes:
+    """
+    Encode profile rows as newline-delimited JSON with orjson.
+
+    Rows are serialized as read: their values were validated when they were
+    written, so they are not validated again on the way out.
+
+    Args:
+        rows (Iterable): Row mappings of `PROFILE_COLUMNS`.
+
+    Returns:
+        bytes: One JSON object per line.
+    """
+    return b"".join(orjson.dumps(dict(row), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+def find_taken_fields(db: Session, values: dict[str, str | None], use_filter: bool = True) -> list[str]:
+    """
+    Find which of the given usernames, emails and phone numbers are in use.
+
+    Values the availability filter knows to be free are not looked up; the
+    others are checked with one indexed query.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        values (dict[str, str | None]): Values keyed by field name (None: not asked).
+        use_filter (bool): Consult the availability filter first.
+
+    Returns:
+        list[str]: Fields whose value is in use.
+    """
+    if use_filter:
+        values = unchecked_values(values)
+    else:
+        values = {field: value for field, value in values.items() if value is not None}
+    if not values:
+        return []
+    return taken_fields(db.execute(taken_fields_query(values)).one(), values)
+
+
+def check_availability(db: Session, values: dict[str, str | None]) -> dict[str, bool]:
+    """
+    Report whether usernames, emails and phone numbers are free.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        values (dict[str, str | None]): Values keyed by field name (None: not asked).
+
+    Returns:
+        dict[str, bool]: True for each asked field whose value is free.
+    """
+    taken = find_taken_fields(db, values)
+    return {field: field not in taken for field, value in values.items() if value is not None}
+
+
+def load_availability_filter() -> None:
+    """
+    Rebuild the availability filter from the `users` table, in batches of
+    `STREAM_BATCH_SIZE` rows (on a replica, if configured).
+    """
+    db = read_session()
+    availability_filter.begin_load()
+    try:
+        query = select(User.username, User.email, User.phone_number).execution_options(yield_per=STREAM_BATCH_SIZE)
+        for rows in db.execute(query).partitions():
+            availability_filter.load(rows)
+    except BaseException:
+        availability_filter.abort_load()
+        raise
+    finally:
+        db.close()
+    availability_filter.finish_load()
+
+
 def register_user(db: Session, user_data: UserRegisterRequest) -> UserRegisterResponse:
     """
     Register a new user in the database.
@@ -16,38 +257,100 @@ def register_user(db: Session, user_data: UserRegisterRequest) -> UserRegisterRe
         db (Session): SQLAlchemy database session.
         user_data (UserRegisterRequest): User registration data including username, phone, email, and password.
     
+    Raises:
+        HTTPException: 409 naming the field if the username, email or phone
+            number is taken. It is raised before the password is hashed, except
+            when a concurrent registration takes the value in between.
+
     Returns:
         UserRegisterResponse: Contains the created user's ID and the provided password.
     """
+    values = registration_values(user_data)
+    taken = find_taken_fields(db, values)
+    if taken:
+        raise field_taken(taken[0])
     user = User(
         username=user_data.username,
         phone_number=user_data.phone_number,
         email=user_data.email,
-        password=hash_password(user_data.password)
+        password=hash_password_pooled(user_data.password)
     )
     db.add(user)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Taken by a concurrent registration after the check
+        db.rollback()
+        taken = find_taken_fields(db, values, use_filter=False)
+        raise field_taken(taken[0] if taken else None)
+    index_user(db, user)
     db.commit()
-    db.refresh(user)
+    availability_filter.add(values)
     return UserRegisterResponse(user_id=user.id, password=user_data.password)
 
 
-def authenticate_user(db: Session, login_data: UserLoginRequest) -> UserLoginResponse | None:
+def authenticate_user(
+    db: Session, login_data: UserLoginRequest, background_tasks: BackgroundTasks | None = None
+) -> UserLoginResponse | None:
     """
     Authenticate a user and generate an access token.
+
+    If the stored hash uses a deprecated scheme or an outdated cost, it is
+    replaced by `rehash_password` after the response has been sent.
     
     Args:
         db (Session): SQLAlchemy database session.
         login_data (UserLoginRequest): User login data including email and password.
+        background_tasks (BackgroundTasks | None): Response background tasks; without them hashes are not upgraded.
     
     Returns:
         UserLoginResponse | None: Returns a login response with access token and user ID if authentication succeeds; None otherwise.
     """
     user = db.query(User).filter(User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.password):
+    if not user or user.status == DELETED_STATUS:
+        # Unknown email: spend the same bcrypt time so timing does not reveal it
+        dummy_verify_pooled()
         return None
+    if not verify_password_pooled(login_data.password, user.password):
+        return None
+    if background_tasks is not None and password_needs_update(user.password):
+        background_tasks.add_task(rehash_password, user.id, user.password, login_data.password)
     
-    token = create_access_token({"sub": str(user.id)})
-    return UserLoginResponse(access_token=token, user_id=user.id)
+    token = create_access_token(access_claims(user.id, user.roles, user.permissions_version))
+    refresh_token = issue_refresh_token(db, user.id)
+    return UserLoginResponse(access_token=token, user_id=user.id, refresh_token=refresh_token)
+
+
+async def rehash_password(user_id: int, old_hash: str, password: str) -> None:
+    """
+    Replace an outdated password hash with one made by the current settings.
+
+    Runs as a background task after a successful login. The update only
+    applies while the stored hash is still `old_hash`, so a password changed
+    in the meantime is never overwritten.
+
+    Args:
+        user_id (int): ID of the user who logged in.
+        old_hash (str): Hash the password was verified against.
+        password (str): The verified plain password.
+    """
+    try:
+        new_hash = await hash_password_async(password)
+    except HTTPException:
+        # Hashing pool saturated: leave it for the next login
+        metrics.PASSWORD_REHASHES.inc(result="busy")
+        return
+    updated = await run_in_threadpool(_store_rehash, user_id, old_hash, new_hash)
+    metrics.PASSWORD_REHASHES.inc(result="upgraded" if updated else "changed")
+
+
+def _store_rehash(user_id: int, old_hash: str, new_hash: str) -> bool:
+    with SessionLocal() as db:
+        result = db.execute(
+            update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash)
+        )
+        db.commit()
+        return result.rowcount == 1
 
 
 def get_user_profile(db: Session, user_id: int) -> UserProfileResponse:
@@ -64,63 +367,248 @@ def get_user_profile(db: Session, user_id: int) -> UserProfileResponse:
     Returns:
         UserProfileResponse: User profile data.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    # Session.get() checks the identity map first, so a user already loaded
+    # in this request (e.g. by an earlier lookup) costs no extra query.
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
 
-def update_user_profile(db: Session, user_id: int, data: UserUpdateRequest) -> UserProfileResponse:
+def get_user_profile_row(db: Session, user_id: int) -> dict:
+    """
+    Retrieve a user's profile columns and status by ID, without building the ORM entity.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): ID of the user to retrieve.
+
+    Raises:
+        HTTPException: If the user does not exist (404).
+
+    Returns:
+        dict: `UserProfileResponse` fields plus `status` and `version`.
+    """
+    row = db.execute(profile_row_query(user_id)).mappings().first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return dict(row)
+
+
+def get_user_version(db: Session, user_id: int) -> tuple[int, int]:
+    """
+    Retrieve a user's status and version by ID (an index lookup, no profile columns).
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): ID of the user.
+
+    Raises:
+        HTTPException: If the user does not exist (404).
+
+    Returns:
+        tuple[int, int]: Status and version.
+    """
+    row = db.execute(profile_version_query(user_id)).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return row.status, row.version
+
+
+def update_user_profile(db: Session, user: User, data: UserUpdateRequest) -> UserProfileResponse:
     """
     Update an existing user's profile.
     
     Args:
         db (Session): SQLAlchemy database session.
-        user_id (int): ID of the user to update.
+        user (User): User to update, already loaded in this session (see `get_user_profile`).
         data (UserUpdateRequest): Updated user data (username, phone_number, email, password).
     
     Raises:
-        HTTPException: If the user does not exist (404).
+        HTTPException: 409 naming the field if the new username, email or phone
+            number is taken, 412 if another request changed the user since it was loaded.
     
     Returns:
         UserProfileResponse: Updated user profile data.
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    if data.username:
-        user.username = data.username
-    if data.phone_number:
-        user.phone_number = data.phone_number
-    if data.email:
-        user.email = data.email
+    # Only values that differ from the user's own need to be free
+    values = {
+        field: getattr(data, field)
+        for field in SEARCH_FIELDS
+        if getattr(data, field) and getattr(data, field) != getattr(user, field)
+    }
+    taken = find_taken_fields(db, values)
+    if taken:
+        raise field_taken(taken[0])
+    changed = list(values)
+    for field in changed:
+        setattr(user, field, getattr(data, field))
     if data.password:
-        user.password = hash_password(data.password)
+        user.password = hash_password_pooled(data.password)
+        db.execute(revoke_user_statement(user.id))
 
-    db.commit()
-    db.refresh(user)
+    try:
+        # The UPDATE first, so a stale version fails before the index is rewritten
+        db.flush()
+        index_user(db, user, changed)
+        db.commit()
+    except StaleDataError:
+        # The UPDATE matched no row: the version changed since the user was loaded
+        db.rollback()
+        raise precondition_failed()
+    except IntegrityError:
+        # Taken by a concurrent write after the check
+        db.rollback()
+        taken = find_taken_fields(db, values, use_filter=False)
+        raise field_taken(taken[0] if taken else None)
+    token_cache.invalidate_user(user.id)
+    availability_filter.add(indexed_values(user, changed))
+    # Replicas may still serve the old row; read it from the primary for a while
+    read_your_writes.mark(user.id)
+    if data.password:
+        # A password change signs the user out everywhere
+        revocation_store.revoke_user(user.id)
     return user
 
 
-def delete_user_profile(db: Session, user_id: int) -> dict:
+def set_user_roles(db: Session, user: User, roles: list[Role]) -> UserRolesResponse:
     """
-    Delete a user from the database.
+    Replace a user's roles.
+
+    Bumps the user's permissions version, so `require_role` rejects the
+    tokens issued before the change with 401 until the client refreshes them.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user (User): User to change, already loaded in this session (see `get_user_profile`).
+        roles (list[Role]): The complete set of roles.
+
+    Raises:
+        HTTPException: If another request changed the user since it was loaded (412).
+
+    Returns:
+        UserRolesResponse: The stored roles and the new permissions version.
+    """
+    user.roles = format_roles(roles)
+    user.permissions_version += 1
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise precondition_failed()
+    permissions_cache.invalidate(user.id)
+    token_cache.invalidate_user(user.id)
+    read_your_writes.mark(user.id)
+    return UserRolesResponse(id=user.id, roles=user.roles.split(), permissions_version=user.permissions_version)
+
+
+def delete_user_profile(db: Session, user: User) -> dict:
+    """
+    Soft-delete a user.
+
+    The user gets status 0 and `deleted_at`, which hides them from every read
+    and login. Their selections are marked removed, their refresh tokens are
+    deleted and their access tokens revoked. The row itself, still holding
+    its username, email and phone number, is removed by the purge once it is
+    older than `USER_RETENTION_DAYS` (see `app.services.purge_service`).
     
     Args:
         db (Session): SQLAlchemy database session.
-        user_id (int): ID of the user to delete.
+        user (User): User to delete, already loaded in this session (see `get_user_profile`).
     
     Raises:
-        HTTPException: If the user does not exist (404).
+        HTTPException: If another request changed the user since it was loaded (412).
     
     Returns:
         dict: Confirmation message.
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user_id = user.id
+    user.status = DELETED_STATUS
+    user.deleted_at = datetime.utcnow()
+    delete_user_refresh_tokens(db, user_id)
+    db.execute(remove_all_statement(user_id))
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise precondition_failed()
+    token_cache.invalidate_user(user_id)
+    read_your_writes.mark(user_id)
+    revocation_store.revoke_user(user_id)
+    return {"message": "User deleted successfully"}
 
-    db.delete(user)
-    db.commit()
-    return {"message": "User deleted successfully"}
\ No newline at end of file
+
+def list_user_profiles(db: Session, cursor: int | None, limit: int) -> tuple[list[dict], int | None, str]:
+    """
+    Return one keyset page of active user profiles.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        cursor (int | None): ID of the last user on the previous page, or None for the first page.
+        limit (int): Maximum number of users to return.
+
+    Returns:
+        tuple[list[dict], int | None, str]: The page of profiles, the cursor for the
+        next page (None on the last page) and the page's ETag.
+    """
+    columns = (*PROFILE_COLUMNS, User.version)
+    rows = db.execute(active_profiles_query(cursor, columns).limit(limit + 1)).mappings().all()
+    return page_from_rows(rows, limit)
+
+
+def page_from_rows(rows: list, limit: int) -> tuple[list[dict], int | None, str]:
+    """
+    Split the rows of a page window into the page, its next cursor and its ETag.
+
+    Args:
+        rows (list): Up to `limit + 1` row mappings of the profile columns plus `version`.
+        limit (int): Page size.
+
+    Returns:
+        tuple[list[dict], int | None, str]: Same as `list_user_profiles`.
+    """
+    etag = page_etag(len(rows), sum(row["id"] for row in rows), sum(row["version"] for row in rows))
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    profiles = []
+    for row in rows[:limit]:
+        profile = dict(row)
+        del profile["version"]
+        profiles.append(profile)
+    return profiles, next_cursor, etag
+
+
+def get_page_etag(db: Session, cursor: int | None, limit: int) -> str:
+    """
+    Compute the ETag of a page without reading its rows.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        cursor (int | None): ID of the last user on the previous page.
+        limit (int): Page size.
+
+    Returns:
+        str: The ETag `list_user_profiles` would return.
+    """
+    count, id_sum, version_sum = db.execute(page_fingerprint_query(cursor, limit)).one()
+    return page_etag(count, id_sum, version_sum)
+
+
+def stream_user_profiles() -> Iterator[bytes]:
+    """
+    Stream all active user profiles as NDJSON lines.
+
+    Rows are fetched in batches of `STREAM_BATCH_SIZE` and each batch is
+    written as one chunk, so memory use does not grow with the table size.
+    The generator owns its session (on a replica, if configured) because it
+    outlives the request's dependencies.
+
+    Yields:
+        bytes: One JSON-encoded `UserProfileResponse` per line, a batch at a time.
+    """
+    db = read_session()
+    try:
+        result = db.execute(active_profiles_query().execution_options(yield_per=STREAM_BATCH_SIZE))
+        for rows in result.mappings().partitions():
+            yield encode_ndjson(rows)
+    finally:
+        db.close()
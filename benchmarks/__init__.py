@@ -0,0 +1,19 @@
+"""
+Benchmark suite for the authentication and user endpoints.
+
+This package provides:
+1. Micro-benchmarks of the security primitives (`hash_password`,
+   `verify_password`, `create_access_token`, `decode_access_token`) across
+   bcrypt rounds and JWT algorithms.
+2. End-to-end benchmarks of every route in `app/api`, driven in-process
+   through ASGI against a SQLite stand-in database.
+3. JSON baselines and a comparison mode that fails when a benchmark regresses
+   beyond a threshold.
+4. Calibration of the password hashing cost against a target verify latency.
+
+Usage:
+    python -m benchmarks run --output baseline.json
+    python -m benchmarks run --compare baseline.json --threshold 0.2
+    python -m benchmarks compare baseline.json current.json
+    python -m benchmarks calibrate-hash --target-ms 250
+"""
@@ -0,0 +1,206 @@
+"""
+Command-line entry point of the benchmark suite.
+
+This module provides:
+1. `run`: execute the micro, serialization, end-to-end and/or startup benchmarks, print a table,
+   optionally save a JSON baseline and compare against an earlier one.
+2. `compare`: compare two saved result files.
+3. `calibrate-hash`: pick the password hashing cost for a target verify latency.
+
+`run` and `compare` exit with status 1 when a benchmark regressed beyond the threshold.
+"""
+
+import argparse
+import asyncio
+import os
+import platform
+import shutil
+import sys
+
+from benchmarks.environment import configure_environment, use_placeholder_settings
+from benchmarks.stats import compare_results, load_results, save_results
+
+# ----- Output -----
+def print_results(results: dict[str, dict]) -> None:
+    """
+    Print a latency table.
+
+    Args:
+        results (dict[str, dict]): Summaries keyed by benchmark name.
+    """
+    width = max((len(name) for name in results), default=10)
+    print(f"{'benchmark':<{width}}  {'count':>6}  {'p50 ms':>10}  {'p95 ms':>10}  {'p99 ms':>10}  {'ops/s':>10}  {'errors':>6}")
+    for name, r in results.items():
+        print(
+            f"{name:<{width}}  {r['count']:>6}  {r['p50_ms']:>10.3f}  {r['p95_ms']:>10.3f}  "
+            f"{r['p99_ms']:>10.3f}  {r['per_second']:>10.1f}  {r['errors']:>6}"
+        )
+
+def print_comparison(rows: list[dict], metric: str, threshold: float) -> bool:
+    """
+    Print a comparison table.
+
+    Args:
+        rows (list[dict]): Rows returned by `compare_results`.
+        metric (str): Compared metric.
+        threshold (float): Allowed relative slowdown.
+
+    Returns:
+        bool: True if any benchmark regressed.
+    """
+    width = max((len(row["name"]) for row in rows), default=10)
+    print(f"\n{metric} compared with baseline (threshold {threshold:.0%}):")
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else "ok"
+        print(f"{row['name']:<{width}}  {row['baseline']:>10.3f}  {row['current']:>10.3f}  {row['change']:>+8.1%}  {flag}")
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed beyond {threshold:.0%}")
+    return bool(regressed)
+
+def warn_environment(baseline: dict, current: dict) -> None:
+    """
+    Warn about settings that differ between two runs, since they make timings incomparable.
+
+    Args:
+        baseline (dict): Environment of the baseline run.
+        current (dict): Environment of the current run.
+    """
+    for key in ("db_mode", "algorithm", "bcrypt_rounds", "concurrency", "workers", "python"):
+        if baseline.get(key) != current.get(key):
+            print(f"warning: {key} differs from the baseline ({baseline.get(key)} vs {current.get(key)})", file=sys.stderr)
+
+# ----- Commands -----
+def run(args: argparse.Namespace) -> int:
+    db_path = configure_environment(async_mode=args.async_mode)
+    from benchmarks.e2e import run_e2e
+    from benchmarks.micro import run_micro
+    from benchmarks.serialization import run_serialization
+    from benchmarks.startup import run_startup
+    from app.core.config import settings
+
+    results = {}
+    try:
+        if args.suite in ("micro", "all"):
+            results.update(run_micro(
+                iterations=args.iterations * 5,
+                hash_iterations=args.hash_iterations,
+                rounds=tuple(args.rounds),
+                algorithms=tuple(args.algorithms),
+            ))
+        if args.suite in ("serialization", "all"):
+            results.update(run_serialization(rows=args.rows, iterations=max(args.iterations // 5, 1)))
+        if args.suite in ("e2e", "all"):
+            e2e_results, uncovered = asyncio.run(run_e2e(
+                db_path,
+                iterations=args.iterations,
+                concurrency=args.concurrency,
+                users=args.users,
+                bcrypt_rounds=args.bcrypt_rounds,
+            ))
+            results.update(e2e_results)
+            for route in uncovered:
+                print(f"warning: no benchmark scenario for {route}", file=sys.stderr)
+        if args.suite in ("startup", "all"):
+            results.update(run_startup(runs=args.startup_runs, workers=args.workers))
+    finally:
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    print_results(results)
+    environment = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "db_mode": "async" if settings.DB_ASYNC_MODE else "sync",
+        "algorithm": settings.ALGORITHM,
+        "bcrypt_rounds": args.bcrypt_rounds or "default",
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "workers": args.workers,
+    }
+    if args.output:
+        save_results(args.output, results, environment)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        baseline = load_results(args.compare)
+        warn_environment(baseline["environment"], environment)
+        rows = compare_results(baseline["results"], results, args.threshold, args.metric)
+        return 1 if print_comparison(rows, args.metric, args.threshold) else 0
+    return 0
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+    warn_environment(baseline["environment"], current["environment"])
+    rows = compare_results(baseline["results"], current["results"], args.threshold, args.metric)
+    return 1 if print_comparison(rows, args.metric, args.threshold) else 0
+
+def calibrate_hash(args: argparse.Namespace) -> int:
+    use_placeholder_settings()
+    from benchmarks.calibrate import SETTING_NAMES, calibrate
+
+    target = args.target_ms / 1000
+    best, measured = calibrate(args.scheme, target, args.samples)
+    print(f"{'cost':>6}  {'verify ms':>10}")
+    for cost, seconds in measured:
+        print(f"{cost:>6}  {seconds * 1000:>10.1f}")
+    verify_ms = dict(measured)[best] * 1000
+    print(f"\nRecommended: {SETTING_NAMES[args.scheme]}={best}  (verify {verify_ms:.1f} ms, target {args.target_ms:g} ms)")
+    if verify_ms > args.target_ms:
+        print("warning: even the lowest cost exceeds the target", file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Auth API benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_comparison_options(command):
+        command.add_argument("--threshold", type=float, default=0.2,
+                             help="Allowed relative slowdown before failing (default: 0.2 = 20%%)")
+        command.add_argument("--metric", default="p95_ms",
+                             help="Metric to compare: mean_ms, p50_ms, p95_ms, p99_ms, max_ms or per_second")
+
+    run_parser = commands.add_parser("run", help="Run benchmarks")
+    run_parser.add_argument("--suite", choices=("micro", "serialization", "e2e", "startup", "all"), default="all")
+    run_parser.add_argument("--iterations", type=int, default=100,
+                            help="Requests per route (JWT micro-benchmarks run 5x as many, serialization 1/5)")
+    run_parser.add_argument("--hash-iterations", type=int, default=10, help="Calls per bcrypt micro-benchmark")
+    run_parser.add_argument("--rounds", type=int, nargs="+", default=[4, 8, 10, 12],
+                            help="bcrypt cost factors for the micro-benchmarks")
+    run_parser.add_argument("--algorithms", nargs="+", default=["HS256", "HS384", "HS512"],
+                            help="JWT algorithms for the micro-benchmarks")
+    run_parser.add_argument("--rows", type=int, default=10_000, help="Profile rows per serialization benchmark")
+    run_parser.add_argument("--concurrency", type=int, default=1, help="Concurrent clients per route")
+    run_parser.add_argument("--startup-runs", type=int, default=5, help="Times the workers are booted by the startup suite")
+    run_parser.add_argument("--workers", type=int, default=1, help="Worker processes booted at once by the startup suite")
+    run_parser.add_argument("--users", type=int, default=1000, help="Users seeded before the end-to-end run")
+    run_parser.add_argument("--bcrypt-rounds", type=int, default=None,
+                            help="bcrypt cost used by the app during the end-to-end run")
+    run_parser.add_argument("--async", dest="async_mode", action="store_true",
+                            help="Benchmark the async routers (aiosqlite) instead of the sync ones")
+    run_parser.add_argument("--output", help="Write results to this JSON file")
+    run_parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    add_comparison_options(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    add_comparison_options(compare_parser)
+    compare_parser.set_defaults(handler=compare)
+
+    calibrate_parser = commands.add_parser("calibrate-hash", help="Pick the password hashing cost for this machine")
+    calibrate_parser.add_argument("--scheme", choices=("bcrypt", "argon2"), default="bcrypt")
+    calibrate_parser.add_argument("--target-ms", type=float, default=250,
+                                  help="Target verification latency in milliseconds (default: 250)")
+    calibrate_parser.add_argument("--samples", type=int, default=3, help="Timed verifications per cost")
+    calibrate_parser.set_defaults(handler=calibrate_hash)
+    return parser
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
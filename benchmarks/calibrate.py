@@ -0,0 +1,76 @@
+"""
+Calibration of the password hashing cost for the current machine.
+
+This module provides `calibrate`, which measures `verify` with increasing
+cost (bcrypt rounds or argon2 time cost) and picks the highest cost whose
+median verification stays within a target latency. Contexts are built with
+`app.core.security.build_crypt_context`, so the measured hashes are exactly
+the ones the application would produce with the recommended setting.
+"""
+
+import statistics
+import time
+
+PASSWORD = "correct horse battery staple"
+
+# Cost ranges searched per scheme; the search stops at the first cost above the target
+COST_RANGES = {
+    "bcrypt": range(4, 32),
+    "argon2": range(1, 65),
+}
+SETTING_NAMES = {"bcrypt": "BCRYPT_ROUNDS", "argon2": "ARGON2_TIME_COST"}
+
+def measure_verify(scheme: str, cost: int, samples: int) -> float:
+    """
+    Median time of one password verification.
+
+    Args:
+        scheme (str): "bcrypt" or "argon2".
+        cost (int): bcrypt rounds or argon2 time cost.
+        samples (int): Timed verifications.
+
+    Returns:
+        float: Median verification time in seconds.
+    """
+    from app.core.security import build_crypt_context
+
+    if scheme == "bcrypt":
+        context = build_crypt_context(schemes=["bcrypt"], bcrypt_rounds=cost)
+    else:
+        context = build_crypt_context(schemes=["argon2"], argon2_time_cost=cost)
+    hashed = context.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify(PASSWORD, hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def calibrate(scheme: str, target: float, samples: int = 3) -> tuple[int, list[tuple[int, float]]]:
+    """
+    Find the highest cost whose verification fits the target latency.
+
+    Args:
+        scheme (str): "bcrypt" or "argon2".
+        target (float): Target verification time in seconds.
+        samples (int): Timed verifications per cost.
+
+    Raises:
+        ValueError: If the scheme is not supported.
+
+    Returns:
+        tuple[int, list[tuple[int, float]]]: The recommended cost (the lowest
+        one if even that exceeds the target) and the measured (cost, seconds) pairs.
+    """
+    if scheme not in COST_RANGES:
+        raise ValueError(f"Unsupported scheme: {scheme!r}")
+    costs = COST_RANGES[scheme]
+    measured = []
+    best = costs[0]
+    for cost in costs:
+        seconds = measure_verify(scheme, cost, samples)
+        measured.append((cost, seconds))
+        if seconds > target:
+            break
+        best = cost
+    return best, measured
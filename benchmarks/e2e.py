@@ -0,0 +1,395 @@
+"""
+End-to-end benchmarks of the API routes.
+
+Requests go through the full ASGI stack (routing, dependencies, validation,
+serialization) in-process via `httpx.ASGITransport`, against a SQLite file
+(`DATABASE_URL`, WAL journaling) that stands in for SQL Server. Async mode
+serves the async routers through aiosqlite on the same file.
+
+The schema is created with `app.db.bootstrap`. Every request a scenario
+sends is prepared (users seeded, tokens issued) before timing starts.
+
+Requires the `test` extra (httpx, aiosqlite).
+"""
+
+import asyncio
+import itertools
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from benchmarks.stats import summarize
+
+PASSWORD = "correct horse battery staple"
+
+# Rows of the `stocks` stand-in, and stocks each user follows
+STOCKS = 1000
+WATCHLIST_SIZE = 20
+
+# ----- Scenarios -----
+@dataclass
+class Scenario:
+    """
+    One benchmarked route.
+
+    Attributes:
+        method (str): HTTP method.
+        path (str): Route template, as registered in the app.
+        prepare (Callable[[int], list[dict]]): Builds the `httpx` request
+            arguments (`url`, `headers`, `json`, ...) for n requests.
+        expected_status (int): Status code counted as a success.
+        variant (str): Distinguishes several scenarios of one route, e.g. "304".
+    """
+    method: str
+    path: str
+    prepare: Callable[[int], list[dict]]
+    expected_status: int = 200
+    variant: str = ""
+
+    @property
+    def name(self) -> str:
+        suffix = f" [{self.variant}]" if self.variant else ""
+        return f"e2e {self.method} {self.path}{suffix}"
+
+class BenchDatabase:
+    """
+    Seeds the stand-in database directly, bypassing the API.
+
+    Args:
+        db_path (str): SQLite database file.
+    """
+
+    def __init__(self, db_path: str):
+        from sqlalchemy import create_engine
+        from app.core.security import hash_password
+
+        self.engine = create_engine(
+            f"sqlite:///{db_path}", connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        self.password_hash = hash_password(PASSWORD)
+        self._sequence = itertools.count(1)
+
+    def create_schema(self) -> None:
+        """Create the full schema, with stand-ins for the reference tables, and `STOCKS` stocks."""
+        from sqlalchemy import insert
+        from app.db.bootstrap import REFERENCE_TABLES, create_schema
+
+        create_schema(self.engine)
+        stocks = next(table for table in REFERENCE_TABLES if table.name == "stocks")
+        with self.engine.begin() as conn:
+            conn.execute(insert(stocks), [{"id": i} for i in range(1, STOCKS + 1)])
+
+    def new_user_fields(self) -> dict:
+        """
+        Unique registration fields for one user.
+
+        Returns:
+            dict: username, phone_number, email and password.
+        """
+        n = next(self._sequence)
+        return {
+            "username": f"bench{n}",
+            "phone_number": str(10**9 + n),
+            "email": f"bench{n}@example.com",
+            "password": PASSWORD,
+        }
+
+    def add_users(self, count: int, status: int = 3, roles: str = "admin") -> list[tuple[int, str]]:
+        """
+        Insert users that share the benchmark password.
+
+        Args:
+            count (int): Number of users.
+            status (int): Status of the new users (3 = active).
+            roles (str): Roles of the new users (`users.roles` column).
+
+        Returns:
+            list[tuple[int, str]]: ID and email of each new user.
+        """
+        from sqlalchemy import insert, select
+        from app.models.user import User, UserSearchTrigram
+        from app.services.search_index import indexed_values, trigram_rows
+
+        rows = [
+            {**self.new_user_fields(), "password": self.password_hash, "status": status, "roles": roles}
+            for _ in range(count)
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(insert(User), rows)
+            emails = [row["email"] for row in rows]
+            found = conn.execute(
+                select(User.id, User.username, User.email, User.phone_number).where(User.email.in_(emails))
+            ).all()
+            conn.execute(insert(UserSearchTrigram), [
+                trigram for user in found for trigram in trigram_rows(user.id, indexed_values(user))
+            ])
+        return sorted((user.id, user.email) for user in found)
+
+    def add_refresh_tokens(self, user_ids: list[int]) -> list[str]:
+        """
+        Issue one refresh token per user ID.
+
+        Args:
+            user_ids (list[int]): Owners of the tokens.
+
+        Returns:
+            list[str]: Raw refresh tokens.
+        """
+        from sqlalchemy.orm import Session
+        from app.services.token_service import new_refresh_token
+
+        tokens = []
+        with Session(self.engine) as db:
+            for user_id in user_ids:
+                raw_token, row = new_refresh_token(user_id)
+                db.add(row)
+                tokens.append(raw_token)
+            db.commit()
+        return tokens
+
+def build_scenarios(db: BenchDatabase, admin_headers: dict, users: list[tuple[int, str]]) -> list[Scenario]:
+    """
+    Scenarios for every route in `app/api`.
+
+    Args:
+        db (BenchDatabase): Stand-in database used to seed per-request data.
+        admin_headers (dict): Authorization header of an admin user.
+        users (list[tuple[int, str]]): Seeded users (ID, email) to read and log in as.
+
+    Returns:
+        list[Scenario]: One scenario per route.
+    """
+    from app.core.security import create_access_token
+
+    def cycle(n):
+        return itertools.islice(itertools.cycle(users), n)
+
+    def watchlist(user_id, step):
+        # WATCHLIST_SIZE stocks per user; step 2 picks every other one
+        start = user_id * WATCHLIST_SIZE
+        return [{"stock_id": (start + i) % STOCKS + 1} for i in range(0, WATCHLIST_SIZE, step)]
+
+    def register(n):
+        return [{"url": "/api/auth/register", "json": db.new_user_fields()} for _ in range(n)]
+
+    def availability(n):
+        # One taken and one free value per request
+        return [
+            {"url": "/api/auth/availability", "params": {"email": email, "username": db.new_user_fields()["username"]}}
+            for _, email in cycle(n)
+        ]
+
+    def login(n):
+        return [{"url": "/api/auth/login", "json": {"email": email, "password": PASSWORD}} for _, email in cycle(n)]
+
+    def refresh(n):
+        tokens = db.add_refresh_tokens([user_id for user_id, _ in cycle(n)])
+        return [{"url": "/api/auth/refresh", "json": {"refresh_token": token}} for token in tokens]
+
+    def logout(n):
+        return [
+            {"url": "/api/auth/logout", "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}}
+            for user_id, _ in cycle(n)
+        ]
+
+    def list_users(n):
+        return [{"url": "/api/users/", "headers": admin_headers, "params": {"limit": 100}}] * n
+
+    def search_prefix(n):
+        return [{"url": "/api/users/search", "headers": admin_headers, "params": {"q": "bench1"}}] * n
+
+    def search_contains(n):
+        params = {"q": "ch12", "mode": "contains"}
+        return [{"url": "/api/users/search", "headers": admin_headers, "params": params}] * n
+
+    def stream_users(n):
+        return [{"url": "/api/users/stream", "headers": admin_headers}] * n
+
+    def import_users(n):
+        requests = []
+        for _ in range(n):
+            lines = ["username,phone_number,email,password"]
+            for _ in range(10):
+                fields = db.new_user_fields()
+                lines.append(",".join(fields[f] for f in ("username", "phone_number", "email", "password")))
+            requests.append({
+                "url": "/api/users/import",
+                "headers": {**admin_headers, "Content-Type": "text/csv"},
+                "content": "\n".join(lines).encode(),
+            })
+        return requests
+
+    def read_user(n):
+        return [{"url": f"/api/users/{user_id}", "headers": admin_headers} for user_id, _ in cycle(n)]
+
+    def revalidate_user(n):
+        # Seeded users are still at version 1
+        headers = {**admin_headers, "If-None-Match": '"v1"'}
+        return [{"url": f"/api/users/{user_id}", "headers": headers} for user_id, _ in cycle(n)]
+
+    def update_user(n):
+        return [
+            {"url": f"/api/users/{user_id}", "headers": admin_headers, "json": {"username": db.new_user_fields()["username"]}}
+            for user_id, _ in cycle(n)
+        ]
+
+    def update_roles(n):
+        return [{"url": f"/api/users/{user_id}/roles", "headers": admin_headers, "json": {"roles": ["admin"]}} for user_id, _ in cycle(n)]
+
+    def add_selections(n):
+        return [
+            {"url": f"/api/users/{user_id}/selections", "headers": admin_headers, "json": {"selections": watchlist(user_id, 1)}}
+            for user_id, _ in cycle(n)
+        ]
+
+    def read_selections(n):
+        return [{"url": f"/api/users/{user_id}/selections", "headers": admin_headers} for user_id, _ in cycle(n)]
+
+    def remove_selections(n):
+        return [
+            {"url": f"/api/users/{user_id}/selections/remove", "headers": admin_headers, "json": {"selections": watchlist(user_id, 2)}}
+            for user_id, _ in cycle(n)
+        ]
+
+    def followers(n):
+        return [{"url": "/api/selections/followers", "headers": admin_headers, "params": {"stock_id": list(range(1, 21))}}] * n
+
+    def delete_user(n):
+        return [{"url": f"/api/users/{user_id}", "headers": admin_headers} for user_id, _ in db.add_users(n)]
+
+    def internal(path):
+        return lambda n: [{"url": path}] * n
+
+    return [
+        Scenario("POST", "/api/auth/register", register),
+        Scenario("GET", "/api/auth/availability", availability),
+        Scenario("POST", "/api/auth/login", login),
+        Scenario("POST", "/api/auth/refresh", refresh),
+        Scenario("POST", "/api/auth/logout", logout),
+        Scenario("GET", "/api/users/", list_users),
+        Scenario("GET", "/api/users/stream", stream_users),
+        Scenario("GET", "/api/users/search", search_prefix, variant="prefix"),
+        Scenario("GET", "/api/users/search", search_contains, variant="contains"),
+        Scenario("POST", "/api/users/import", import_users),
+        Scenario("GET", "/api/users/{id}", read_user),
+        Scenario("GET", "/api/users/{id}", revalidate_user, expected_status=304, variant="304"),
+        Scenario("PUT", "/api/users/{id}", update_user),
+        Scenario("PUT", "/api/users/{id}/roles", update_roles),
+        Scenario("DELETE", "/api/users/{id}", delete_user),
+        Scenario("POST", "/api/users/{id}/selections", add_selections),
+        Scenario("GET", "/api/users/{id}/selections", read_selections),
+        Scenario("POST", "/api/users/{id}/selections/remove", remove_selections),
+        Scenario("GET", "/api/selections/followers", followers),
+        Scenario("GET", "/api/internal/stats/hashing", internal("/api/internal/stats/hashing")),
+        Scenario("GET", "/api/internal/stats/pool", internal("/api/internal/stats/pool")),
+        Scenario("GET", "/api/internal/stats/token-cache", internal("/api/internal/stats/token-cache")),
+        Scenario("GET", "/api/internal/stats/availability-filter", internal("/api/internal/stats/availability-filter")),
+    ]
+
+# ----- Runner -----
+async def measure(client, scenario: Scenario, iterations: int, concurrency: int) -> dict:
+    """
+    Send a scenario's requests with a fixed number of concurrent clients.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the app.
+        scenario (Scenario): Route to benchmark.
+        iterations (int): Number of requests.
+        concurrency (int): Requests in flight at a time.
+
+    Returns:
+        dict: Summary as returned by `summarize`, errors counting unexpected status codes.
+    """
+    requests = iter(scenario.prepare(iterations))
+    samples = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for request in requests:
+            started = time.perf_counter()
+            response = await client.request(scenario.method, **request)
+            samples.append(time.perf_counter() - started)
+            if response.status_code != scenario.expected_status:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started, errors)
+
+def mounted_routes(app) -> set[tuple[str, str]]:
+    """
+    (method, path) pairs of the API routes registered on the app.
+
+    Args:
+        app (FastAPI): The application.
+
+    Returns:
+        set[tuple[str, str]]: Routes under /api.
+    """
+    from fastapi.routing import APIRoute
+
+    return {
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith("/api")
+        for method in route.methods
+    }
+
+async def run_e2e(
+    db_path: str,
+    iterations: int = 200,
+    concurrency: int = 1,
+    users: int = 1000,
+    warmup: int = 5,
+    bcrypt_rounds: int | None = None,
+) -> tuple[dict[str, dict], list[str]]:
+    """
+    Run the end-to-end benchmarks.
+
+    Args:
+        db_path (str): SQLite file configured by `configure_environment`.
+        iterations (int): Requests per route.
+        concurrency (int): Concurrent clients per route.
+        users (int): Users seeded before the run (read, listed and streamed by the scenarios).
+        warmup (int): Untimed requests per route, sent first.
+        bcrypt_rounds (int | None): bcrypt cost used by the app during the run. Defaults to the app's own.
+
+    Returns:
+        tuple[dict[str, dict], list[str]]: Summaries keyed by benchmark name,
+        and the mounted routes that no scenario covers.
+    """
+    import httpx
+    from app.core import security
+    from app.main import app
+
+    if bcrypt_rounds is not None:
+        # Same context the app would build with BCRYPT_ROUNDS set, so logins do not trigger rehashes
+        context = security.build_crypt_context(bcrypt_rounds=bcrypt_rounds)
+        security.get_crypt_context = lambda: context
+    db = BenchDatabase(db_path)
+    db.create_schema()
+    seeded = db.add_users(users)
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            admin_id, admin_email = seeded[0]
+            login = await client.post("/api/auth/login", json={"email": admin_email, "password": PASSWORD})
+            login.raise_for_status()
+            admin_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            routes = mounted_routes(app)
+            scenarios = [
+                s for s in build_scenarios(db, admin_headers, seeded[1:])
+                if (s.method, s.path) in routes
+            ]
+            for scenario in scenarios:
+                if warmup:
+                    await measure(client, scenario, warmup, 1)
+                results[scenario.name] = await measure(client, scenario, iterations, concurrency)
+
+    covered = {(s.method, s.path) for s in scenarios}
+    uncovered = sorted(f"{method} {path}" for method, path in routes - covered)
+    return results, uncovered
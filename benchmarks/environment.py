@@ -0,0 +1,51 @@
+"""
+Process environment for benchmark runs.
+
+`app.core.config.settings` is read once at import time, so the stand-in
+database and benchmark settings must be in place before anything from `app`
+is imported. `configure_environment` is therefore called by the CLI first.
+"""
+
+import os
+import tempfile
+
+# Placeholders for the required settings
+REQUIRED_DEFAULTS = {
+    "SECRET_KEY": "benchmark-secret-key-not-for-production",
+    "ALGORITHM": "HS256",
+}
+
+def use_placeholder_settings() -> None:
+    """Fill in the required settings that are not configured, keeping the real ones."""
+    for name, value in REQUIRED_DEFAULTS.items():
+        os.environ.setdefault(name, value)
+
+def configure_environment(async_mode: bool = False) -> str:
+    """
+    Point the application at a fresh SQLite database file (sync and async URLs).
+
+    Existing environment variables win over the placeholders, so real settings
+    such as `HASH_WORKERS` or `TOKEN_CACHE_ENABLED` can be benchmarked as-is.
+
+    Args:
+        async_mode (bool): Serve the async routers through aiosqlite instead of the sync ones.
+
+    Returns:
+        str: Path of the SQLite database file (inside a new temporary directory).
+    """
+    use_placeholder_settings()
+    db_path = os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), "bench.db")
+    os.environ["DB_ASYNC_MODE"] = "true" if async_mode else "false"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    # Replicas would point at other databases than the stand-in
+    os.environ["DATABASE_REPLICA_URLS"] = "[]"
+    os.environ["ASYNC_DATABASE_REPLICA_URLS"] = "[]"
+    os.environ["DB_CREATE_SCHEMA"] = "false"
+    os.environ["INTERNAL_STATS_ENABLED"] = "true"
+    # The "sql" and "redis" backends would need infrastructure outside the stand-in database
+    os.environ["REVOCATION_BACKEND"] = "memory"
+    os.environ["RATE_LIMIT_BACKEND"] = "memory"
+    # Every benchmark request comes from the same client address
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    return db_path
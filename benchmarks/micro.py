@@ -0,0 +1,107 @@
+"""
+Micro-benchmarks of the security primitives in `app.core.security`.
+
+This module measures:
+1. `hash_password` and `verify_password` for each bcrypt cost factor.
+2. `create_access_token` and `decode_access_token` for each JWT algorithm.
+
+The functions are called exactly as the application calls them; only the
+password context and key ring factories of `app.core.security` are swapped
+per variant.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from benchmarks.stats import summarize
+
+PASSWORD = "correct horse battery staple"
+
+DEFAULT_ROUNDS = (4, 8, 10, 12)
+# Algorithms usable with the shared SECRET_KEY. An RS*/ES* algorithm can be measured
+# when it is the configured ALGORITHM, with the keys of JWT_KEYS_DIR.
+DEFAULT_ALGORITHMS = ("HS256", "HS384", "HS512")
+
+@contextmanager
+def _patched(module, **attributes) -> Iterator[None]:
+    original = {name: getattr(module, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(module, name, value)
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 0) -> dict:
+    """
+    Call a function repeatedly and summarize its latency.
+
+    Args:
+        fn (Callable[[], object]): Operation to measure.
+        iterations (int): Number of timed calls.
+        warmup (int): Untimed calls made first.
+
+    Returns:
+        dict: Summary as returned by `summarize`.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - call_started)
+    return summarize(samples, time.perf_counter() - started)
+
+def run_micro(
+    iterations: int = 1000,
+    hash_iterations: int = 10,
+    rounds: tuple[int, ...] = DEFAULT_ROUNDS,
+    algorithms: tuple[str, ...] = DEFAULT_ALGORITHMS,
+) -> dict[str, dict]:
+    """
+    Run all micro-benchmarks.
+
+    Args:
+        iterations (int): Timed calls per JWT benchmark.
+        hash_iterations (int): Timed calls per bcrypt benchmark.
+        rounds (tuple[int, ...]): bcrypt cost factors to measure.
+        algorithms (tuple[str, ...]): JWT algorithms to measure.
+
+    Returns:
+        dict[str, dict]: Summaries keyed by benchmark name, e.g. "micro hash_password[rounds=12]".
+    """
+    from app.core import security
+    from app.core.config import settings
+    from app.core.keys import KeyRing
+
+    results = {}
+    for cost in rounds:
+        context = security.build_crypt_context(schemes=["bcrypt"], bcrypt_rounds=cost)
+        with _patched(security, get_crypt_context=lambda: context):
+            hashed = security.hash_password(PASSWORD)
+            results[f"micro hash_password[rounds={cost}]"] = measure(
+                lambda: security.hash_password(PASSWORD), hash_iterations
+            )
+            results[f"micro verify_password[rounds={cost}]"] = measure(
+                lambda: security.verify_password(PASSWORD, hashed), hash_iterations
+            )
+
+    claims = {"sub": "1"}
+    for algorithm in algorithms:
+        if algorithm == security.get_key_ring().algorithm:
+            ring = security.get_key_ring()
+        else:
+            ring = KeyRing.from_secret(settings.SECRET_KEY, algorithm)
+        with _patched(security, get_key_ring=lambda: ring):
+            token = security.create_access_token(claims)
+            results[f"micro create_access_token[{algorithm}]"] = measure(
+                lambda: security.create_access_token(claims), iterations, warmup=10
+            )
+            results[f"micro decode_access_token[{algorithm}]"] = measure(
+                lambda: security.decode_access_token(token), iterations, warmup=10
+            )
+    return results
@@ -0,0 +1,75 @@
+"""
+Serialization benchmarks of user profile responses.
+
+Each variant turns the same page of profile rows (as selected by
+`PROFILE_COLUMNS`, 10,000 by default) into a response body:
+1. validated+json: validate the rows into `UserProfileResponse` (including
+   the `EmailStr` check), dump them in JSON mode and encode them with
+   `json.dumps`, as FastAPI does for a `response_model` with the standard
+   `JSONResponse`. Every read endpoint used to take this path.
+2. validated+orjson: the same with `ORJSONResponse`, the application's default
+   response class (still used by routes that return models, such as PUT).
+3. orjson: the read endpoints' fast path, rows encoded as they are.
+4. ndjson: the stream encoder, `encode_ndjson`.
+"""
+
+from datetime import datetime, timedelta
+
+from benchmarks.micro import measure
+
+DEFAULT_ROWS = 10_000
+
+def profile_rows(count: int) -> list[dict]:
+    """
+    Build rows shaped like the results of `active_profiles_query`.
+
+    Args:
+        count (int): Number of rows.
+
+    Returns:
+        list[dict]: Profile rows.
+    """
+    created = datetime(2025, 1, 1, 12, 0, 0, 123456)
+    return [
+        {
+            "id": i,
+            "username": f"user{i}",
+            "phone_number": f"+1555{i:07d}",
+            "email": f"user{i}@example.com",
+            "created_at": created + timedelta(seconds=i),
+        }
+        for i in range(1, count + 1)
+    ]
+
+def run_serialization(rows: int = DEFAULT_ROWS, iterations: int = 20) -> dict[str, dict]:
+    """
+    Run all serialization benchmarks.
+
+    Args:
+        rows (int): Rows per response.
+        iterations (int): Timed serializations per variant.
+
+    Returns:
+        dict[str, dict]: Summaries keyed by benchmark name, e.g. "serialize orjson[rows=10000]".
+    """
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from pydantic import TypeAdapter
+    from app.schemas.user import UserProfileResponse
+    from app.services.user_service import encode_ndjson
+
+    page = profile_rows(rows)
+    adapter = TypeAdapter(list[UserProfileResponse])
+
+    def validated(response_class):
+        return lambda: response_class(adapter.dump_python(adapter.validate_python(page), mode="json")).body
+
+    variants = {
+        "validated+json": validated(JSONResponse),
+        "validated+orjson": validated(ORJSONResponse),
+        "orjson": lambda: ORJSONResponse(page).body,
+        "ndjson": lambda: encode_ndjson(page),
+    }
+    return {
+        f"serialize {name}[rows={rows}]": measure(fn, iterations, warmup=1)
+        for name, fn in variants.items()
+    }
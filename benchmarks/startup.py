@@ -0,0 +1,84 @@
+"""
+Startup benchmarks of the application.
+
+Every sample is a fresh interpreter, like a newly booted server worker, that
+imports `app.main` and runs the application's lifespan startup against the
+stand-in database. Two phases are measured per worker:
+1. import: importing `app.main`, which builds the settings and the routes.
+2. ready: from the start of the import until the lifespan startup finished
+   (engines created, `DB_POOL_WARMUP` connections opened, password backends
+   and JWT keys loaded), i.e. when the worker could accept requests.
+
+Several workers can boot at once, as with `uvicorn --workers N`, so their
+competition for CPU and disk is part of the measurement.
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.stats import summarize
+
+# Runs in each worker process; prints the phase durations as JSON
+WORKER_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({"import": imported - started, "ready": ready - started}))
+"""
+
+def boot_workers(workers: int) -> list[dict]:
+    """
+    Start workers at the same time and wait until they exit.
+
+    Args:
+        workers (int): Worker processes to start.
+
+    Raises:
+        RuntimeError: If a worker failed to start the application.
+
+    Returns:
+        list[dict]: Seconds per phase ("import", "ready") of each worker.
+    """
+    processes = [
+        subprocess.Popen([sys.executable, "-c", WORKER_SCRIPT], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    timings = []
+    for process in processes:
+        stdout, stderr = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"Worker failed to start:\n{stderr}")
+        timings.append(json.loads(stdout.strip().splitlines()[-1]))
+    return timings
+
+def run_startup(runs: int = 5, workers: int = 1) -> dict[str, dict]:
+    """
+    Boot workers repeatedly and summarize their import and ready times.
+
+    Args:
+        runs (int): Number of times the workers are booted.
+        workers (int): Workers booted at once.
+
+    Returns:
+        dict[str, dict]: Summaries keyed by benchmark name, e.g. "startup ready[workers=4]".
+    """
+    samples = {"import": [], "ready": []}
+    started = time.perf_counter()
+    for _ in range(runs):
+        for timing in boot_workers(workers):
+            for phase, seconds in timing.items():
+                samples[phase].append(seconds)
+    elapsed = time.perf_counter() - started
+    return {
+        f"startup {phase}[workers={workers}]": summarize(phase_samples, elapsed)
+        for phase, phase_samples in samples.items()
+    }
@@ -0,0 +1,131 @@
+"""
+Timing statistics and baseline files for the benchmark suite.
+
+This module provides:
+1. `summarize`, turning raw latency samples into percentiles and throughput.
+2. JSON baseline files (`save_results` / `load_results`).
+3. `compare_results`, which flags benchmarks that got slower than a baseline.
+"""
+
+import json
+import math
+from datetime import datetime, timezone
+
+# Metrics that can be compared; throughput regresses downwards, latencies upwards
+LATENCY_METRICS = ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+THROUGHPUT_METRICS = ("per_second",)
+
+# ----- Statistics -----
+def percentile(ordered: list[float], pct: float) -> float:
+    """
+    Percentile of sorted samples, linearly interpolated between closest ranks.
+
+    Args:
+        ordered (list[float]): Samples sorted in ascending order.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The interpolated percentile (0.0 for no samples).
+    """
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(samples: list[float], elapsed: float, errors: int = 0) -> dict:
+    """
+    Summarize latency samples of one benchmark.
+
+    Args:
+        samples (list[float]): Latency of each operation in seconds.
+        elapsed (float): Wall-clock seconds for all operations (used for throughput).
+        errors (int): Operations that returned an unexpected result.
+
+    Returns:
+        dict: Count, errors, mean/p50/p95/p99/max latency in milliseconds and operations per second.
+    """
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "count": count,
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / count * 1000, 4) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4) if count else 0.0,
+        "per_second": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+# ----- Baselines -----
+def save_results(path: str, results: dict[str, dict], environment: dict) -> None:
+    """
+    Write benchmark results to a JSON file.
+
+    Args:
+        path (str): Output file.
+        results (dict[str, dict]): Summaries keyed by benchmark name.
+        environment (dict): Settings the results were measured with.
+    """
+    document = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+def load_results(path: str) -> dict:
+    """
+    Read a JSON file written by `save_results`.
+
+    Args:
+        path (str): Baseline file.
+
+    Returns:
+        dict: Document with `created_at`, `environment` and `results`.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+# ----- Comparison -----
+def compare_results(
+    baseline: dict[str, dict], current: dict[str, dict], threshold: float, metric: str = "p95_ms"
+) -> list[dict]:
+    """
+    Compare two result sets benchmark by benchmark.
+
+    Benchmarks present in only one of the sets are skipped.
+
+    Args:
+        baseline (dict[str, dict]): Reference summaries keyed by benchmark name.
+        current (dict[str, dict]): New summaries keyed by benchmark name.
+        threshold (float): Allowed relative slowdown (0.2 = 20%).
+        metric (str): Summary field to compare.
+
+    Raises:
+        ValueError: If the metric is unknown.
+
+    Returns:
+        list[dict]: One row per benchmark with `name`, `baseline`, `current`,
+        relative `change` (positive = slower) and `regressed`.
+    """
+    if metric not in LATENCY_METRICS + THROUGHPUT_METRICS:
+        raise ValueError(f"Unknown metric: {metric!r}")
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name][metric], current[name][metric]
+        if before <= 0:
+            continue
+        change = (after - before) / before
+        if metric in THROUGHPUT_METRICS:
+            change = -change
+        rows.append({
+            "name": name,
+            "baseline": before,
+            "current": after,
+            "change": round(change, 4),
+            "regressed": change > threshold or current[name].get("errors", 0) > baseline[name].get("errors", 0),
+        })
+    return rows
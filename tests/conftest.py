@@ -0,0 +1,110 @@
+"""
+Shared test fixtures.
+
+`app.core.config.settings` is read once at import time, so the test
+environment is set before anything from `app` is imported: a SQLite file per
+test session (sync and async URLs), fast bcrypt and in-process stores. The
+`client` fixture serves the sync routers and, in a second run of each test
+module, the async ones.
+"""
+
+import itertools
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import pytest
+
+DB_DIR = tempfile.mkdtemp(prefix="auth-tests-")
+DB_PATH = os.path.join(DB_DIR, "primary.db")
+
+os.environ.update({
+    "SECRET_KEY": "test-secret-key-not-for-production",
+    "ALGORITHM": "HS256",
+    "DATABASE_URL": f"sqlite:///{DB_PATH}",
+    "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{DB_PATH}",
+    "DATABASE_REPLICA_URLS": "[]",
+    "ASYNC_DATABASE_REPLICA_URLS": "[]",
+    "DB_CREATE_SCHEMA": "true",
+    "DB_ASYNC_MODE": "false",
+    "BCRYPT_ROUNDS": "4",
+    "REVOCATION_BACKEND": "memory",
+    "RATE_LIMIT_BACKEND": "memory",
+    "RATE_LIMIT_ENABLED": "false",
+})
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app.core.config import settings
+from app.db.session import get_async_engine, get_engine
+from app.main import create_app
+from app.models.user import User
+
+PASSWORD = "correct horse battery staple"
+
+_sequence = itertools.count(1)
+
+# ----- Application -----
+@pytest.fixture(scope="module", params=["sync", "async"])
+def client(request) -> Iterator[TestClient]:
+    """
+    Test client of an app serving the sync or the async routers, with its lifespan running.
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "DB_ASYNC_MODE", request.param == "async")
+        with TestClient(create_app()) as test_client:
+            yield test_client
+
+@pytest.fixture
+def make_user(client: TestClient):
+    """
+    Factory registering a user through the API and returning `(user_id, auth_headers)`.
+
+    The user is given `roles` directly in the database, before logging in,
+    so the token carries the roles.
+    """
+    def create(roles: str = "") -> tuple[int, dict]:
+        n = next(_sequence)
+        email = f"user{n}@example.com"
+        response = client.post("/api/auth/register", json={
+            "username": f"user{n}", "phone_number": str(10**9 + n), "email": email, "password": PASSWORD,
+        })
+        assert response.status_code == 200, response.text
+        user_id = response.json()["user_id"]
+        with get_engine().begin() as conn:
+            conn.execute(update(User).where(User.id == user_id).values(roles=roles))
+        login = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        assert login.status_code == 200, login.text
+        return user_id, {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    return create
+
+# ----- SQL statements -----
+@contextmanager
+def _recorded_statements() -> Iterator[list[str]]:
+    """
+    Record the SQL statements the engine of the active mode sends to the database.
+
+    Yields:
+        list[str]: Statements executed inside the block, in order.
+    """
+    engine = get_async_engine().sync_engine if settings.DB_ASYNC_MODE else get_engine()
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def recorded_statements():
+    """
+    Context manager recording the SQL statements of the block (see `_recorded_statements`).
+    """
+    return _recorded_statements
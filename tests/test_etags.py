@@ -0,0 +1,92 @@
+"""
+Conditional requests on the user profile endpoints: 304 for a current
+`If-None-Match`, 412 for a stale `If-Match`, and ETags that change with the
+profile or the page.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def admin(make_user) -> dict:
+    return make_user(roles="admin")[1]
+
+
+def page(client, admin: dict, user_id: int, **headers):
+    """The one-user page starting at `user_id` (its window also holds the next user)."""
+    return client.get("/api/users/", params={"cursor": user_id - 1, "limit": 1}, headers={**admin, **headers})
+
+
+def test_profile_not_modified(client, admin, make_user):
+    user_id, _ = make_user()
+    response = client.get(f"/api/users/{user_id}", headers=admin)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    for tag in (etag, f"W/{etag}", f'"other", {etag}'):
+        cached = client.get(f"/api/users/{user_id}", headers={**admin, "If-None-Match": tag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+    assert client.get(f"/api/users/{user_id}", headers={**admin, "If-None-Match": '"v0"'}).status_code == 200
+
+
+def test_page_not_modified(client, admin, make_user):
+    user_id, _ = make_user()
+    make_user()
+    response = page(client, admin, user_id)
+    assert [user["id"] for user in response.json()] == [user_id]
+    etag = response.headers["etag"]
+
+    cached = page(client, admin, user_id, **{"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+
+def test_stale_if_match_fails(client, admin, make_user):
+    user_id, _ = make_user()
+    etag = client.get(f"/api/users/{user_id}", headers=admin).headers["etag"]
+    updated = client.put(
+        f"/api/users/{user_id}", headers={**admin, "If-Match": etag}, json={"username": f"first{user_id}"}
+    )
+    assert updated.status_code == 200
+    assert updated.headers["etag"] != etag
+
+    stale = client.put(
+        f"/api/users/{user_id}", headers={**admin, "If-Match": etag}, json={"username": f"second{user_id}"}
+    )
+    assert stale.status_code == 412
+    assert client.delete(f"/api/users/{user_id}", headers={**admin, "If-Match": etag}).status_code == 412
+    assert client.get(f"/api/users/{user_id}", headers=admin).json()["username"] == f"first{user_id}"
+
+
+def test_update_changes_the_etags(client, admin, make_user):
+    user_id, _ = make_user()
+    make_user()
+    profile_etag = client.get(f"/api/users/{user_id}", headers=admin).headers["etag"]
+    page_etag = page(client, admin, user_id).headers["etag"]
+
+    updated = client.put(f"/api/users/{user_id}", headers=admin, json={"username": f"changed{user_id}"})
+    assert updated.status_code == 200
+    # The old ETags no longer match, so the full responses come back
+    profile = client.get(f"/api/users/{user_id}", headers={**admin, "If-None-Match": profile_etag})
+    assert profile.status_code == 200
+    assert profile.headers["etag"] == updated.headers["etag"] != profile_etag
+    listed = page(client, admin, user_id, **{"If-None-Match": page_etag})
+    assert listed.status_code == 200
+    assert listed.headers["etag"] != page_etag
+
+
+def test_delete_changes_the_page_etag(client, admin, make_user):
+    user_id, _ = make_user()
+    next_id, _ = make_user()
+    make_user()
+    page_etag = page(client, admin, user_id).headers["etag"]
+
+    assert client.delete(f"/api/users/{user_id}", headers=admin).status_code == 200
+    listed = page(client, admin, user_id, **{"If-None-Match": page_etag})
+    assert listed.status_code == 200
+    assert listed.headers["etag"] != page_etag
+    assert [user["id"] for user in listed.json()] == [next_id]
+    # A deleted profile is never answered with 304
+    assert client.get(f"/api/users/{user_id}", headers={**admin, "If-None-Match": "*"}).status_code == 403
@@ -0,0 +1,69 @@
+"""
+Admission control of the hashing pool: once every worker is busy and the
+queue is full, registrations and logins are refused with 503 and
+`Retry-After` instead of waiting.
+"""
+
+import itertools
+import threading
+import time
+
+import pytest
+
+from app.core import security
+from app.core.hashing import HashingPool
+
+from conftest import PASSWORD
+
+release = threading.Event()
+
+_sequence = itertools.count(1)
+
+
+def hold() -> tuple[None, float, float]:
+    """Worker function occupying a worker until `release` is set."""
+    started = time.monotonic()
+    release.wait(timeout=10)
+    return None, started, time.monotonic()
+
+
+@pytest.fixture
+def busy_pool(client, monkeypatch):
+    """A one-worker pool without a queue, whose worker is busy until the test ends."""
+    pool = HashingPool("thread", workers=1, max_queue=0)
+    monkeypatch.setattr(security, "hashing_pool", pool)
+    release.clear()
+    held = client.portal.start_task_soon(pool.run, hold)
+    while pool.in_flight == 0:
+        time.sleep(0.001)
+    yield pool
+    release.set()
+    held.result(timeout=10)
+    pool.shutdown()
+
+
+def registration() -> dict:
+    n = next(_sequence)
+    return {
+        "username": f"hashing{n}", "phone_number": str(3 * 10**9 + n),
+        "email": f"hashing{n}@example.com", "password": PASSWORD,
+    }
+
+
+def test_full_pool_rejects_with_503(client, busy_pool):
+    user = registration()
+    response = client.post("/api/auth/register", json=user)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+    login = client.post("/api/auth/login", json={"email": user["email"], "password": PASSWORD})
+    assert login.status_code == 503
+    assert busy_pool.snapshot()["rejected"] == 2
+
+
+def test_pool_admits_again_once_a_worker_is_free(client, busy_pool):
+    release.set()
+    while busy_pool.in_flight:
+        time.sleep(0.001)
+    response = client.post("/api/auth/register", json=registration())
+    assert response.status_code == 200, response.text
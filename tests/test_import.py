@@ -0,0 +1,102 @@
+"""
+Bulk user import: valid rows are inserted and searchable, while rows that
+reuse a taken value (in the database, the same batch or an earlier batch)
+and invalid rows are reported without aborting the import.
+"""
+
+import io
+import itertools
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import import_service
+from app.services.import_service import import_users
+
+from conftest import PASSWORD
+
+_sequence = itertools.count(1)
+
+
+def new_row(**values) -> dict:
+    n = next(_sequence)
+    return {
+        "username": f"imported{n}", "phone_number": str(2 * 10**9 + n),
+        "email": f"imported{n}@example.com", "password": PASSWORD, **values,
+    }
+
+
+@pytest.fixture
+def sync_only():
+    if settings.DB_ASYNC_MODE:
+        pytest.skip("The import route is served by the sync router only")
+
+
+def test_import_reports_conflicts_and_errors(client, make_user, sync_only, monkeypatch):
+    existing_id, admin = make_user(roles="admin")
+    existing = client.get(f"/api/users/{existing_id}", headers=admin).json()
+    first, second, third = new_row(), new_row(), new_row()
+    rows = [
+        first,
+        new_row(email=first["email"]),  # same batch as the row it duplicates
+        second,
+        new_row(username=existing["username"]),  # taken in the database
+        new_row(phone_number=first["phone_number"]),  # a later batch
+        new_row(email="not an email"),
+        third,
+    ]
+    body = "".join(json.dumps(row) + "\n" for row in rows) + "{not json\n" + "[1, 2]\n"
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+
+    response = client.post(
+        "/api/users/import", headers={**admin, "Content-Type": "application/x-ndjson"}, content=body
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["inserted"] == 3
+    assert report["conflicts"] == [
+        {"row": 2, "field": "email", "value": first["email"]},
+        {"row": 4, "field": "username", "value": existing["username"]},
+        {"row": 5, "field": "phone_number", "value": first["phone_number"]},
+    ]
+    assert [error["row"] for error in report["errors"]] == [6, 8, 9]
+    assert "email" in report["errors"][0]["detail"]
+    assert report["errors"][1]["detail"].startswith("Invalid JSON")
+    assert report["errors"][2]["detail"] == "Expected a JSON object"
+
+    # Inserted rows can sign in and are in the search index
+    login = client.post("/api/auth/login", json={"email": third["email"], "password": PASSWORD})
+    assert login.status_code == 200
+    found = client.get("/api/users/search", params={"q": third["username"], "mode": "contains"}, headers=admin)
+    assert [user["username"] for user in found.json()] == [third["username"]]
+
+
+def test_import_csv(client, make_user, sync_only):
+    _, admin = make_user(roles="admin")
+    rows = [new_row(), new_row()]
+    body = "username,phone_number,email,password\n" + "".join(
+        f"{row['username']},{row['phone_number']},{row['email']},{row['password']}\n" for row in rows
+    ) + f"{rows[0]['username']},1,other@example.com,{PASSWORD}\n"
+
+    response = client.post("/api/users/import", headers={**admin, "Content-Type": "text/csv"}, content=body)
+    assert response.json() == {
+        "inserted": 2,
+        "conflicts": [{"row": 3, "field": "username", "value": rows[0]["username"]}],
+        "errors": [],
+    }
+
+
+def test_value_taken_after_the_check(client, monkeypatch):
+    # A concurrent writer takes a value between the lookup and the INSERT
+    taken, free = new_row(), new_row()
+    with SessionLocal() as db:
+        assert import_users(db, io.BytesIO(json.dumps(taken).encode()), "ndjson").inserted == 1
+
+    monkeypatch.setattr(import_service, "_find_conflicts", lambda db, batch, report: batch)
+    stream = io.BytesIO("".join(json.dumps(row) + "\n" for row in (free, new_row(email=taken["email"]))).encode())
+    with SessionLocal() as db:
+        report = import_users(db, stream, "ndjson")
+    assert report.inserted == 1
+    assert [(conflict.row, conflict.field) for conflict in report.conflicts] == [(2, "email")]
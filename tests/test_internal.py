@@ -0,0 +1,43 @@
+"""
+Internal stats endpoints: the pool stats report the engine of the active
+mode only, without creating engines that are not in use.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import internal
+from app.core.config import settings
+from app.core.lazy import lazy
+from app.main import create_app
+
+
+@pytest.fixture(scope="module", params=["sync", "async"])
+def stats_client(request):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "DB_ASYNC_MODE", request.param == "async")
+        patch.setattr(settings, "INTERNAL_STATS_ENABLED", True)
+        with TestClient(create_app()) as test_client:
+            yield test_client
+
+
+def test_pool_stats_of_the_active_mode(stats_client):
+    mode = "async" if settings.DB_ASYNC_MODE else "sync"
+    # Serve a request so the active engine exists
+    stats_client.post("/api/auth/login", json={"email": "nobody@example.com", "password": "x"})
+
+    stats = stats_client.get("/api/internal/stats/pool").json()
+    assert list(stats) == [mode]
+    assert stats[mode]["checkouts"] >= 1
+
+
+def test_pool_stats_do_not_create_engines(stats_client, monkeypatch):
+    def unused():
+        pytest.fail("The stats created an engine")
+
+    # The other mode's engine and the replicas were never created
+    inactive = "get_engine" if settings.DB_ASYNC_MODE else "get_async_engine"
+    monkeypatch.setattr(internal, inactive, lazy(unused))
+    monkeypatch.setattr(internal, "get_replicas", lazy(unused))
+    monkeypatch.setattr(internal, "get_async_replicas", lazy(unused))
+    assert stats_client.get("/api/internal/stats/pool").status_code == 200
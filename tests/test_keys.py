@@ -0,0 +1,110 @@
+"""
+Asymmetric JWT keys: signing with the active key of a key directory,
+rotation to a new key while tokens of the old one still verify, retirement
+of the old key, and the JWK Set published for other services.
+
+Keys are generated with `rsa` and `ecdsa`, the pure-Python backends of
+python-jose, so the test also runs without the `crypto` extra.
+"""
+
+import os
+
+import ecdsa
+import pytest
+import rsa
+from jose import JWTError
+
+from app.api import jwks
+from app.core import deps, security
+from app.core.keys import KeyRing
+from app.core.token_cache import token_cache
+
+
+def write_key(directory, kid: str, algorithm: str, public_only: bool = False) -> None:
+    """Write a new key pair (or only its public key) to `<kid>.pem`."""
+    if algorithm.startswith("RS"):
+        public, private = rsa.newkeys(1024)
+        pem = public.save_pkcs1() if public_only else private.save_pkcs1()
+    else:
+        private = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+        pem = private.get_verifying_key().to_pem() if public_only else private.to_pem()
+    (directory / f"{kid}.pem").write_bytes(pem)
+
+
+def make_public_only(directory, kid: str, algorithm: str) -> None:
+    """Replace a private key file by its public key."""
+    ring = KeyRing.from_directory(str(directory), algorithm, kid)
+    (directory / f"{kid}.pem").write_bytes(ring.active.verification.to_pem())
+
+
+@pytest.fixture(params=["RS256", "ES256"])
+def algorithm(request) -> str:
+    return request.param
+
+
+def test_rotation(tmp_path, algorithm):
+    write_key(tmp_path, "2024-01", algorithm)
+    old_ring = KeyRing.from_directory(str(tmp_path), algorithm, "2024-01")
+    old_token = old_ring.encode({"sub": "1"})
+
+    # Rotate: a new key signs, the old one still verifies what it signed
+    write_key(tmp_path, "2024-02", algorithm)
+    ring = KeyRing.from_directory(str(tmp_path), algorithm, "2024-02")
+    new_token = ring.encode({"sub": "2"})
+    assert ring.decode(old_token)["sub"] == "1"
+    assert ring.decode(new_token)["sub"] == "2"
+    with pytest.raises(JWTError):
+        old_ring.decode(new_token)
+
+    # Keeping only the public part of the old key: it verifies but can no longer sign
+    make_public_only(tmp_path, "2024-01", algorithm)
+    ring = KeyRing.from_directory(str(tmp_path), algorithm, "2024-02")
+    assert ring.decode(old_token)["sub"] == "1"
+    with pytest.raises(ValueError):
+        KeyRing.from_directory(str(tmp_path), algorithm, "2024-01")
+
+    # Retired: tokens of the old key are rejected
+    os.remove(tmp_path / "2024-01.pem")
+    ring = KeyRing.from_directory(str(tmp_path), algorithm, "2024-02")
+    assert ring.decode(new_token)["sub"] == "2"
+    with pytest.raises(JWTError):
+        ring.decode(old_token)
+
+
+def test_jwks_publishes_public_keys_only(tmp_path, algorithm):
+    write_key(tmp_path, "signing", algorithm)
+    write_key(tmp_path, "verifying", algorithm, public_only=True)
+    ring = KeyRing.from_directory(str(tmp_path), algorithm, "signing")
+
+    keys = ring.jwks["keys"]
+    assert [(key["kid"], key["use"], key["alg"]) for key in keys] == [
+        ("signing", "sig", algorithm), ("verifying", "sig", algorithm)
+    ]
+    assert all(key["kty"] == ("RSA" if algorithm.startswith("RS") else "EC") for key in keys)
+    # No private parameters
+    assert not any({"d", "p", "q", "dp", "dq", "qi"} & key.keys() for key in keys)
+
+
+def test_tokens_of_the_api_across_a_rotation(client, make_user, tmp_path, algorithm, monkeypatch):
+    def use(ring: KeyRing) -> None:
+        for module in (security, deps, jwks):
+            monkeypatch.setattr(module, "get_key_ring", lambda: ring)
+
+    write_key(tmp_path, "old", algorithm)
+    use(KeyRing.from_directory(str(tmp_path), algorithm, "old"))
+    user_id, headers = make_user(roles="admin")
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 200
+
+    write_key(tmp_path, "new", algorithm)
+    use(KeyRing.from_directory(str(tmp_path), algorithm, "new"))
+    response = client.get("/.well-known/jwks.json")
+    assert [key["kid"] for key in response.json()["keys"]] == ["new", "old"]
+    assert "max-age" in response.headers["cache-control"]
+    # The token signed with the old key still authenticates
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 200
+
+    os.remove(tmp_path / "old.pem")
+    use(KeyRing.from_directory(str(tmp_path), algorithm, "new"))
+    # Verified again, not answered from the token cache
+    token_cache.invalidate_user(user_id)
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 401
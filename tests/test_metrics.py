@@ -0,0 +1,25 @@
+"""
+Metrics: `/metrics` and the Server-Timing header only exist when
+`METRICS_ENABLED` is set, since the route has no authentication.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings, settings
+from app.main import create_app
+
+
+def test_metrics_are_off_by_default(client):
+    assert Settings.model_fields["METRICS_ENABLED"].default is False
+    response = client.get("/.well-known/jwks.json")
+    assert "server-timing" not in response.headers
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_when_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    with TestClient(create_app()) as metrics_client:
+        assert "server-timing" in metrics_client.get("/.well-known/jwks.json").headers
+        response = metrics_client.get("/metrics")
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
@@ -0,0 +1,99 @@
+"""
+Purge of soft-deleted users past the retention window, with the rows that
+reference them, and pruning of expired refresh tokens, both in batches.
+"""
+
+import itertools
+from datetime import datetime, timedelta
+
+from sqlalchemy import column, func, insert, select, table, update
+
+from app.core.config import settings
+from app.db.session import SessionLocal, get_engine
+from app.models.token import RefreshToken
+from app.models.user import User, UserSearchTrigram, UserSelection
+from app.services.purge_service import prune_refresh_tokens, purge_deleted_users
+from app.services.token_service import issue_refresh_token
+
+stocks = table("stocks", column("id"))
+
+_stock_ids = itertools.count(5000)
+
+
+def delete_user(client, admin: dict, user_id: int, days_ago: float) -> None:
+    """Delete a user through the API, then move its deletion `days_ago` into the past."""
+    assert client.delete(f"/api/users/{user_id}", headers=admin).status_code == 200
+    with SessionLocal() as db:
+        # Refresh tokens issued around the deletion, e.g. by a login racing it
+        issue_refresh_token(db, user_id)
+        db.execute(
+            update(User).where(User.id == user_id).values(deleted_at=datetime.utcnow() - timedelta(days=days_ago))
+        )
+        db.commit()
+
+
+def remaining(user_ids: list[int]) -> dict[str, int]:
+    """Rows left of the users and of every table referencing them."""
+    with get_engine().connect() as conn:
+        return {
+            model.__tablename__: conn.execute(
+                select(func.count()).select_from(model).where(
+                    (model.id if model is User else model.user_id).in_(user_ids)
+                )
+            ).scalar()
+            for model in (User, UserSelection, UserSearchTrigram, RefreshToken)
+        }
+
+
+def test_purge_in_batches(client, make_user, monkeypatch):
+    _, admin = make_user(roles="admin")
+    stock_id = next(_stock_ids)
+    with get_engine().begin() as conn:
+        conn.execute(insert(stocks).values(id=stock_id))
+    expired, retained = [], []
+    for group, days_ago, count in ((expired, 31, 5), (retained, 29, 2)):
+        for _ in range(count):
+            user_id, headers = make_user()
+            assert client.post(
+                f"/api/users/{user_id}/selections", headers=headers, json={"selections": [{"stock_id": stock_id}]}
+            ).status_code == 200
+            delete_user(client, admin, user_id, days_ago)
+            group.append(user_id)
+    assert all(remaining(expired).values())
+
+    monkeypatch.setattr(settings, "USER_RETENTION_DAYS", 30)
+    monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 2)
+    batches = []
+    with SessionLocal() as db:
+        assert purge_deleted_users(db, pause=0, progress=batches.append) == 5
+    assert batches == [2, 4, 5]
+
+    assert remaining(expired) == {"users": 0, "user_selections": 0, "user_search_trigrams": 0, "refresh_tokens": 0}
+    # Users deleted within the retention window keep everything
+    assert all(remaining(retained).values())
+    assert remaining(retained)["users"] == 2
+
+
+def test_prune_in_batches(client, make_user, monkeypatch):
+    user_id, _ = make_user()
+    with SessionLocal() as db:
+        for _ in range(4):
+            issue_refresh_token(db, user_id)
+        live = db.execute(select(RefreshToken.id).where(RefreshToken.user_id == user_id)).scalars().all()[-1]
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.id != live)
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+
+        monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 2)
+        batches = []
+        # Other tests may have left expired rows too
+        pruned = prune_refresh_tokens(db, pause=0, progress=batches.append)
+        assert pruned >= 4
+        assert batches[-1] == pruned
+        assert all(0 < later - earlier <= 2 for earlier, later in zip([0, *batches], batches))
+
+        rows = db.execute(select(RefreshToken.id).where(RefreshToken.user_id == user_id)).scalars().all()
+    assert rows == [live]
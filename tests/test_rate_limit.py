@@ -0,0 +1,68 @@
+"""
+Login rate limits: every attempt counts per client IP, only failed attempts
+count per email. The backends run in memory and on `fakeredis`.
+"""
+
+import fakeredis
+import pytest
+from sqlalchemy import select
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimiter, RateLimiter, RedisRateLimiter
+from app.db.session import get_engine
+from app.models.user import User
+
+from conftest import PASSWORD
+
+
+@pytest.fixture(params=["memory", "redis"])
+def limiter(request):
+    if request.param == "memory":
+        return MemoryRateLimiter(max_keys=100)
+    return RedisRateLimiter(fakeredis.FakeRedis())
+
+
+def test_hits_are_counted_up_to_the_limit(limiter):
+    assert [limiter.hit("k", limit=3, window=60) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("k", limit=3, window=60) > 0
+    assert limiter.hit("other", limit=3, window=60) == 0.0
+
+
+def test_check_does_not_count(limiter):
+    for _ in range(5):
+        assert limiter.check("k", limit=2, window=60) == 0.0
+    limiter.hit("k", limit=2, window=60)
+    assert limiter.check("k", limit=2, window=60) == 0.0
+    limiter.hit("k", limit=2, window=60)
+    assert limiter.check("k", limit=2, window=60) > 0
+
+
+def test_backends_must_implement_the_interface():
+    class Incomplete(RateLimiter):
+        def hit(self, key, limit, window, cost=1):
+            return 0.0
+
+    with pytest.raises(TypeError, match="check"):
+        Incomplete()
+
+
+@pytest.fixture
+def login_limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "LOGIN_IP_LIMIT", 1000)
+    monkeypatch.setattr(settings, "LOGIN_EMAIL_LIMIT", 3)
+    monkeypatch.setattr(rate_limit, "rate_limiter", MemoryRateLimiter(max_keys=100))
+
+
+def test_only_failed_logins_count_per_email(client, make_user, login_limits):
+    user_id, _ = make_user()
+    with get_engine().connect() as conn:
+        email = conn.execute(select(User.email).where(User.id == user_id)).scalar_one()
+    login = lambda password: client.post("/api/auth/login", json={"email": email, "password": password})
+
+    assert all(login(PASSWORD).status_code == 200 for _ in range(5))
+    assert [login("wrong").status_code for _ in range(3)] == [401, 401, 401]
+    blocked = login(PASSWORD)
+    assert blocked.status_code == 429
+    assert int(blocked.headers["Retry-After"]) >= 1
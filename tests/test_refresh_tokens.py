@@ -0,0 +1,42 @@
+"""
+Pruning of expired refresh tokens: rows stop being needed for reuse
+detection once they expire, and only then are they deleted.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.db.session import SessionLocal
+from app.models.token import RefreshToken
+from app.services.purge_service import prune_refresh_tokens
+from app.services.token_service import hash_refresh_token, issue_refresh_token
+
+
+def test_prune_deletes_only_expired_rows(client, make_user):
+    user_id, _ = make_user()
+    with SessionLocal() as db:
+        first = db.execute(select(RefreshToken.id).where(RefreshToken.user_id == user_id)).scalar_one()
+    # A second login's token, rotated once: its used row stays for reuse detection
+    with SessionLocal() as db:
+        raw_token = issue_refresh_token(db, user_id)
+    rotated = client.post("/api/auth/refresh", json={"refresh_token": raw_token})
+    assert rotated.status_code == 200
+    with SessionLocal() as db:
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == first)
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+        assert prune_refresh_tokens(db, batch_size=1, pause=0) == 1
+
+        remaining = db.execute(select(RefreshToken.token_hash).where(RefreshToken.user_id == user_id)).scalars().all()
+    assert hash_refresh_token(raw_token) in remaining
+    assert hash_refresh_token(rotated.json()["refresh_token"]) in remaining
+    assert len(remaining) == 2
+
+    # The used token is still recognized: presenting it again ends the session
+    reused = client.post("/api/auth/refresh", json={"refresh_token": raw_token})
+    assert reused.status_code == 401
+    assert reused.json()["detail"] == "Refresh token reuse detected"
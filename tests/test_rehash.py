@@ -0,0 +1,66 @@
+"""
+Password hash upgrades: a login with a hash of an outdated cost stores a
+hash of the configured cost after the response, without changing the
+password.
+"""
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.security import build_crypt_context, password_needs_update, verify_password
+from app.db.session import get_engine
+from app.models.user import User
+
+from conftest import PASSWORD
+
+
+def email_of(user_id: int) -> str:
+    with get_engine().connect() as conn:
+        return conn.execute(select(User.email).where(User.id == user_id)).scalar()
+
+
+def stored_hash(user_id: int) -> str:
+    with get_engine().connect() as conn:
+        return conn.execute(select(User.password).where(User.id == user_id)).scalar()
+
+
+def set_hash(user_id: int, hashed: str) -> None:
+    with get_engine().begin() as conn:
+        conn.execute(update(User).where(User.id == user_id).values(password=hashed))
+
+
+def test_login_rehashes_an_outdated_hash(client, make_user):
+    user_id, _ = make_user()
+    email = email_of(user_id)
+    outdated = build_crypt_context(["bcrypt"], bcrypt_rounds=settings.BCRYPT_ROUNDS + 1).hash(PASSWORD)
+    set_hash(user_id, outdated)
+    assert password_needs_update(outdated)
+
+    # TestClient runs the response's background tasks before returning
+    response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200
+    upgraded = stored_hash(user_id)
+    assert upgraded != outdated
+    assert upgraded.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert not password_needs_update(upgraded)
+    assert verify_password(PASSWORD, upgraded)
+
+
+def test_current_hash_is_left_alone(client, make_user):
+    user_id, _ = make_user()
+    email = email_of(user_id)
+    current = stored_hash(user_id)
+    assert not password_needs_update(current)
+
+    assert client.post("/api/auth/login", json={"email": email, "password": PASSWORD}).status_code == 200
+    assert stored_hash(user_id) == current
+
+
+def test_failed_login_does_not_rehash(client, make_user):
+    user_id, _ = make_user()
+    email = email_of(user_id)
+    outdated = build_crypt_context(["bcrypt"], bcrypt_rounds=settings.BCRYPT_ROUNDS + 1).hash(PASSWORD)
+    set_hash(user_id, outdated)
+
+    assert client.post("/api/auth/login", json={"email": email, "password": "wrong"}).status_code == 401
+    assert stored_hash(user_id) == outdated
@@ -0,0 +1,100 @@
+"""
+Read replica routing, with a second SQLite file as the replica.
+
+The replica is a backup of the primary taken by the test, then changed on
+purpose, so each response shows which database served it.
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from app.core.config import settings
+from app.db import session
+from app.db.replicas import ReplicaSet
+from app.db.session import build_async_engine, build_engine
+
+from conftest import DB_DIR, DB_PATH
+
+REPLICA_PATH = os.path.join(DB_DIR, "replica.db")
+
+
+def build_replica_engine(path: str):
+    if settings.DB_ASYNC_MODE:
+        return build_async_engine(f"sqlite+aiosqlite:///{path}")
+    return build_engine(f"sqlite:///{path}")
+
+
+@pytest.fixture
+def use_replicas(client, monkeypatch):
+    """Factory serving the read-only dependencies from the given replica files."""
+    created = []
+
+    def configure(*paths: str) -> ReplicaSet:
+        replicas = ReplicaSet([build_replica_engine(path) for path in paths])
+        created.append(replicas)
+        monkeypatch.setattr(session, "get_async_replicas" if settings.DB_ASYNC_MODE else "get_replicas", lambda: replicas)
+        return replicas
+
+    yield configure
+    for replicas in created:
+        for engine in replicas.engines:
+            if settings.DB_ASYNC_MODE:
+                client.portal.call(engine.dispose)
+            else:
+                engine.dispose()
+
+
+def snapshot_primary(path: str = REPLICA_PATH) -> None:
+    """Copy the primary into the replica file, then rename every user there."""
+    with sqlite3.connect(DB_PATH) as source, sqlite3.connect(path) as replica:
+        source.backup(replica)
+        replica.execute("UPDATE users SET username = 'replica-' || id")
+
+
+def read_username(client, user_id: int, headers: dict) -> str:
+    response = client.get(f"/api/users/{user_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["username"]
+
+
+def test_reads_go_to_the_replica(client, make_user, use_replicas):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    snapshot_primary()
+    use_replicas(REPLICA_PATH)
+
+    assert read_username(client, user_id, admin) == f"replica-{user_id}"
+
+
+def test_reads_go_to_the_primary_after_a_write(client, make_user, use_replicas):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    snapshot_primary()
+    use_replicas(REPLICA_PATH)
+
+    response = client.put(f"/api/users/{user_id}", headers=admin, json={"username": f"written{user_id}"})
+    assert response.status_code == 200, response.text
+    # Read-your-writes: the admin who wrote reads from the primary for a while
+    assert read_username(client, user_id, admin) == f"written{user_id}"
+
+
+def test_failed_replica_is_skipped(client, make_user, use_replicas):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    snapshot_primary()
+    missing = os.path.join(DB_DIR, "missing", "replica.db")
+    replicas = use_replicas(missing, REPLICA_PATH)
+
+    if settings.DB_ASYNC_MODE:
+        client.portal.call(replicas.check_async)
+    else:
+        replicas.check()
+    assert [replica["healthy"] for replica in replicas.snapshot()] == [False, True]
+    # Round-robin only hands out the healthy replica
+    assert {read_username(client, user_id, admin) for _ in range(4)} == {f"replica-{user_id}"}
+
+    replicas.mark(replicas.engines[1], healthy=False)
+    # Without a healthy replica, the primary serves the reads
+    assert not read_username(client, user_id, admin).startswith("replica-")
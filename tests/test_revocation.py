@@ -0,0 +1,132 @@
+"""
+Revocation store backends: revoking single tokens and users, expiry and
+periodic maintenance. The SQL backend runs on its own SQLite file and the
+Redis backend on `fakeredis`.
+"""
+
+import time
+import uuid
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.revocation import (
+    MemoryRevocationStore, RedisRevocationStore, RevocationStore, SQLRevocationStore
+)
+from app.models.token import RevokedToken, UserTokenRevocation
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a SQLite file holding the revocation tables."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'revocations.db'}")
+    RevokedToken.__table__.create(engine)
+    UserTokenRevocation.__table__.create(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(params=["memory", "sql", "redis"])
+def store(request, session_factory):
+    if request.param == "memory":
+        return MemoryRevocationStore()
+    if request.param == "sql":
+        return SQLRevocationStore(session_factory)
+    return RedisRevocationStore(fakeredis.FakeRedis())
+
+
+def claims(user_id: int = 1, issued_at: float | None = None) -> dict:
+    now = time.time()
+    issued_at = now if issued_at is None else issued_at
+    return {"sub": str(user_id), "jti": uuid.uuid4().hex, "iat": issued_at, "exp": issued_at + 900}
+
+
+# ----- Every backend -----
+def test_revoke_token(store):
+    revoked, other = claims(), claims()
+    store.revoke_token(revoked["jti"], 1, revoked["exp"])
+    assert store.is_revoked(revoked)
+    assert not store.is_revoked(other)
+
+
+def test_revoke_user_rejects_tokens_issued_before(store):
+    earlier = claims(user_id=7, issued_at=time.time() - 60)
+    other_user = claims(user_id=8, issued_at=time.time() - 60)
+    store.revoke_user(7)
+    later = claims(user_id=7, issued_at=time.time() + 1)
+    assert store.is_revoked(earlier)
+    assert not store.is_revoked(other_user)
+    assert not store.is_revoked(later)
+
+
+def test_expired_token_entries_are_dropped(store):
+    expired = claims(issued_at=time.time() - 1000)
+    store.revoke_token(expired["jti"], 1, time.time() - 1)
+    store.maintain()
+    assert not store.is_revoked(expired)
+
+
+def test_maintain_keeps_live_entries(store):
+    token = claims()
+    store.revoke_token(token["jti"], 1, token["exp"])
+    store.revoke_user(3)
+    store.maintain()
+    assert store.is_revoked(token)
+    assert store.is_revoked(claims(user_id=3, issued_at=time.time() - 60))
+
+
+def test_backends_must_implement_the_interface():
+    class Incomplete(RevocationStore):
+        def revoke_token(self, jti, user_id, expires_at):
+            pass
+
+    with pytest.raises(TypeError, match="is_revoked"):
+        Incomplete()
+
+
+# ----- SQL backend -----
+def test_sql_maintain_syncs_other_workers(session_factory):
+    writer, reader = SQLRevocationStore(session_factory), SQLRevocationStore(session_factory)
+    reader.maintain()
+    token = claims()
+    writer.revoke_token(token["jti"], 1, token["exp"])
+    writer.revoke_user(5)
+    old_token = claims(user_id=5, issued_at=time.time() - 60)
+    assert not reader.is_revoked(token)
+    assert not reader.is_revoked(old_token)
+
+    reader.maintain()
+    assert reader.is_revoked(token)
+    assert reader.is_revoked(old_token)
+
+
+def test_sql_maintain_purges_expired_rows(session_factory):
+    store = SQLRevocationStore(session_factory)
+    live, expired = claims(), claims()
+    store.revoke_token(live["jti"], 1, live["exp"])
+    store.revoke_token(expired["jti"], 1, time.time() - 1)
+    with session_factory() as db:
+        db.merge(UserTokenRevocation(user_id=9, not_before=time.time() - 2000, expires_at=time.time() - 1))
+        db.commit()
+
+    store.maintain()
+    with session_factory() as db:
+        assert db.execute(select(RevokedToken.jti)).scalars().all() == [live["jti"]]
+        assert db.execute(select(func.count()).select_from(UserTokenRevocation)).scalar() == 0
+
+
+# ----- Redis backend -----
+def test_redis_entries_expire_with_the_tokens():
+    client = fakeredis.FakeRedis()
+    store = RedisRevocationStore(client)
+    token, expired = claims(), claims()
+    store.revoke_token(token["jti"], 1, time.time() + 60)
+    store.revoke_token(expired["jti"], 1, time.time() - 1)
+    store.revoke_user(4)
+
+    assert 0 < client.ttl(f"revoked:jti:{token['jti']}") <= 61
+    assert not client.exists(f"revoked:jti:{expired['jti']}")
+    assert 0 < client.ttl("revoked:user:4") <= settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 1
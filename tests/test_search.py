@@ -0,0 +1,73 @@
+"""
+User search and its trigram index: updates are found at once, the rebuild
+command restores the index, and deleted users disappear from the results
+and, once purged, from the index.
+"""
+
+from sqlalchemy import delete, func, insert, select
+
+from app import cli
+from app.db.session import SessionLocal, get_engine
+from app.models.user import UserSearchTrigram
+from app.services.purge_service import purge_deleted_users
+
+
+def search(client, headers: dict, q: str, mode: str = "contains", field: str = "username") -> list[int]:
+    response = client.get("/api/users/search", params={"q": q, "mode": mode, "field": field}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [user["id"] for user in response.json()]
+
+
+def trigram_rows(user_id: int) -> int:
+    with get_engine().connect() as conn:
+        return conn.execute(
+            select(func.count()).select_from(UserSearchTrigram).where(UserSearchTrigram.user_id == user_id)
+        ).scalar()
+
+
+def test_updated_username_is_found(client, make_user):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    old_name = client.get(f"/api/users/{user_id}", headers=admin).json()["username"]
+
+    response = client.put(f"/api/users/{user_id}", headers=admin, json={"username": f"quokka{user_id}"})
+    assert response.status_code == 200
+    assert search(client, admin, f"okka{user_id}") == [user_id]
+    assert search(client, admin, f"quokka{user_id}", mode="prefix") == [user_id]
+    assert user_id not in search(client, admin, old_name)
+
+
+def test_rebuild_restores_the_index(client, make_user, capsys):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    email = client.get(f"/api/users/{user_id}", headers=admin).json()["email"]
+    # Rows lost, and a stale row left behind, e.g. by writes that bypassed the service
+    with get_engine().begin() as conn:
+        conn.execute(delete(UserSearchTrigram).where(UserSearchTrigram.user_id == user_id))
+        conn.execute(insert(UserSearchTrigram).values(field=1, trigram="zzz", user_id=user_id))
+    assert search(client, admin, email[:-4], field="email") == []
+
+    assert cli.main(["rebuild-search-index", "--batch-size", "2"]) == 0
+    assert "indexed=" in capsys.readouterr().out
+    assert search(client, admin, email[:-4], field="email") == [user_id]
+    assert user_id not in search(client, admin, "zzz")
+    with get_engine().connect() as conn:
+        stale = conn.execute(
+            select(func.count()).where(UserSearchTrigram.user_id == user_id, UserSearchTrigram.trigram == "zzz")
+        ).scalar()
+    assert stale == 0
+
+
+def test_deleted_user_leaves_the_results_and_the_index(client, make_user):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    username = client.get(f"/api/users/{user_id}", headers=admin).json()["username"]
+    assert search(client, admin, username) == [user_id]
+
+    assert client.delete(f"/api/users/{user_id}", headers=admin).status_code == 200
+    assert search(client, admin, username) == []
+    # The rows stay until the user is purged
+    assert trigram_rows(user_id) > 0
+    with SessionLocal() as db:
+        purge_deleted_users(db, retention_days=0, pause=0)
+    assert trigram_rows(user_id) == 0
@@ -0,0 +1,164 @@
+"""
+Watchlist endpoints: bulk add and remove, reactivation of removed
+selections, the retry after a concurrent add, and follower counts.
+"""
+
+import itertools
+
+import pytest
+from sqlalchemy import column, func, insert, select, table, update
+
+from app.core.config import settings
+from app.db.session import get_engine
+from app.models.user import DELETED_STATUS, User, UserSelection
+from app.services import async_selection_service, selection_service
+
+stocks = table("stocks", column("id"))
+currencies = table("currencies", column("currency_code"))
+
+_stock_ids = itertools.count(1000)
+
+
+@pytest.fixture
+def new_stocks():
+    """Factory inserting fresh rows into the `stocks` stand-in and returning their IDs."""
+    def create(n: int) -> list[int]:
+        ids = [next(_stock_ids) for _ in range(n)]
+        with get_engine().begin() as conn:
+            conn.execute(insert(stocks), [{"id": stock_id} for stock_id in ids])
+        return ids
+
+    return create
+
+
+def selections(*stock_ids: int) -> dict:
+    return {"selections": [{"stock_id": stock_id} for stock_id in stock_ids]}
+
+
+def add(client, user_id: int, headers: dict, *stock_ids: int):
+    return client.post(f"/api/users/{user_id}/selections", headers=headers, json=selections(*stock_ids))
+
+
+def remove(client, user_id: int, headers: dict, *stock_ids: int):
+    return client.post(f"/api/users/{user_id}/selections/remove", headers=headers, json=selections(*stock_ids))
+
+
+def watchlist(client, user_id: int, headers: dict) -> list[int]:
+    return [row["stock_id"] for row in client.get(f"/api/users/{user_id}/selections", headers=headers).json()]
+
+
+def rows_of(user_id: int) -> int:
+    with get_engine().connect() as conn:
+        return conn.execute(select(func.count()).where(UserSelection.user_id == user_id)).scalar()
+
+
+def test_add_and_remove(client, make_user, new_stocks):
+    user_id, headers = make_user()
+    first, second, third = new_stocks(3)
+
+    response = add(client, user_id, headers, first, second, second)
+    assert response.json() == {"changed": 2, "unchanged": 0}
+    assert add(client, user_id, headers, second, third).json() == {"changed": 1, "unchanged": 1}
+    # In the order they were added; targets of one request in no particular order
+    listed = watchlist(client, user_id, headers)
+    assert sorted(listed[:2]) == [first, second] and listed[2] == third
+
+    assert remove(client, user_id, headers, first, new_stocks(1)[0]).json() == {"changed": 1, "unchanged": 1}
+    assert watchlist(client, user_id, headers) == [second, third]
+
+
+def test_readding_reactivates_the_removed_row(client, make_user, new_stocks, recorded_statements):
+    user_id, headers = make_user()
+    removed, kept, *new = new_stocks(4)
+    add(client, user_id, headers, removed, kept)
+    remove(client, user_id, headers, removed)
+
+    with recorded_statements() as statements:
+        response = add(client, user_id, headers, removed, kept, *new)
+    assert response.json() == {"changed": 3, "unchanged": 1}
+    # The user's status, the lookup, one UPDATE reactivating the removed row
+    # and one executemany INSERT
+    assert len(statements) == 4, "\n".join(statements)
+    assert statements[2].startswith("UPDATE user_selections")
+    assert statements[3].startswith("INSERT INTO user_selections")
+    assert rows_of(user_id) == 4
+    assert sorted(watchlist(client, user_id, headers)) == sorted([removed, kept, *new])
+
+
+def test_concurrent_add_is_retried(client, make_user, new_stocks, monkeypatch):
+    user_id, headers = make_user()
+    (stock_id,) = new_stocks(1)
+
+    # Another request adds the target between the lookup and the INSERT
+    service = async_selection_service if settings.DB_ASYNC_MODE else selection_service
+    plan_additions = service.plan_additions
+    calls = []
+
+    def plan_then_race(rows, groups, user_id, now):
+        plan = plan_additions(rows, groups, user_id, now)
+        if not calls:
+            with get_engine().begin() as conn:
+                conn.execute(insert(UserSelection).values(user_id=user_id, stock_id=stock_id, status=1))
+        calls.append(plan)
+        return plan
+
+    monkeypatch.setattr(service, "plan_additions", plan_then_race)
+    response = add(client, user_id, headers, stock_id)
+    assert response.status_code == 200
+    assert response.json() == {"changed": 0, "unchanged": 1}
+    assert len(calls) == 2
+    assert rows_of(user_id) == 1
+
+
+def test_unknown_target(client, make_user, new_stocks):
+    user_id, headers = make_user()
+    (known,) = new_stocks(1)
+    response = add(client, user_id, headers, known, 10**9)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown user or selection target"
+    assert rows_of(user_id) == 0
+
+
+def test_deleted_owner(client, make_user, new_stocks):
+    user_id, headers = make_user()
+    (stock_id,) = new_stocks(1)
+    # Soft-deleted without revoking its tokens, as when revocation failed
+    with get_engine().begin() as conn:
+        conn.execute(update(User).where(User.id == user_id).values(status=DELETED_STATUS))
+    assert add(client, user_id, headers, stock_id).status_code == 404
+    assert remove(client, user_id, headers, stock_id).status_code == 404
+    assert rows_of(user_id) == 0
+
+
+def test_other_users_watchlist(client, make_user, new_stocks):
+    user_id, _ = make_user()
+    _, other = make_user()
+    _, admin = make_user(roles="admin")
+    (stock_id,) = new_stocks(1)
+    assert add(client, user_id, other, stock_id).status_code == 403
+    assert add(client, user_id, admin, stock_id).json() == {"changed": 1, "unchanged": 0}
+
+
+def test_follower_counts(client, make_user, new_stocks):
+    followed, unfollowed, nobody = new_stocks(3)
+    code = f"C{followed}"
+    with get_engine().begin() as conn:
+        conn.execute(insert(currencies).values(currency_code=code))
+    for _ in range(2):
+        user_id, headers = make_user()
+        add(client, user_id, headers, followed, unfollowed)
+        client.post(f"/api/users/{user_id}/selections", headers=headers, json={"selections": [{"currency_code": code}]})
+    remove(client, user_id, headers, unfollowed)
+
+    response = client.get(
+        "/api/selections/followers",
+        params={"currency_code": [code], "stock_id": [nobody, followed, unfollowed]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"stock_id": nobody, "followers": 0},
+        {"stock_id": followed, "followers": 2},
+        {"stock_id": unfollowed, "followers": 1},
+        {"currency_code": code, "followers": 2},
+    ]
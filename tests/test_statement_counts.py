@@ -0,0 +1,84 @@
+"""
+SQL statements per request of the user profile endpoints.
+
+A request loads each user row at most once, and authorization reads only the
+permissions version, which is cached after the admin's first request. These
+tests pin the number of statements per endpoint, so a change that adds a
+round trip fails here instead of going unnoticed.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def admin(client, make_user) -> dict:
+    """Headers of an admin whose permissions version is already cached."""
+    admin_id, headers = make_user(roles="admin")
+    assert client.get(f"/api/users/{admin_id}", headers=headers).status_code == 200
+    return headers
+
+
+def assert_statements(statements: list[str], expected: int) -> None:
+    assert len(statements) == expected, "\n".join(statements)
+
+
+def test_read_user(client, admin, make_user, recorded_statements):
+    user_id, _ = make_user()
+    with recorded_statements() as statements:
+        response = client.get(f"/api/users/{user_id}", headers=admin)
+    assert response.status_code == 200
+    # The profile columns, without building the ORM entity
+    assert_statements(statements, 1)
+
+
+def test_read_user_not_modified(client, admin, make_user, recorded_statements):
+    user_id, _ = make_user()
+    etag = client.get(f"/api/users/{user_id}", headers=admin).headers["etag"]
+    with recorded_statements() as statements:
+        response = client.get(f"/api/users/{user_id}", headers={**admin, "If-None-Match": etag})
+    assert response.status_code == 304
+    # Status and version only
+    assert_statements(statements, 1)
+
+
+def test_update_user(client, admin, make_user, recorded_statements):
+    user_id, _ = make_user()
+    etag = client.get(f"/api/users/{user_id}", headers=admin).headers["etag"]
+    with recorded_statements() as statements:
+        response = client.put(
+            f"/api/users/{user_id}", headers={**admin, "If-Match": etag}, json={"username": f"renamed{user_id}"}
+        )
+    assert response.status_code == 200
+    # The user, the check that the new username is free (skipped when the
+    # availability filter is loaded and knows it), the UPDATE and the search
+    # trigrams of the username (DELETE, INSERT)
+    assert_statements(statements, 5)
+    # A stale version fails on the UPDATE, before the index is rewritten
+    assert statements[2].lstrip().startswith("UPDATE users"), "\n".join(statements)
+
+
+def test_delete_user(client, admin, make_user, recorded_statements):
+    user_id, _ = make_user()
+    with recorded_statements() as statements:
+        response = client.delete(f"/api/users/{user_id}", headers=admin)
+    assert response.status_code == 200
+    # The user, its refresh tokens, its selections and the soft-delete UPDATE
+    assert_statements(statements, 4)
+
+
+def test_list_users(client, admin, recorded_statements):
+    with recorded_statements() as statements:
+        response = client.get("/api/users/", headers=admin)
+    assert response.status_code == 200
+    assert_statements(statements, 1)
+
+
+
+def test_update_user_unchanged(client, admin, make_user, recorded_statements):
+    user_id, _ = make_user()
+    username = client.get(f"/api/users/{user_id}", headers=admin).json()["username"]
+    with recorded_statements() as statements:
+        response = client.put(f"/api/users/{user_id}", headers=admin, json={"username": username})
+    assert response.status_code == 200
+    # Keeping the current value needs no availability check and writes nothing
+    assert_statements(statements, 1)
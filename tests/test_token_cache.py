@@ -0,0 +1,36 @@
+"""
+Verified-token cache: `get_token_claims` stores the claims of a verified
+token, later requests with the same token skip verification, and revocation
+is still checked on a cache hit.
+"""
+
+from app.core.revocation import revocation_store
+from app.core.token_cache import token_cache
+
+
+def test_repeated_token_is_served_from_the_cache(client, make_user):
+    user_id, headers = make_user(roles="admin")
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 200
+    hits = token_cache.snapshot()["hits"]
+
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 200
+    assert token_cache.snapshot()["hits"] == hits + 1
+
+
+def test_revoked_token_is_rejected_on_a_cache_hit(client, make_user):
+    user_id, headers = make_user(roles="admin")
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 200
+
+    revocation_store.revoke_user(user_id)
+    hits = token_cache.snapshot()["hits"]
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 401
+    assert token_cache.snapshot()["hits"] == hits + 1
+
+
+def test_invalidate_user_drops_its_tokens(client, make_user):
+    user_id, headers = make_user(roles="admin")
+    assert client.get(f"/api/users/{user_id}", headers=headers).status_code == 200
+    size = token_cache.snapshot()["size"]
+
+    token_cache.invalidate_user(user_id)
+    assert token_cache.snapshot()["size"] == size - 1
@@ -0,0 +1,74 @@
+"""
+Listing users: keyset pages linked by `X-Next-Cursor`, and the NDJSON
+stream of every active profile.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.db.session import get_engine
+from app.models.user import DELETED_STATUS, User
+from app.schemas.user import UserProfileResponse
+
+
+@pytest.fixture
+def admin(make_user) -> dict:
+    return make_user(roles="admin")[1]
+
+
+def active_ids() -> list[int]:
+    with get_engine().connect() as conn:
+        return conn.execute(select(User.id).where(User.status != DELETED_STATUS).order_by(User.id)).scalars().all()
+
+
+def test_pages_follow_the_cursor(client, admin, make_user):
+    deleted_id, _ = make_user()
+    make_user()
+    assert client.delete(f"/api/users/{deleted_id}", headers=admin).status_code == 200
+
+    ids, params = [], {"limit": 2}
+    while True:
+        response = client.get("/api/users/", params=params, headers=admin)
+        assert response.status_code == 200
+        page = response.json()
+        assert 0 < len(page) <= 2
+        ids += [user["id"] for user in page]
+        if "x-next-cursor" not in response.headers:
+            break
+        assert response.headers["x-next-cursor"] == str(page[-1]["id"])
+        params["cursor"] = response.headers["x-next-cursor"]
+
+    assert ids == active_ids()
+    assert deleted_id not in ids
+    assert set(page[-1]) == set(UserProfileResponse.model_fields)
+
+
+def test_default_page_size(client, admin, make_user):
+    while len(active_ids()) <= 100:
+        make_user()
+    response = client.get("/api/users/", headers=admin)
+    assert [user["id"] for user in response.json()] == active_ids()[:100]
+    assert response.headers["x-next-cursor"] == str(active_ids()[99])
+
+
+def test_stream_writes_every_active_user(client, admin, make_user):
+    deleted_id, _ = make_user()
+    assert client.delete(f"/api/users/{deleted_id}", headers=admin).status_code == 200
+
+    response = client.get("/api/users/stream", headers=admin)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    users = [json.loads(line) for line in lines]
+    assert [user["id"] for user in users] == active_ids()
+    assert deleted_id not in {user["id"] for user in users}
+    # The stream holds the same profiles as the pages
+    assert users[:2] == client.get("/api/users/", params={"limit": 2}, headers=admin).json()
+
+
+def test_listing_is_admin_only(client, make_user):
+    _, headers = make_user()
+    assert client.get("/api/users/", headers=headers).status_code == 403
+    assert client.get("/api/users/stream", headers=headers).status_code == 403
@@ -0,0 +1,51 @@
+"""
+Profile updates that would take another user's username, email or phone
+number fail with 409, whether the check before the UPDATE catches them or
+the unique index does.
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services import async_user_service, user_service
+
+
+def profile(client, user_id: int, headers: dict) -> dict:
+    return client.get(f"/api/users/{user_id}", headers=headers).json()
+
+
+@pytest.mark.parametrize("field", ["username", "email", "phone_number"])
+def test_update_to_a_taken_value(client, make_user, field):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    other_id, _ = make_user()
+    taken = profile(client, other_id, admin)[field]
+
+    response = client.put(f"/api/users/{user_id}", headers=admin, json={field: taken})
+    assert response.status_code == 409
+    assert response.json()["detail"] == f"{field} is already registered"
+    assert profile(client, user_id, admin)[field] != taken
+
+
+def test_value_taken_after_the_check(client, make_user, monkeypatch):
+    _, admin = make_user(roles="admin")
+    user_id, _ = make_user()
+    other_id, _ = make_user()
+    taken = profile(client, other_id, admin)["username"]
+
+    # The check sees the value as free, as if the other user took it just after
+    service = async_user_service if settings.DB_ASYNC_MODE else user_service
+    find_taken_fields = service.find_taken_fields
+
+    def check_misses(db, values, use_filter=True):
+        return [] if use_filter else find_taken_fields(db, values, use_filter)
+
+    async def check_misses_async(db, values, use_filter=True):
+        return [] if use_filter else await find_taken_fields(db, values, use_filter)
+
+    monkeypatch.setattr(
+        service, "find_taken_fields", check_misses_async if settings.DB_ASYNC_MODE else check_misses
+    )
+    response = client.put(f"/api/users/{user_id}", headers=admin, json={"username": taken})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "username is already registered"